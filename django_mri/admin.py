@@ -30,6 +30,7 @@ from django_mri.models.nifti import NIfTI
 from django_mri.models.region import Region
 from django_mri.models.scan import Scan
 from django_mri.models.score import Score
+from django_mri.models.score_vector import ScoreVector
 from django_mri.models.session import Session
 from django_mri.utils import get_measurement_model
 from django_mri.utils.html import Html
@@ -722,6 +723,51 @@ class ScoreAdmin(admin.ModelAdmin):
         return Html.admin_link(model_name, pk, text)
 
 
+class ScoreVectorAdmin(admin.ModelAdmin):
+    """
+    Adds the :class:`~django_mri.models.score_vector.ScoreVector` model to
+    the admin interface.
+    """
+
+    list_display = (
+        "id",
+        "_run",
+        "_analysis_version",
+        "_atlas",
+        "_metric",
+        "size",
+    )
+    list_filter = ("atlas", "run__analysis_version", "metric")
+    search_fields = ("id", "origin__id", "run__id")
+    raw_id_fields = ("origin",)
+
+    def _run(self, instance: ScoreVector) -> str:
+        model_name = instance.run.__class__.__name__
+        pk = instance.run.id
+        return Html.admin_link(model_name, pk)
+
+    def _analysis_version(self, instance: ScoreVector) -> str:
+        model_name = instance.run.analysis_version.__class__.__name__
+        pk = instance.run.analysis_version.id
+        text = str(instance.run.analysis_version)
+        return Html.admin_link(model_name, pk, text)
+
+    def _atlas(self, instance: ScoreVector) -> str:
+        model_name = instance.atlas.__class__.__name__
+        pk = instance.atlas.id
+        text = instance.atlas.title
+        return Html.admin_link(model_name, pk, text)
+
+    def _metric(self, instance: ScoreVector) -> str:
+        model_name = instance.metric.__class__.__name__
+        pk = instance.metric.id
+        text = instance.metric.title
+        return Html.admin_link(model_name, pk, text)
+
+    def size(self, instance: ScoreVector) -> int:
+        return len(instance.values)
+
+
 admin.site.register(DataDirectory, DataDirectoryAdmin)
 admin.site.register(IrbApproval, IrbApprovalAdmin)
 admin.site.register(NIfTI, NiftiAdmin)
@@ -731,3 +777,4 @@ admin.site.register(Atlas, AtlasAdmin)
 admin.site.register(Metric, MetricAdmin)
 admin.site.register(Region, RegionAdmin)
 admin.site.register(Score, ScoreAdmin)
+admin.site.register(ScoreVector, ScoreVectorAdmin)
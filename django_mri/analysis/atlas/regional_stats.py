@@ -0,0 +1,248 @@
+"""
+Vectorized computation of regional statistics from volumetric atlas label
+maps (see :attr:`~django_mri.models.atlas.Atlas.label_map`).
+
+All regions are summarized in a single pass over the image: voxel counts and
+sums are accumulated with :func:`numpy.bincount`, and medians are read off a
+single sort of the voxels grouped by label. Label maps are cached, so that
+scoring a cohort against the same atlas only reads each image once.
+"""
+import logging
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple, Union
+
+import nibabel as nib
+import numpy as np
+import pandas as pd
+from django_mri.analysis.metric.regional import REGIONAL_STATISTICS
+from django_mri.analysis.score.utils import ScoreEntry, get_metric_map
+from django_mri.models.atlas import Atlas
+
+#: Regional statistics DataFrame columns, by statistic key.
+STATISTIC_COLUMNS: Dict[str, str] = {
+    "mean": "Intensity Mean",
+    "median": "Intensity Median",
+    "sum": "Intensity Sum",
+    "volume": "Volume",
+    "tissue_volume": "Tissue Volume",
+}
+
+#: Number of label maps kept in memory.
+LABEL_MAP_CACHE_SIZE: int = 8
+
+MISSING_LABEL_MAP: str = "Atlas '{atlas}' has no label map."
+SHAPE_MISMATCH: str = (
+    "Data shape {data_shape} does not match label map shape {label_shape}."
+)
+GRID_MISMATCH: str = (
+    "Image grid {image_shape} does not match the label map grid "
+    "{label_shape} of atlas '{atlas}'."
+)
+DUPLICATE_INDEX: str = (
+    "Atlas '{atlas}' has multiple regions with index {index}, skipping."
+)
+
+_logger = logging.getLogger("data.mri.analysis.atlas.regional_stats")
+
+
+@lru_cache(maxsize=LABEL_MAP_CACHE_SIZE)
+def _load_label_map(
+    path: str, mtime_ns: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    image = nib.load(path)
+    labels = np.rint(np.asanyarray(image.dataobj)).astype(np.int64)
+    labels.setflags(write=False)
+    return labels, image.affine
+
+
+def load_label_map(path: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Reads a label map as an integer array (read-only, as it is cached).
+    Cached label maps are keyed by the file's modification time, so a label
+    map replaced in place is read again.
+
+    Parameters
+    ----------
+    path : str
+        Label map NIfTI file path
+
+    Returns
+    -------
+    Tuple[np.ndarray, np.ndarray]
+        Labels and affine
+    """
+    mtime_ns = Path(path).stat().st_mtime_ns
+    return _load_label_map(str(path), mtime_ns)
+
+
+def compute_regional_statistics(
+    labels: np.ndarray, data: np.ndarray, voxel_volume: float = 1.0
+) -> pd.DataFrame:
+    """
+    Returns the statistics of *data* within each label of *labels*. Zero
+    (background) and negative labels, as well as non-finite values, are
+    ignored.
+
+    Parameters
+    ----------
+    labels : np.ndarray
+        Integer label map
+    data : np.ndarray
+        Image data, in the same grid as *labels*
+    voxel_volume : float, optional
+        Volume of a single voxel (in mm³), by default 1.0
+
+    Returns
+    -------
+    pd.DataFrame
+        Statistics (see :attr:`STATISTIC_COLUMNS`) indexed by label. The
+        "Tissue Volume" column is the sum multiplied by the voxel volume,
+        e.g. the regional gray matter volume of a modulated tissue map.
+
+    Raises
+    ------
+    ValueError
+        If the label map and data shapes do not match
+    """
+    labels, data = np.asarray(labels), np.asarray(data, dtype=float)
+    if labels.shape != data.shape:
+        message = SHAPE_MISMATCH.format(
+            data_shape=data.shape, label_shape=labels.shape
+        )
+        raise ValueError(message)
+    labels, data = labels.ravel(), data.ravel()
+    mask = (labels > 0) & np.isfinite(data)
+    labels, data = labels[mask], data[mask]
+    columns = list(STATISTIC_COLUMNS.values())
+    if not labels.size:
+        index = pd.Index([], name="Label", dtype=np.int64)
+        return pd.DataFrame(columns=columns, index=index, dtype=float)
+    counts = np.bincount(labels)
+    sums = np.bincount(labels, weights=data)
+    present = np.flatnonzero(counts)
+    counts, sums = counts[present], sums[present]
+    # Sorting by label and then by value places each region's values in a
+    # contiguous, ordered block, so medians are read off by offset.
+    sorted_data = data[np.lexsort((data, labels))]
+    starts = np.cumsum(counts) - counts
+    lower = sorted_data[starts + (counts - 1) // 2]
+    upper = sorted_data[starts + counts // 2]
+    statistics = {
+        "mean": sums / counts,
+        "median": (lower + upper) / 2,
+        "sum": sums,
+        "volume": counts * voxel_volume,
+        "tissue_volume": sums * voxel_volume,
+    }
+    return pd.DataFrame(
+        {STATISTIC_COLUMNS[key]: values for key, values in statistics.items()},
+        index=pd.Index(present, name="Label"),
+    )
+
+
+def get_atlas_statistics(
+    atlas: Atlas, image: Union[str, Path, nib.Nifti1Image]
+) -> pd.DataFrame:
+    """
+    Returns the regional statistics of a NIfTI image within an atlas's
+    label map. The image must be in the label map's grid (e.g. registered to
+    the same template space).
+
+    Parameters
+    ----------
+    atlas : Atlas
+        Atlas with a label map
+    image : Union[str, Path, nib.Nifti1Image]
+        NIfTI image or path
+
+    Returns
+    -------
+    pd.DataFrame
+        Statistics indexed by label
+
+    Raises
+    ------
+    ValueError
+        If the atlas has no label map or the grids do not match
+    """
+    if not atlas.label_map:
+        raise ValueError(MISSING_LABEL_MAP.format(atlas=atlas.title))
+    labels, affine = load_label_map(atlas.label_map.path)
+    if isinstance(image, (str, Path)):
+        image = nib.load(str(image))
+    grid_matches = image.shape[:3] == labels.shape and np.allclose(
+        image.affine, affine, atol=1e-3
+    )
+    if not grid_matches:
+        message = GRID_MISMATCH.format(
+            image_shape=image.shape,
+            label_shape=labels.shape,
+            atlas=atlas.title,
+        )
+        raise ValueError(message)
+    voxel_volume = float(np.prod(image.header.get_zooms()[:3]))
+    return compute_regional_statistics(
+        labels, image.get_fdata(), voxel_volume=voxel_volume
+    )
+
+
+def get_region_ids_by_index(atlas: Atlas) -> Dict[int, int]:
+    """
+    Returns the IDs of the atlas's regions by their label map index. Indices
+    shared by multiple regions are ambiguous and therefore omitted.
+    """
+    regions = atlas.region_set.filter(index__isnull=False)
+    region_ids, duplicates = {}, set()
+    for index, region_id in regions.values_list("index", "id"):
+        if index in region_ids:
+            duplicates.add(index)
+        region_ids[index] = region_id
+    for index in duplicates:
+        message = DUPLICATE_INDEX.format(atlas=atlas.title, index=index)
+        _logger.warning(message)
+        del region_ids[index]
+    return region_ids
+
+
+def get_regional_scores(
+    atlas: Atlas,
+    image: Union[str, Path, nib.Nifti1Image],
+    origin_ids: Iterable[int] = (),
+) -> List[ScoreEntry]:
+    """
+    Returns the regional statistics of a NIfTI image within an atlas's
+    label map as score entries, to be created with
+    :meth:`~django_mri.models.managers.score.ScoreManager.bulk_upsert`.
+    Labels without a matching region (by index) are ignored.
+
+    Parameters
+    ----------
+    atlas : Atlas
+        Atlas with a label map
+    image : Union[str, Path, nib.Nifti1Image]
+        NIfTI image or path
+    origin_ids : Iterable[int], optional
+        Origin scan IDs, by default ()
+
+    Returns
+    -------
+    List[ScoreEntry]
+        Regional scores
+    """
+    stats = get_atlas_statistics(atlas, image)
+    metrics = get_metric_map(stats.columns, REGIONAL_STATISTICS)
+    region_ids = get_region_ids_by_index(atlas)
+    origin_ids = tuple(origin_ids)
+    return [
+        ScoreEntry(
+            metric_id=metrics[metric_title].id,
+            region_id=region_ids[label],
+            value=float(value),
+            origin_ids=origin_ids,
+        )
+        for metric_title, values in stats.items()
+        if metric_title in metrics
+        for label, value in values.items()
+        if label in region_ids
+    ]
@@ -1,3 +1,12 @@
-from django_mri.analysis.metric.freesurfer import RECON_ALL_ANATOMICAL_STATS
+from django_mri.analysis.metric.freesurfer import (
+    RECON_ALL_ANATOMICAL_STATS,
+    RECON_ALL_SEGMENTATION_STATS,
+)
+from django_mri.analysis.metric.regional import REGIONAL_STATISTICS
 
-METRIC_DEFINITIONS = RECON_ALL_ANATOMICAL_STATS
+# Metrics shared by several definition lists are loaded by title only once.
+METRIC_DEFINITIONS = (
+    RECON_ALL_ANATOMICAL_STATS
+    + RECON_ALL_SEGMENTATION_STATS
+    + REGIONAL_STATISTICS
+)
@@ -8,3 +8,12 @@ RECON_ALL_ANATOMICAL_STATS = [
     {"title": "Folding Index", "description": ""},
     {"title": "Intrinsic Curvature Index", "description": ""},
 ]
+
+RECON_ALL_SEGMENTATION_STATS = [
+    {"title": "Volume", "description": ""},
+    {"title": "Intensity Mean", "description": ""},
+    {"title": "Intensity StdDev", "description": ""},
+    {"title": "Intensity Min", "description": ""},
+    {"title": "Intensity Max", "description": ""},
+    {"title": "Intensity Range", "description": ""},
+]
@@ -0,0 +1,12 @@
+REGIONAL_STATISTICS = [
+    {"title": "Intensity Mean", "description": ""},
+    {"title": "Intensity Median", "description": ""},
+    {"title": "Intensity Sum", "description": ""},
+    {"title": "Volume", "description": ""},
+    {
+        "title": "Tissue Volume",
+        "description": "Sum of the regional intensities multiplied by the voxel volume (e.g. regional gray matter volume from a modulated tissue probability map).",
+    },
+]
+
+# flake8: noqa: E501
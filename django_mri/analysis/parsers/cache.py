@@ -0,0 +1,210 @@
+"""
+Parquet cache of parsed analysis outputs (see
+:meth:`~django_analyses.models.run.Run.parse_output`).
+
+Each run's parsed DataFrame is stored as
+*<cache root>/<run ID>-<fingerprint>.parquet*, where the fingerprint is a
+hash of the paths, sizes and modification times of the output files read
+by the analysis's parser (and of :attr:`CACHE_FORMAT_VERSION`). Any change
+to the outputs therefore results in a cache miss, after which the stale file
+is replaced. Only the files are stat-ed to validate a cached entry, which is
+much cheaper than parsing them again.
+"""
+import hashlib
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+import pandas as pd
+from django.db import connections
+from django_mri.utils.utils import get_parsed_output_cache_root
+
+#: Output files read by each analysis's parser, as glob patterns relative to
+#: the run's directory.
+OUTPUT_PATTERNS: Dict[str, List[str]] = {
+    "ReconAll": ["stats/*.stats"],
+    "MRIQC": ["**/*.json"],
+}
+
+#: Output file patterns of analyses not listed in :attr:`OUTPUT_PATTERNS`.
+DEFAULT_OUTPUT_PATTERNS: List[str] = ["**/*"]
+
+#: Version of the parsers' output and of the cached file layout. Must be
+#: incremented whenever either changes, so that existing cache entries are
+#: no longer used.
+CACHE_FORMAT_VERSION: int = 1
+
+#: Cached file name template.
+CACHE_FILE_NAME: str = "{run_id}-{fingerprint}.parquet"
+
+#: Index level added to the frames returned by :func:`load_parsed_outputs`.
+RUN_ID_LEVEL: str = "Run ID"
+
+CACHE_WRITE_FAILURE: str = "Failed to cache the parsed output of run #{run_id}:\n{exception}"  # noqa: E501
+
+_logger = logging.getLogger("data.mri.analysis.parsers.cache")
+
+
+def get_output_fingerprint(run) -> str:
+    """
+    Returns a hash of the paths, sizes and modification times of the
+    provided run's parsed output files, the analysis version, and the
+    :attr:`CACHE_FORMAT_VERSION`.
+
+    Parameters
+    ----------
+    run : Run
+        Analysis run
+
+    Returns
+    -------
+    str
+        Output fingerprint
+    """
+    run_path = Path(run.path)
+    analysis = run.analysis_version.analysis.title
+    patterns = OUTPUT_PATTERNS.get(analysis, DEFAULT_OUTPUT_PATTERNS)
+    entries = set()
+    for pattern in patterns:
+        for path in run_path.glob(pattern):
+            if path.is_file():
+                stat = path.stat()
+                relative_path = str(path.relative_to(run_path))
+                entries.add((relative_path, stat.st_size, stat.st_mtime_ns))
+    digest = hashlib.sha1(repr(sorted(entries)).encode())
+    digest.update(run.analysis_version.title.encode())
+    digest.update(str(CACHE_FORMAT_VERSION).encode())
+    return digest.hexdigest()[:16]
+
+
+def get_cache_path(run, fingerprint: str = None) -> Path:
+    """
+    Returns the path of the provided run's cached parsed output.
+
+    Parameters
+    ----------
+    run : Run
+        Analysis run
+    fingerprint : str, optional
+        Output fingerprint, by default calculated
+
+    Returns
+    -------
+    Path
+        Cached parsed output path
+    """
+    fingerprint = fingerprint or get_output_fingerprint(run)
+    name = CACHE_FILE_NAME.format(run_id=run.id, fingerprint=fingerprint)
+    return get_parsed_output_cache_root() / name
+
+
+def clear_parsed_output_cache(run=None) -> int:
+    """
+    Removes the cached parsed outputs of the provided run, or of all runs.
+
+    Parameters
+    ----------
+    run : Run, optional
+        Analysis run, by default None (all runs)
+
+    Returns
+    -------
+    int
+        Number of removed files
+    """
+    pattern = CACHE_FILE_NAME.format(
+        run_id=run.id if run is not None else "*", fingerprint="*"
+    )
+    removed = 0
+    for path in get_parsed_output_cache_root().glob(pattern):
+        path.unlink(missing_ok=True)
+        removed += 1
+    return removed
+
+
+def load_parsed_output(run) -> pd.DataFrame:
+    """
+    Returns the provided run's parsed output, from the cache if its output
+    files did not change since it was last parsed.
+
+    Parameters
+    ----------
+    run : Run
+        Analysis run
+
+    Returns
+    -------
+    pd.DataFrame
+        Parsed output
+    """
+    cache_path = get_cache_path(run)
+    if cache_path.is_file():
+        return pd.read_parquet(cache_path)
+    df = run.parse_output()
+    if isinstance(df, pd.DataFrame):
+        clear_parsed_output_cache(run)
+        _write_cache(run, df, cache_path)
+    return df
+
+
+def load_parsed_outputs(
+    runs: Iterable, max_workers: int = None
+) -> pd.DataFrame:
+    """
+    Returns the parsed outputs of the provided runs concatenated as a single
+    DataFrame, with an additional "Run ID" index level. Cached outputs are
+    read (and missing ones parsed) by a thread pool.
+
+    Parameters
+    ----------
+    runs : Iterable
+        Analysis runs (e.g. a :class:`~django_analyses.models.run.Run`
+        queryset)
+    max_workers : int, optional
+        Maximal number of threads, by default determined by
+        :class:`~concurrent.futures.ThreadPoolExecutor`
+
+    Returns
+    -------
+    pd.DataFrame
+        Parsed outputs
+    """
+    if hasattr(runs, "select_related"):
+        runs = runs.select_related("analysis_version__analysis")
+    runs = list(runs)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        frames = list(executor.map(_load_parsed_output, runs))
+    frames = {
+        run.id: df
+        for run, df in zip(runs, frames)
+        if isinstance(df, pd.DataFrame) and not df.empty
+    }
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, names=[RUN_ID_LEVEL])
+
+
+def _load_parsed_output(run) -> pd.DataFrame:
+    # Worker threads open their own database connections.
+    try:
+        return load_parsed_output(run)
+    finally:
+        connections.close_all()
+
+
+def _write_cache(run, df: pd.DataFrame, cache_path: Path) -> None:
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    # Write to a temporary file first so that readers never see a partial
+    # file.
+    temp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+    try:
+        df.to_parquet(temp_path)
+        os.replace(temp_path, cache_path)
+    except Exception as exception:
+        temp_path.unlink(missing_ok=True)
+        message = CACHE_WRITE_FAILURE.format(
+            run_id=run.id, exception=exception
+        )
+        _logger.warning(message)
@@ -1,9 +1,18 @@
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import List, Union
 
 import pandas as pd
 from django_mri.analysis.parsers.recon_all.stats import ReconAllStats
 
+#: Minimal number of subjects for which statistics are parsed in a process
+#: pool (smaller batches are not worth the overhead).
+MIN_PARALLEL_SUBJECTS: int = 8
+
+
+def read_subject_stats(stats_path: Path) -> pd.DataFrame:
+    return ReconAllStats(stats_path).to_dataframe()
+
 
 class ReconAllOutputParser:
     STATS_DIR = "stats"
@@ -13,22 +22,48 @@ class ReconAllOutputParser:
         self.stats = ReconAllStats(path / self.STATS_DIR)
 
     @classmethod
-    def extract_stats(cls, path: Union[Path, List[Path]]) -> pd.DataFrame:
+    def extract_stats(
+        cls, path: Union[Path, List[Path]], max_workers: int = None
+    ) -> pd.DataFrame:
+        """
+        Returns the anatomical statistics of one or more ReconAll output
+        directories. Multiple subjects' statistics are parsed in a process
+        pool and concatenated once.
+
+        Parameters
+        ----------
+        path : Union[Path, List[Path]]
+            Statistics directory, or a list of ReconAll output directories
+        max_workers : int, optional
+            Maximal number of worker processes, by default the number of
+            processors
+
+        Returns
+        -------
+        pd.DataFrame
+            Anatomical statistics
+        """
         if isinstance(path, Path):
             return ReconAllStats(path).to_dataframe()
+        stats_paths = [Path(run_path) / cls.STATS_DIR for run_path in path]
+        if len(stats_paths) < MIN_PARALLEL_SUBJECTS or max_workers == 1:
+            results = map(read_subject_stats, stats_paths)
+            all_stats = list(results)
         else:
-            all_stats = None
-            for run_path in path:
-                stats_path = run_path / cls.STATS_DIR
-                stats = ReconAllStats(stats_path).to_dataframe()
-                if not stats.empty:
-                    stats["Subject ID"] = stats_path.parent.name
-                    if all_stats is None:
-                        all_stats = stats.copy()
-                    else:
-                        all_stats = all_stats.append(stats)
-            indices = ["Subject ID"] + ReconAllStats.INDICES
-            return all_stats.reset_index().set_index(indices)
+            chunksize = max(len(stats_paths) // 64, 1)
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                results = executor.map(
+                    read_subject_stats, stats_paths, chunksize=chunksize
+                )
+                all_stats = list(results)
+        subject_stats = {
+            stats_path.parent.name: stats
+            for stats_path, stats in zip(stats_paths, all_stats)
+            if not stats.empty
+        }
+        if not subject_stats:
+            return pd.DataFrame()
+        return pd.concat(subject_stats, names=["Subject ID"])
 
     def parse(self) -> pd.DataFrame:
         return self.stats.to_dataframe()
@@ -1,5 +1,7 @@
 from pathlib import Path
+from typing import List
 
+import numpy as np
 import pandas as pd
 
 COLUMNS_TO_INT = [
@@ -7,6 +9,7 @@ COLUMNS_TO_INT = [
     "Surface Area",
     "Gray Matter Volume",
     "Folding Index",
+    "Number of Voxels",
 ]
 HEMISPHERES = {"Left": "lh", "Right": "rh"}
 ATLASES = {
@@ -15,6 +18,11 @@ ATLASES = {
     "DKT": "aparc.DKTatlas",
     "Brodmann": "BA_exvivo",
 }
+SEGMENTATIONS = {
+    "Subcortical Segmentation": "aseg",
+    "White Matter Parcellation": "wmparc",
+}
+SUBCORTICAL_ATLASES = ["Subcortical Segmentation"]
 MEASUREMENTS = [
     "Surface Area",
     "Gray Matter Volume",
@@ -25,9 +33,95 @@ MEASUREMENTS = [
     "Folding Index",
     "Intrinsic Curvature Index",
 ]
+SEGMENTATION_MEASUREMENTS = [
+    "Volume",
+    "Intensity Mean",
+    "Intensity StdDev",
+    "Intensity Min",
+    "Intensity Max",
+    "Intensity Range",
+]
 COLUMN_NAMES = ["Region Name", "Number of Vertices"] + MEASUREMENTS
-START_COLUMNS = ["Hemisphere", "Atlas"] + COLUMN_NAMES
+SEGMENTATION_COLUMN_NAMES = [
+    "Index",
+    "Segmentation ID",
+    "Number of Voxels",
+    "Volume",
+    "Region Name",
+    "Intensity Mean",
+    "Intensity StdDev",
+    "Intensity Min",
+    "Intensity Max",
+    "Intensity Range",
+]
+START_COLUMNS = (
+    ["Hemisphere", "Atlas"]
+    + COLUMN_NAMES
+    + ["Number of Voxels"]
+    + SEGMENTATION_MEASUREMENTS
+)
 FILE_NAME = "{hemisphere_code}.{atlas_code}.stats"
+SEGMENTATION_FILE_NAME = "{atlas_code}.stats"
+
+#: Segmentation structure name patterns by hemisphere (e.g.
+#: "Left-Hippocampus" or "wm-lh-insula").
+HEMISPHERE_PATTERNS = {
+    "Left": r"^(?:Left-|ctx-lh-|wm-lh-)",
+    "Right": r"^(?:Right-|ctx-rh-|wm-rh-)",
+}
+
+
+def read_stats_file(path: Path, names: List[str]) -> pd.DataFrame:
+    """
+    Reads the table of a FreeSurfer *.stats* file in a single pass (header
+    lines are commented out).
+
+    Parameters
+    ----------
+    path : Path
+        *.stats* file path
+    names : List[str]
+        Column names
+
+    Returns
+    -------
+    pd.DataFrame
+        Statistics table
+    """
+    return pd.read_csv(
+        path, comment="#", names=names, sep=r"\s+", engine="c", header=None
+    )
+
+
+def read_surface_stats(
+    path: Path, atlas_name: str, hemisphere_name: str
+) -> pd.DataFrame:
+    """
+    Reads a surface-based parcellation's statistics (e.g.
+    *lh.aparc.stats*).
+    """
+    data = read_stats_file(path, COLUMN_NAMES)
+    data["Hemisphere"] = hemisphere_name
+    data["Atlas"] = atlas_name
+    return data
+
+
+def read_segmentation_stats(path: Path, atlas_name: str) -> pd.DataFrame:
+    """
+    Reads a volume-based segmentation's statistics (*aseg.stats* or
+    *wmparc.stats*), inferring hemispheres from the structure names.
+    """
+    data = read_stats_file(path, SEGMENTATION_COLUMN_NAMES)
+    data = data.drop(columns=["Index", "Segmentation ID"])
+    names = data["Region Name"].astype(str)
+    conditions = [
+        names.str.contains(pattern) for pattern in HEMISPHERE_PATTERNS.values()
+    ]
+    data["Hemisphere"] = np.select(
+        conditions, list(HEMISPHERE_PATTERNS), default=None
+    )
+    data["Atlas"] = atlas_name
+    return data
 
 
 class ReconAllStats:
@@ -36,8 +130,16 @@ class ReconAllStats:
     def __init__(self, path: Path) -> None:
         self.path = Path(path)
 
-    def to_dataframe(self) -> pd.DataFrame:
-        stats = pd.DataFrame(columns=START_COLUMNS)
+    def read_all(self) -> List[pd.DataFrame]:
+        """
+        Reads all available parcellation and segmentation statistics files.
+
+        Returns
+        -------
+        List[pd.DataFrame]
+            Statistics tables
+        """
+        frames = []
         for atlas_name, atlas_code in ATLASES.items():
             for hemisphere_name, hemisphere_code in HEMISPHERES.items():
                 name = FILE_NAME.format(
@@ -45,21 +147,37 @@ class ReconAllStats:
                 )
                 partial_stats_path = self.path / name
                 if partial_stats_path.is_file():
-                    data = pd.read_csv(
-                        partial_stats_path,
-                        comment="#",
-                        names=COLUMN_NAMES,
-                        delim_whitespace=True,
+                    data = read_surface_stats(
+                        partial_stats_path, atlas_name, hemisphere_name
                     )
-                    data["Hemisphere"] = hemisphere_name
-                    data["Atlas"] = atlas_name
-                    stats = stats.append(data)
-        stats.set_index(self.INDICES, inplace=True)
-        # Fix `object` columns
-        for column_name in COLUMNS_TO_INT:
-            stats[column_name] = stats[column_name].astype("int64")
-        stats.index = stats.index.set_levels(
-            stats.index.levels[-1].str.replace("_and_", "&"),
-            level="Region Name",
+                    frames.append(data)
+        for atlas_name, atlas_code in SEGMENTATIONS.items():
+            name = SEGMENTATION_FILE_NAME.format(atlas_code=atlas_code)
+            partial_stats_path = self.path / name
+            if partial_stats_path.is_file():
+                data = read_segmentation_stats(partial_stats_path, atlas_name)
+                frames.append(data)
+        return frames
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """
+        Returns all available statistics as a single DataFrame indexed by
+        atlas, hemisphere and region name. Measurements that are not
+        reported by some atlas are missing (NaN).
+
+        Returns
+        -------
+        pd.DataFrame
+            Anatomical statistics
+        """
+        frames = self.read_all()
+        if not frames:
+            return pd.DataFrame(columns=START_COLUMNS).set_index(self.INDICES)
+        stats = pd.concat(frames, ignore_index=True)
+        stats = stats.reindex(columns=START_COLUMNS)
+        stats["Region Name"] = (
+            stats["Region Name"].astype(str).str.replace("_and_", "&")
         )
-        return stats
+        for column_name in COLUMNS_TO_INT:
+            stats[column_name] = stats[column_name].astype("Int64")
+        return stats.set_index(self.INDICES)
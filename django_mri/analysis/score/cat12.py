@@ -0,0 +1,43 @@
+import logging
+from typing import List
+
+import nibabel as nib
+from django_analyses.models.run import Run
+from django_mri.analysis.atlas.regional_stats import get_regional_scores
+from django_mri.analysis.score.utils import ScoreEntry
+from django_mri.models.atlas import Atlas
+from django_mri.models.scan import Scan
+
+#: Output scored within each atlas label map.
+OUTPUT_KEY: str = "modulated_grey_matter"
+
+MISSING_OUTPUT: str = "Run #{run_id} has no {key} output, skipping."
+ATLAS_SKIPPED: str = "{message} Skipping."
+
+_logger = logging.getLogger("data.mri.analysis.score.cat12")
+
+
+def get_cat12_scores(run: Run) -> List[ScoreEntry]:
+    """
+    Returns the regional statistics of a CAT12 segmentation run's modulated
+    gray matter map within every atlas that has a label map in the same
+    template space.
+    """
+    path = run.get_output(OUTPUT_KEY)
+    if not path:
+        _logger.info(MISSING_OUTPUT.format(run_id=run.id, key=OUTPUT_KEY))
+        return []
+    origin = Scan.objects.filter(_nifti__path=run.get_input("path"))
+    origin_ids = tuple(origin.values_list("id", flat=True))
+    # Read the image once and share it between atlases.
+    image = nib.load(str(path))
+    entries = []
+    atlases = Atlas.objects.exclude(label_map="").exclude(label_map=None)
+    for atlas in atlases:
+        try:
+            scores = get_regional_scores(atlas, image, origin_ids=origin_ids)
+        except ValueError as e:
+            _logger.info(ATLAS_SKIPPED.format(message=e))
+        else:
+            entries += scores
+    return entries
@@ -1,35 +1,66 @@
+import logging
+from typing import List
+
 from django.apps import apps
 from django.db.models import QuerySet
 from django_analyses.models.run import Run
 from django_mri.analysis.metric.mriqc import MRIQC_METRICS
-from django_mri.models.metric import Metric
-from django_mri.models.scan import Scan
+from django_mri.analysis.parsers.cache import load_parsed_output
+from django_mri.analysis.score.utils import ScoreEntry, get_metric_map
+from django_mri.models.managers.nifti import NIFTI_SUFFIXES
+from django_mri.models.nifti import NIfTI
 
+MISSING_ORIGIN: str = "No scan found for MRIQC output '{nii_stem}', skipping."
+MISSING_METRIC: str = "Metric {metric_title} not registered, skipping."
 
-def create_mriqc_scores(run: Run) -> QuerySet:
-    Score = apps.get_model("django_mri", "Score")
-    df = run.parse_output()
-    score_ids = []
+_logger = logging.getLogger("data.mri.analysis.score.mriqc")
+
+
+def get_origin_map(nii_stems) -> dict:
+    """
+    Returns a dictionary of scan IDs by NIfTI file name stem, resolved using
+    a single (indexed) query.
+    """
+    queryset = NIfTI.objects.filter_by_stems(nii_stems).filter(
+        scan__isnull=False
+    )
+    scan_ids = dict(queryset.values_list("basename", "scan__id"))
+    origins = {}
+    for nii_stem in nii_stems:
+        for suffix in NIFTI_SUFFIXES:
+            scan_id = scan_ids.get(f"{nii_stem}{suffix}")
+            if scan_id is not None:
+                origins[nii_stem] = scan_id
+                break
+    return origins
+
+
+def get_mriqc_scores(run: Run) -> List[ScoreEntry]:
+    df = load_parsed_output(run)
+    metrics = get_metric_map(df.columns, MRIQC_METRICS)
+    for metric_title in df.columns:
+        if metric_title not in metrics:
+            _logger.info(MISSING_METRIC.format(metric_title=metric_title))
+    origins = get_origin_map(df.index)
+    entries = []
     for nii_stem, scores in df.iterrows():
-        origin = Scan.objects.get(_nifti__path__endswith=f"{nii_stem}.nii.gz")
-        for metric_title, value in scores.iteritems():
-            try:
-                metric = Metric.objects.get(title=metric_title)
-            except Metric.DoesNotExist:
-                for metric_definition in MRIQC_METRICS:
-                    Metric.objects.get_or_create(**metric_definition)
-                try:
-                    metric = Metric.objects.get(title=metric_title)
-                except Metric.DoesNotExist:
-                    print(f"Metric {metric_title} not registered, skipping.")
-                    continue
-            except Metric.MultipleObjectsReturned:
-                print(f"{metric_title} return multiple!")
-                metric = Metric.objects.filter(title=metric_title).first()
-            score, _ = Score.objects.get_or_create(
-                run=run, metric=metric, value=value
+        scan_id = origins.get(nii_stem)
+        if scan_id is None:
+            _logger.warning(MISSING_ORIGIN.format(nii_stem=nii_stem))
+            continue
+        entries += [
+            ScoreEntry(
+                metric_id=metrics[metric_title].id,
+                region_id=None,
+                value=value,
+                origin_ids=(scan_id,),
             )
-            if not score.origin.exists():
-                score.origin.set([origin])
-            score_ids.append(score.id)
-    return Score.objects.filter(id__in=score_ids)
+            for metric_title, value in scores.items()
+            if metric_title in metrics
+        ]
+    return entries
+
+
+def create_mriqc_scores(run: Run) -> QuerySet:
+    Score = apps.get_model("django_mri", "Score")
+    return Score.objects.bulk_upsert(run, get_mriqc_scores(run))
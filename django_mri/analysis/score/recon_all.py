@@ -1,41 +1,64 @@
+from typing import List
+
+import pandas as pd
 from django.apps import apps
 from django.db.models import QuerySet
 from django_analyses.models.run import Run
-from django_mri.analysis.metric.freesurfer import RECON_ALL_ANATOMICAL_STATS
-from django_mri.models.atlas import Atlas
-from django_mri.models.metric import Metric
-from django_mri.models.region import Region
+from django_mri.analysis.metric.freesurfer import (
+    RECON_ALL_ANATOMICAL_STATS,
+    RECON_ALL_SEGMENTATION_STATS,
+)
+from django_mri.analysis.parsers.cache import load_parsed_output
+from django_mri.analysis.parsers.recon_all.stats import SUBCORTICAL_ATLASES
+from django_mri.analysis.score.utils import (
+    ScoreEntry,
+    get_atlas_map,
+    get_metric_map,
+    get_region_map,
+)
 from django_mri.models.scan import Scan
 
+METRIC_DEFINITIONS = RECON_ALL_ANATOMICAL_STATS + RECON_ALL_SEGMENTATION_STATS
 
-def create_recon_all_scores(run: Run) -> QuerySet:
-    Score = apps.get_model("django_mri", "Score")
-    df = run.parse_output()
+
+def get_hemisphere(hemisphere_label) -> str:
+    # Segmentation structures may not belong to either hemisphere.
+    if isinstance(hemisphere_label, str) and hemisphere_label:
+        return hemisphere_label[0]
+
+
+def get_recon_all_scores(run: Run) -> List[ScoreEntry]:
+    df = load_parsed_output(run)
     by_metric = df.to_dict()
     origin = Scan.objects.filter(_nifti__path__in=run.get_input("T1_files"))
-    score_ids = []
-    for metric_title, region_id in by_metric.items():
-        try:
-            metric = Metric.objects.get(title=metric_title)
-        except Metric.DoesNotExist:
-            for metric_definition in RECON_ALL_ANATOMICAL_STATS:
-                Metric.objects.get_or_create(**metric_definition)
-            try:
-                metric = Metric.objects.get(title=metric_title)
-            except Metric.DoesNotExist:
-                continue
-        for key, value in region_id.items():
-            atlas_title, hemisphere_label, region_title = key
-            atlas, _ = Atlas.objects.get_or_create(title=atlas_title)
-            region, _ = Region.objects.get_or_create(
-                atlas=atlas,
-                hemisphere=hemisphere_label[0],
-                title=region_title,
-            )
-            score, _ = Score.objects.get_or_create(
-                run=run, region=region, metric=metric, value=value,
-            )
-            if not score.origin.exists():
-                score.origin.set(origin)
-            score_ids.append(score.id)
-    return Score.objects.filter(id__in=score_ids)
+    origin_ids = tuple(origin.values_list("id", flat=True))
+    metrics = get_metric_map(by_metric, METRIC_DEFINITIONS)
+    keys = {key for values in by_metric.values() for key in values}
+    atlases = get_atlas_map(atlas_title for atlas_title, _, _ in keys)
+    region_keys, subcortical = {}, set()
+    for key in keys:
+        atlas_title, hemisphere_label, region_title = key
+        atlas_id = atlases[atlas_title].id
+        hemisphere = get_hemisphere(hemisphere_label)
+        region_keys[key] = (atlas_id, hemisphere, region_title)
+        if atlas_title in SUBCORTICAL_ATLASES:
+            subcortical.add(region_keys[key])
+    regions = get_region_map(region_keys.values(), subcortical=subcortical)
+    # Measurements not reported by some atlas are missing.
+    return [
+        ScoreEntry(
+            metric_id=metrics[metric_title].id,
+            region_id=regions[region_keys[key]].id,
+            value=float(value),
+            origin_ids=origin_ids,
+        )
+        for metric_title, values in by_metric.items()
+        if metric_title in metrics
+        for key, value in values.items()
+        if not pd.isna(value)
+    ]
+
+
+def create_recon_all_scores(run: Run) -> QuerySet:
+    Score = apps.get_model("django_mri", "Score")
+    return Score.objects.bulk_upsert(run, get_recon_all_scores(run))
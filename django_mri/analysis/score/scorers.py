@@ -1,10 +1,15 @@
 from typing import Callable
 
 from django_analyses.models.run import Run
-from django_mri.analysis.score.mriqc import create_mriqc_scores
-from django_mri.analysis.score.recon_all import create_recon_all_scores
+from django_mri.analysis.score.cat12 import get_cat12_scores
+from django_mri.analysis.score.mriqc import get_mriqc_scores
+from django_mri.analysis.score.recon_all import get_recon_all_scores
 
-SCORERS = {"ReconAll": create_recon_all_scores, "MRIQC": create_mriqc_scores}
+SCORERS = {
+    "ReconAll": get_recon_all_scores,
+    "MRIQC": get_mriqc_scores,
+    "CAT12 Segmentation": get_cat12_scores,
+}
 
 
 def get_scorer(run: Run) -> Callable:
@@ -0,0 +1,145 @@
+"""
+Utilities used to create :class:`~django_mri.models.score.Score` instances
+in bulk.
+
+Atlases, regions and metrics are resolved into in-memory maps using a
+constant number of queries (creating any missing instances with
+:meth:`~django.db.models.query.QuerySet.bulk_create`), so that scorers may
+return plain :class:`ScoreEntry` tuples to be upserted in a single
+transaction (see
+:meth:`~django_mri.models.managers.score.ScoreManager.bulk_upsert`).
+"""
+from typing import Dict, Iterable, NamedTuple, Tuple
+
+from django.db.models import QuerySet
+from django_mri.models.atlas import Atlas
+from django_mri.models.metric import Metric
+from django_mri.models.region import Region
+
+#: Region lookup key (atlas ID, hemisphere, title).
+RegionKey = Tuple[int, str, str]
+
+
+class ScoreEntry(NamedTuple):
+    """
+    A single score to be created.
+    """
+
+    #: Metric ID.
+    metric_id: int
+
+    #: Region ID (optional).
+    region_id: int
+
+    #: Score value.
+    value: float
+
+    #: Origin scan IDs.
+    origin_ids: Tuple[int, ...] = ()
+
+
+def get_metric_map(
+    titles: Iterable[str], definitions: Iterable[dict] = ()
+) -> Dict[str, Metric]:
+    """
+    Returns a dictionary of metrics by title. If any of the titles is not
+    registered, the provided metric *definitions* are created (as in the
+    original per-metric implementation), and any titles still missing are
+    omitted.
+
+    Parameters
+    ----------
+    titles : Iterable[str]
+        Metric titles
+    definitions : Iterable[dict], optional
+        Metric definitions to create if a title is missing, by default ()
+
+    Returns
+    -------
+    Dict[str, Metric]
+        Metrics by title
+    """
+    titles = set(titles)
+    metrics = _first_by(Metric.objects.filter(title__in=titles), "title")
+    if titles - set(metrics) and definitions:
+        existing = set(
+            Metric.objects.filter(
+                title__in=[d["title"] for d in definitions]
+            ).values_list("title", flat=True)
+        )
+        new = [Metric(**d) for d in definitions if d["title"] not in existing]
+        for metric in Metric.objects.bulk_create(new):
+            if metric.title in titles:
+                metrics.setdefault(metric.title, metric)
+    return metrics
+
+
+def get_atlas_map(titles: Iterable[str]) -> Dict[str, Atlas]:
+    """
+    Returns a dictionary of atlases by title, creating any missing atlases.
+
+    Parameters
+    ----------
+    titles : Iterable[str]
+        Atlas titles
+
+    Returns
+    -------
+    Dict[str, Atlas]
+        Atlases by title
+    """
+    titles = set(titles)
+    atlases = _first_by(Atlas.objects.filter(title__in=titles), "title")
+    missing = [Atlas(title=title) for title in titles - set(atlases)]
+    for atlas in Atlas.objects.bulk_create(missing):
+        atlases[atlas.title] = atlas
+    return atlases
+
+
+def get_region_map(
+    keys: Iterable[RegionKey], subcortical: Iterable[RegionKey] = ()
+) -> Dict[RegionKey, Region]:
+    """
+    Returns a dictionary of regions by (atlas ID, hemisphere, title),
+    creating any missing regions.
+
+    Parameters
+    ----------
+    keys : Iterable[RegionKey]
+        Region keys
+    subcortical : Iterable[RegionKey], optional
+        Keys of regions to flag as subcortical if created, by default ()
+
+    Returns
+    -------
+    Dict[RegionKey, Region]
+        Regions by key
+    """
+    keys = set(keys)
+    atlas_ids = {atlas_id for atlas_id, _, _ in keys}
+    queryset = Region.objects.filter(atlas_id__in=atlas_ids).order_by("id")
+    regions = {}
+    for region in queryset:
+        key = (region.atlas_id, region.hemisphere, region.title)
+        if key in keys:
+            regions.setdefault(key, region)
+    subcortical = set(subcortical)
+    missing = [
+        Region(
+            atlas_id=atlas_id,
+            hemisphere=hemisphere,
+            title=title,
+            subcortical=(atlas_id, hemisphere, title) in subcortical,
+        )
+        for atlas_id, hemisphere, title in keys - set(regions)
+    ]
+    for region in Region.objects.bulk_create(missing):
+        regions[(region.atlas_id, region.hemisphere, region.title)] = region
+    return regions
+
+
+def _first_by(queryset: QuerySet, field: str) -> dict:
+    instances = {}
+    for instance in queryset.order_by("id"):
+        instances.setdefault(getattr(instance, field), instance)
+    return instances
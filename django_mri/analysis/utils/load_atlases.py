@@ -3,4 +3,4 @@ from django_mri.models.atlas import Atlas
 
 
 def load_atlases():
-    return Atlas.objects.from_list(ATLAS_DEFINITIONS)
+    return Atlas.objects.bulk_load(ATLAS_DEFINITIONS)
@@ -5,7 +5,4 @@ from django_mri.models.metric import Metric
 
 
 def load_metrics() -> List[Tuple[Metric, bool]]:
-    return [
-        Metric.objects.get_or_create(**metric_definition)
-        for metric_definition in METRIC_DEFINITIONS
-    ]
+    return Metric.objects.bulk_load(METRIC_DEFINITIONS)
@@ -16,6 +16,9 @@ For more information, see:
    https://django-filter.readthedocs.io/en/stable/guide/rest_framework.html
 """
 
+from django_mri.filters.acquisition_summary_filter import (
+    AcquisitionSummaryFilter,
+)
 from django_mri.filters.atlas_filter import AtlasFilter
 from django_mri.filters.irb_approval_filter import IrbApprovalFilter
 from django_mri.filters.metric_filter import MetricFilter
@@ -0,0 +1,25 @@
+"""
+Definition of the :class:`AcquisitionSummaryFilter` class.
+"""
+from django_filters import rest_framework as filters
+from django_mri.models.acquisition_summary import AcquisitionSummary
+
+
+class AcquisitionSummaryFilter(filters.FilterSet):
+    """
+    Provides useful filtering options for the
+    :class:`~django_mri.models.acquisition_summary.AcquisitionSummary`
+    class.
+    """
+
+    month = filters.DateFromToRangeFilter()
+
+    class Meta:
+        model = AcquisitionSummary
+        fields = (
+            "month",
+            "measurement",
+            "study",
+            "group",
+            "sequence_type",
+        )
@@ -0,0 +1,32 @@
+# Generated by Django 4.1 on 2026-10-19 09:12
+
+from django.db import migrations, models
+import django_extensions.db.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_mri', '0023_auto_20220313_1457'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BidsValidation',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', django_extensions.db.fields.CreationDateTimeField(auto_now_add=True, verbose_name='created')),
+                ('modified', django_extensions.db.fields.ModificationDateTimeField(auto_now=True, verbose_name='modified')),
+                ('path', models.FilePathField(help_text='Path of the validated data file within the BIDS directory.', max_length=1000, unique=True)),
+                ('subject', models.CharField(db_index=True, help_text="BIDS subject label (without the 'sub-' prefix).", max_length=64)),
+                ('mtime', models.FloatField(blank=True, help_text='Latest modification time of the data file and its sidecar when last validated.', null=True)),
+                ('is_valid', models.BooleanField(default=False, help_text='Whether the file passed validation or not.')),
+                ('errors', models.JSONField(blank=True, default=list, help_text='Validation errors found in the last validation pass.')),
+                ('is_stale', models.BooleanField(db_index=True, default=True, help_text='Whether the file changed since it was last validated.')),
+            ],
+            options={
+                'verbose_name': 'BIDS Validation',
+                'ordering': ('path',),
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.1 on 2026-10-19 11:40
+
+from django.conf import settings
+import django.contrib.postgres.fields
+from django.db import migrations, models
+import django.db.models.deletion
+import django_extensions.db.fields
+import django_mri.models.export_job
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('django_mri', '0024_bidsvalidation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportJob',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', django_extensions.db.fields.CreationDateTimeField(auto_now_add=True, verbose_name='created')),
+                ('modified', django_extensions.db.fields.ModificationDateTimeField(auto_now=True, verbose_name='modified')),
+                ('file_formats', django.contrib.postgres.fields.ArrayField(base_field=models.CharField(max_length=10), default=django_mri.models.export_job.get_default_file_formats, help_text='File formats included in the exported archive.', size=None)),
+                ('archive_format', models.CharField(choices=[('zip', 'zip'), ('tar', 'tar')], default='zip', help_text='Exported archive format.', max_length=3)),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('RUNNING', 'Running'), ('DONE', 'Done'), ('FAILED', 'Failed')], default='PENDING', help_text='Current status of this export job.', max_length=7)),
+                ('progress', models.FloatField(default=0, help_text='Fraction of the data that was already written to the archive.')),
+                ('size', models.BigIntegerField(blank=True, help_text='Size of the exported archive in bytes.', null=True)),
+                ('error', models.TextField(blank=True, help_text='Error message in case the export failed.', null=True)),
+                ('scans', models.ManyToManyField(blank=True, help_text='Scans included in the exported archive.', to='django_mri.scan')),
+                ('user', models.ForeignKey(blank=True, help_text='The user that requested this export.', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='mri_export_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ('-created',),
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.1 on 2026-10-19 15:02
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.MEASUREMENT_MODEL),
+        migrations.swappable_dependency(settings.STUDY_GROUP_MODEL),
+        migrations.swappable_dependency(settings.STUDY_MODEL),
+        ('django_mri', '0025_exportjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AcquisitionSummary',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(db_index=True, help_text='First day of the month in which the counted sessions were acquired.')),
+                ('sequence_type', models.CharField(blank=True, help_text='Sequence type of the counted scans.', max_length=64, null=True)),
+                ('grouping', models.PositiveSmallIntegerField(db_index=True, help_text='Bitmask of the study, group and sequence type dimensions aggregated in this row (in that order, most significant bit first).')),
+                ('scan_count', models.PositiveIntegerField(help_text='Number of scans.')),
+                ('session_count', models.PositiveIntegerField(help_text='Number of distinct sessions.')),
+                ('group', models.ForeignKey(blank=True, help_text='Study group of the counted scans.', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.STUDY_GROUP_MODEL)),
+                ('measurement', models.ForeignKey(blank=True, help_text='Measurement definition of the counted sessions.', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.MEASUREMENT_MODEL)),
+                ('study', models.ForeignKey(blank=True, help_text="Study of the counted scans' study groups.", null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.STUDY_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'Acquisition summaries',
+                'ordering': ('-month',),
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.1 on 2026-10-19 16:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_mri', '0026_acquisitionsummary'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='nifti',
+            index=models.Index(models.Func(models.F('path'), models.Value('^.*/'), models.Value(''), function='REGEXP_REPLACE', output_field=models.CharField()), name='django_mri_nifti_basename'),
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 4.1 on 2026-10-19 17:02
+
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def remove_duplicate_scores(apps, schema_editor):
+    """
+    Keeps only the latest regional score of each run, metric and region
+    (previously, scores with differing values were created side by side).
+    """
+    Score = apps.get_model("django_mri", "Score")
+    duplicates = (
+        Score.objects.filter(region__isnull=False)
+        .values("run", "metric", "region")
+        .annotate(latest=Max("id"), count=Count("id"))
+        .filter(count__gt=1)
+    )
+    for duplicate in duplicates.iterator():
+        Score.objects.filter(
+            run=duplicate["run"],
+            metric=duplicate["metric"],
+            region=duplicate["region"],
+        ).exclude(id=duplicate["latest"]).delete()
+
+
+class Migration(migrations.Migration):
+
+    # Deleting duplicates leaves deferred foreign key checks pending, and
+    # PostgreSQL refuses to alter a table with pending trigger events in the
+    # same transaction. The data step is committed before the constraint is
+    # added instead (removing duplicates again is harmless if it fails).
+    atomic = False
+
+    dependencies = [
+        ('django_mri', '0027_nifti_basename_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            remove_duplicate_scores, reverse_code=migrations.RunPython.noop
+        ),
+        migrations.AddConstraint(
+            model_name='score',
+            constraint=models.UniqueConstraint(fields=('run', 'metric', 'region'), name='django_mri_score_unique_run_metric_region'),
+        ),
+    ]
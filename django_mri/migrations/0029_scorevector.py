@@ -0,0 +1,31 @@
+# Generated by Django 4.1 on 2026-10-19 17:40
+
+import django.contrib.postgres.fields
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_analyses', '0014_auto_20220130_1027'),
+        ('django_mri', '0028_score_unique_run_metric_region'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScoreVector',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('values', django.contrib.postgres.fields.ArrayField(base_field=models.FloatField(null=True), help_text="Calculated score values, ordered by the atlas's region IDs.", size=None)),
+                ('atlas', models.ForeignKey(help_text='The atlas to whose regions the values are aligned.', on_delete=django.db.models.deletion.CASCADE, to='django_mri.atlas')),
+                ('metric', models.ForeignKey(help_text='The metric represented by this score.', on_delete=django.db.models.deletion.CASCADE, to='django_mri.metric')),
+                ('origin', models.ManyToManyField(help_text='The scan or scans from which this score was derived.', to='django_mri.scan')),
+                ('run', models.ForeignKey(help_text='The run from which this score was exrtacted.', on_delete=django.db.models.deletion.CASCADE, to='django_analyses.run')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='scorevector',
+            constraint=models.UniqueConstraint(fields=('run', 'metric', 'atlas'), name='django_mri_scorevector_unique_run_metric_atlas'),
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 4.1 on 2026-10-19 18:15
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.db.models.functions.comparison
+
+
+def rebuild_normative_statistics(apps, schema_editor):
+    """
+    Backfills the statistics of existing scores, so that re-scoring a run
+    (which removes its previous scores first) leaves them consistent.
+    """
+    # Statistics are computed by the current models' custom querysets,
+    # which historical models do not provide.
+    from django_mri.models import NormativeStatistics
+
+    NormativeStatistics.objects.rebuild()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_analyses', '0014_auto_20220130_1027'),
+        ('django_mri', '0029_scorevector'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NormativeStatistics',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sex', models.CharField(blank=True, default='', help_text='The sex of the subjects from which the scores were derived (blank if unknown).', max_length=5)),
+                ('age_bin', models.FloatField(blank=True, help_text='Lower bound of the age bin (in years) of the subjects from which the scores were derived.', null=True)),
+                ('count', models.PositiveIntegerField(default=0, help_text='Number of scores included.')),
+                ('mean', models.FloatField(default=0, help_text='Mean score value.')),
+                ('m2', models.FloatField(default=0, help_text='Sum of squared differences of the scores from their mean.')),
+                ('analysis_version', models.ForeignKey(help_text='The analysis version from which the scores were derived.', on_delete=django.db.models.deletion.CASCADE, to='django_analyses.analysisversion')),
+                ('metric', models.ForeignKey(help_text='The metric represented by the scores.', on_delete=django.db.models.deletion.CASCADE, to='django_mri.metric')),
+                ('region', models.ForeignKey(blank=True, help_text='The brain region for which the scores were calculated.', null=True, on_delete=django.db.models.deletion.CASCADE, to='django_mri.region')),
+            ],
+            options={
+                'verbose_name_plural': 'Normative statistics',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='normativestatistics',
+            constraint=models.UniqueConstraint(models.F('analysis_version'), models.F('metric'), django.db.models.functions.comparison.Coalesce('region', models.Value(0)), models.F('sex'), django.db.models.functions.comparison.Coalesce('age_bin', models.Value(-1.0)), name='django_mri_normativestatistics_unique_group'),
+        ),
+        migrations.RunPython(
+            rebuild_normative_statistics,
+            reverse_code=migrations.RunPython.noop,
+        ),
+    ]
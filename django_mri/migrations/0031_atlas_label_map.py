@@ -0,0 +1,18 @@
+# Generated by Django 4.1 on 2026-10-19 19:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_mri', '0030_normativestatistics'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='atlas',
+            name='label_map',
+            field=models.FileField(blank=True, help_text='A NIfTI label map assigning each voxel the index of its region (0 for background).', max_length=1000, null=True, upload_to='mri/atlases/'),
+        ),
+    ]
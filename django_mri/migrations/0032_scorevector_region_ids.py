@@ -0,0 +1,49 @@
+# Generated by Django 4.1 on 2026-10-19 21:14
+
+import django.contrib.postgres.fields
+from django.db import migrations, models
+
+
+def set_region_ids(apps, schema_editor):
+    """
+    Sets the region IDs of existing score vectors, which were aligned to
+    their atlas's regions ordered by primary key.
+    """
+    ScoreVector = apps.get_model("django_mri", "ScoreVector")
+    Region = apps.get_model("django_mri", "Region")
+    region_ids = {}
+    vectors = ScoreVector.objects.order_by("atlas_id")
+    for vector in vectors.iterator():
+        if vector.atlas_id not in region_ids:
+            region_ids[vector.atlas_id] = list(
+                Region.objects.filter(atlas_id=vector.atlas_id)
+                .order_by("id")
+                .values_list("id", flat=True)
+            )
+        vector.region_ids = region_ids[vector.atlas_id][: len(vector.values)]
+        vector.values = vector.values[: len(vector.region_ids)]
+        vector.save(update_fields=["region_ids", "values"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_mri', '0031_atlas_label_map'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scorevector',
+            name='region_ids',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.IntegerField(), default=list, help_text='The IDs of the regions to which the values are aligned.', size=None),
+            preserve_default=False,
+        ),
+        migrations.AlterField(
+            model_name='scorevector',
+            name='values',
+            field=django.contrib.postgres.fields.ArrayField(base_field=models.FloatField(null=True), help_text='Calculated score values, aligned to the region IDs.', size=None),
+        ),
+        migrations.RunPython(
+            set_region_ids, reverse_code=migrations.RunPython.noop
+        ),
+    ]
@@ -5,8 +5,11 @@ Definition of the app's models_.
    https://docs.djangoproject.com/en/3.0/topics/db/models/
 """
 
+from django_mri.models.acquisition_summary import AcquisitionSummary
 from django_mri.models.atlas import Atlas
+from django_mri.models.bids_validation import BidsValidation
 from django_mri.models.data_directory import DataDirectory
+from django_mri.models.export_job import ExportJob
 from django_mri.models.inputs.nifti_input import NiftiInput
 from django_mri.models.inputs.nifti_input_definition import (
     NiftiInputDefinition,
@@ -16,6 +19,7 @@ from django_mri.models.inputs.scan_input_definition import ScanInputDefinition
 from django_mri.models.irb_approval import IrbApproval
 from django_mri.models.metric import Metric
 from django_mri.models.nifti import NIfTI
+from django_mri.models.normative_statistics import NormativeStatistics
 from django_mri.models.outputs.nifti_output import NiftiOutput
 from django_mri.models.outputs.nifti_output_definition import (
     NiftiOutputDefinition,
@@ -23,6 +27,7 @@ from django_mri.models.outputs.nifti_output_definition import (
 from django_mri.models.region import Region
 from django_mri.models.scan import Scan
 from django_mri.models.score import Score
+from django_mri.models.score_vector import ScoreVector
 from django_mri.models.session import Session
 
 # flake8: noqa: F401
@@ -0,0 +1,94 @@
+"""
+Definition of the :class:`AcquisitionSummary` model.
+"""
+from django.db import models
+from django_mri.models import help_text
+from django_mri.models.managers.acquisition_summary import (
+    AcquisitionSummaryQuerySet,
+)
+from django_mri.utils import (
+    get_group_model,
+    get_measurement_model,
+    get_study_model,
+)
+
+Group = get_group_model()
+MeasurementDefinition = get_measurement_model()
+Study = get_study_model()
+
+
+class AcquisitionSummary(models.Model):
+    """
+    Materialized scan and session counts by acquisition month, measurement
+    definition, study, study group and sequence type.
+
+    Counts are precomputed for every combination of the study, group and
+    sequence type dimensions (with any of them aggregated, as indicated by
+    :attr:`grouping`), so that session counts, which are not additive across
+    these dimensions, are always exact. Month and measurement counts are
+    additive and may simply be summed.
+
+    Rows are refreshed by month whenever scans or sessions are saved or
+    deleted (see :mod:`django_mri.signals`), and may be rebuilt entirely
+    using the :func:`~django_mri.tasks.refresh_acquisition_summary` task.
+    """
+
+    month = models.DateField(db_index=True, help_text=help_text.SUMMARY_MONTH)
+    measurement = models.ForeignKey(
+        MeasurementDefinition,
+        on_delete=models.CASCADE,
+        blank=True,
+        null=True,
+        related_name="+",
+        help_text=help_text.SUMMARY_MEASUREMENT,
+    )
+    study = models.ForeignKey(
+        Study,
+        on_delete=models.CASCADE,
+        blank=True,
+        null=True,
+        related_name="+",
+        help_text=help_text.SUMMARY_STUDY,
+    )
+    group = models.ForeignKey(
+        Group,
+        on_delete=models.CASCADE,
+        blank=True,
+        null=True,
+        related_name="+",
+        help_text=help_text.SUMMARY_GROUP,
+    )
+    sequence_type = models.CharField(
+        max_length=64,
+        blank=True,
+        null=True,
+        help_text=help_text.SUMMARY_SEQUENCE_TYPE,
+    )
+    grouping = models.PositiveSmallIntegerField(
+        db_index=True, help_text=help_text.SUMMARY_GROUPING
+    )
+    scan_count = models.PositiveIntegerField(
+        help_text=help_text.SUMMARY_SCAN_COUNT
+    )
+    session_count = models.PositiveIntegerField(
+        help_text=help_text.SUMMARY_SESSION_COUNT
+    )
+
+    objects = AcquisitionSummaryQuerySet.as_manager()
+
+    class Meta:
+        ordering = ("-month",)
+        verbose_name_plural = "Acquisition summaries"
+
+    def __str__(self) -> str:
+        """
+        Returns the string representation of this instance.
+
+        Returns
+        -------
+        str
+            String representation
+        """
+        month = self.month.strftime("%Y-%m")
+        counts = f"{self.session_count} sessions, {self.scan_count} scans"
+        return f"{month}: {counts}"
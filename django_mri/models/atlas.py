@@ -28,9 +28,15 @@ class Atlas(models.Model):
         help_text=help_text.ATLAS_SYMMETRIC,
     )
 
-    objects = AtlasQuerySet.as_manager()
+    label_map = models.FileField(
+        max_length=1000,
+        upload_to="mri/atlases/",
+        blank=True,
+        null=True,
+        help_text=help_text.ATLAS_LABEL_MAP,
+    )
 
-    # TODO: Add field to point to file.
+    objects = AtlasQuerySet.as_manager()
 
     class Meta:
         verbose_name_plural = "Atlases"
@@ -0,0 +1,60 @@
+"""
+Definition of the :class:`BidsValidation` model.
+"""
+from django.db import models
+from django_extensions.db.models import TimeStampedModel
+from django_mri.models import help_text
+from django_mri.models.managers.bids_validation import BidsValidationQuerySet
+
+
+class BidsValidation(TimeStampedModel):
+    """
+    Caches the validation state of a single data file within the BIDS
+    directory, so that only files that changed since the last pass have to be
+    validated again.
+
+    See Also
+    --------
+    * :class:`~django_mri.utils.bids_validation.BidsValidator`
+    """
+
+    path = models.FilePathField(
+        max_length=1000, unique=True, help_text=help_text.BIDS_VALIDATION_PATH
+    )
+    subject = models.CharField(
+        max_length=64,
+        db_index=True,
+        help_text=help_text.BIDS_VALIDATION_SUBJECT,
+    )
+    mtime = models.FloatField(
+        blank=True, null=True, help_text=help_text.BIDS_VALIDATION_MTIME
+    )
+    is_valid = models.BooleanField(
+        default=False, help_text=help_text.BIDS_VALIDATION_IS_VALID
+    )
+    errors = models.JSONField(
+        default=list, blank=True, help_text=help_text.BIDS_VALIDATION_ERRORS
+    )
+    is_stale = models.BooleanField(
+        default=True,
+        db_index=True,
+        help_text=help_text.BIDS_VALIDATION_IS_STALE,
+    )
+
+    objects = BidsValidationQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "BIDS Validation"
+        ordering = ("path",)
+
+    def __str__(self) -> str:
+        """
+        Returns the string representation of this instance.
+
+        Returns
+        -------
+        str
+            String representation
+        """
+        state = "valid" if self.is_valid else "invalid"
+        return f"{self.path} ({state})"
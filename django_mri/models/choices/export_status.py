@@ -0,0 +1,11 @@
+"""
+Definition of the :class:`ExportStatus` choice Enum.
+"""
+from dicom_parser.utils.choice_enum import ChoiceEnum
+
+
+class ExportStatus(ChoiceEnum):
+    PENDING = "Pending"
+    RUNNING = "Running"
+    DONE = "Done"
+    FAILED = "Failed"
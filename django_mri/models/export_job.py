@@ -0,0 +1,196 @@
+"""
+Definition of the :class:`ExportJob` model.
+"""
+import logging
+import time
+from pathlib import Path
+from typing import List
+
+from django.conf import settings
+from django.contrib.postgres.fields import ArrayField
+from django.db import models
+from django_extensions.db.models import TimeStampedModel
+from django_mri.models import help_text
+from django_mri.models.choices.export_status import ExportStatus
+from django_mri.utils.archive import (
+    ARCHIVE_FORMATS,
+    ZIP,
+    ArchiveEntry,
+    ArchiveStream,
+)
+from django_mri.utils.utils import get_export_root
+
+#: Minimal interval (in seconds) between progress updates.
+PROGRESS_UPDATE_INTERVAL: float = 2.0
+
+#: Default exported file formats.
+DEFAULT_FILE_FORMATS = ["nifti"]
+
+
+def get_default_file_formats() -> List[str]:
+    return list(DEFAULT_FILE_FORMATS)
+
+
+class ExportJob(TimeStampedModel):
+    """
+    Represents a request to export the data files of a number of scans as a
+    single archive. The archive is built by a background task (see
+    :func:`~django_mri.tasks.build_export`) into the export root directory
+    and may then be downloaded with support for resuming.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        related_name="mri_export_jobs",
+        help_text=help_text.EXPORT_JOB_USER,
+    )
+    scans = models.ManyToManyField(
+        "django_mri.Scan", blank=True, help_text=help_text.EXPORT_JOB_SCANS
+    )
+    file_formats = ArrayField(
+        models.CharField(max_length=10),
+        default=get_default_file_formats,
+        help_text=help_text.EXPORT_JOB_FILE_FORMATS,
+    )
+    archive_format = models.CharField(
+        max_length=3,
+        choices=[(f, f) for f in ARCHIVE_FORMATS],
+        default=ZIP,
+        help_text=help_text.EXPORT_JOB_ARCHIVE_FORMAT,
+    )
+    status = models.CharField(
+        max_length=7,
+        choices=ExportStatus.choices(),
+        default=ExportStatus.PENDING.name,
+        help_text=help_text.EXPORT_JOB_STATUS,
+    )
+    progress = models.FloatField(
+        default=0, help_text=help_text.EXPORT_JOB_PROGRESS
+    )
+    size = models.BigIntegerField(
+        blank=True, null=True, help_text=help_text.EXPORT_JOB_SIZE
+    )
+    error = models.TextField(
+        blank=True, null=True, help_text=help_text.EXPORT_JOB_ERROR
+    )
+
+    _logger = logging.getLogger("data.mri.export")
+
+    class Meta:
+        ordering = ("-created",)
+
+    def __str__(self) -> str:
+        """
+        Returns the string representation of this instance.
+
+        Returns
+        -------
+        str
+            String representation
+        """
+        return f"Export #{self.id} ({self.get_status_display()})"
+
+    def get_entries(self) -> List[ArchiveEntry]:
+        """
+        Returns the exported files' archive entries, named by their path
+        relative to MEDIA_ROOT.
+
+        Returns
+        -------
+        List[ArchiveEntry]
+            Archive entries
+        """
+        media_root = Path(settings.MEDIA_ROOT)
+        queryset = self.scans.select_related("_nifti", "dicom")
+        entries, seen = [], set()
+        for scan in queryset:
+            for file_format in self.file_formats:
+                # DICOM files barely compress, so they are stored as-is.
+                stored = file_format.lower() == "dicom"
+                for path in scan.get_file_paths(file_format=file_format):
+                    path = Path(path)
+                    name = path.relative_to(media_root).as_posix()
+                    if name not in seen:
+                        seen.add(name)
+                        entries.append(
+                            ArchiveEntry(name=name, path=path, stored=stored)
+                        )
+        return entries
+
+    def update_progress(self, stream: ArchiveStream) -> None:
+        """
+        Saves the archive stream's progress, at most once every
+        :attr:`PROGRESS_UPDATE_INTERVAL` seconds.
+
+        Parameters
+        ----------
+        stream : ArchiveStream
+            Archive stream being written
+        """
+        now = time.monotonic()
+        if now - getattr(self, "_last_update", 0) < PROGRESS_UPDATE_INTERVAL:
+            return
+        self._last_update = now
+        self.progress = stream.progress
+        ExportJob.objects.filter(id=self.id).update(progress=self.progress)
+
+    def set_status(self, status: ExportStatus, **kwargs) -> None:
+        self.status = status.name
+        for key, value in kwargs.items():
+            setattr(self, key, value)
+        update_fields = ["status", "modified", *kwargs]
+        self.save(update_fields=update_fields)
+
+    def build(self) -> Path:
+        """
+        Builds the exported archive.
+
+        Returns
+        -------
+        Path
+            Archive path
+        """
+        self.set_status(ExportStatus.RUNNING, progress=0, error=None)
+        try:
+            stream = ArchiveStream(
+                self.get_entries(), archive_format=self.archive_format
+            )
+            path = stream.write_to(self.path, callback=self.update_progress)
+        except Exception as e:
+            self._logger.warning(f"Export #{self.id} failed: {e}")
+            self.set_status(ExportStatus.FAILED, error=str(e))
+            raise
+        self.set_status(
+            ExportStatus.DONE, progress=1, size=path.stat().st_size
+        )
+        return path
+
+    def delete_file(self) -> None:
+        """
+        Removes the exported archive, if it exists.
+        """
+        if self.path.is_file():
+            self.path.unlink()
+
+    @property
+    def path(self) -> Path:
+        """
+        Returns the path of the exported archive.
+
+        Returns
+        -------
+        Path
+            Archive path
+        """
+        return get_export_root() / f"{self.id}.{self.archive_format}"
+
+    @property
+    def file_name(self) -> str:
+        return self.path.name
+
+    @property
+    def is_done(self) -> bool:
+        return self.status == ExportStatus.DONE.name
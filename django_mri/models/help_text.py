@@ -22,6 +22,7 @@ SESSION_COMMENTS: str = "General comments about MRI scanning session."
 ATLAS_TITLE: str = "The title of this atlas."
 ATLAS_DESCRIPTION: str = "A description of this atlas."
 ATLAS_SYMMETRIC: str = "Whether this atlas is symmetric or not."
+ATLAS_LABEL_MAP: str = "A NIfTI label map assigning each voxel the index of its region (0 for background)."
 
 REGION_ATLAS: str = "The atlas in which the region is defined."
 REGION_HEMISPHERE: str = "The hemisphere in which this region is defined."
@@ -35,9 +36,46 @@ SCORE_REGION: str = "The brain region for which this score was calculated."
 SCORE_METRIC: str = "The metric represented by this score."
 SCORE_VALUE: str = "Calculated score value."
 SCORE_RUN: str = "The run from which this score was exrtacted."
+SCORE_VECTOR_ATLAS: str = "The atlas to whose regions the values are aligned."
+SCORE_VECTOR_REGION_IDS: str = "The IDs of the regions to which the values are aligned."
+SCORE_VECTOR_VALUES: str = "Calculated score values, aligned to the region IDs."
+
+NORMATIVE_ANALYSIS_VERSION: str = "The analysis version from which the scores were derived."
+NORMATIVE_METRIC: str = "The metric represented by the scores."
+NORMATIVE_REGION: str = "The brain region for which the scores were calculated."
+NORMATIVE_SEX: str = "The sex of the subjects from which the scores were derived (blank if unknown)."
+NORMATIVE_AGE_BIN: str = "Lower bound of the age bin (in years) of the subjects from which the scores were derived."
+NORMATIVE_COUNT: str = "Number of scores included."
+NORMATIVE_MEAN: str = "Mean score value."
+NORMATIVE_M2: str = "Sum of squared differences of the scores from their mean."
 
 METRIC_TITLE: str = "A title for this metric."
 METRIC_DESCRIPTION: str = "A description of this metric's meaning and significance."
 
+BIDS_VALIDATION_PATH: str = "Path of the validated data file within the BIDS directory."
+BIDS_VALIDATION_SUBJECT: str = "BIDS subject label (without the 'sub-' prefix)."
+BIDS_VALIDATION_MTIME: str = "Latest modification time of the data file and its sidecar when last validated."
+BIDS_VALIDATION_IS_VALID: str = "Whether the file passed validation or not."
+BIDS_VALIDATION_ERRORS: str = "Validation errors found in the last validation pass."
+BIDS_VALIDATION_IS_STALE: str = "Whether the file changed since it was last validated."
+
+EXPORT_JOB_USER: str = "The user that requested this export."
+EXPORT_JOB_SCANS: str = "Scans included in the exported archive."
+EXPORT_JOB_FILE_FORMATS: str = "File formats included in the exported archive."
+EXPORT_JOB_ARCHIVE_FORMAT: str = "Exported archive format."
+EXPORT_JOB_STATUS: str = "Current status of this export job."
+EXPORT_JOB_PROGRESS: str = "Fraction of the data that was already written to the archive."
+EXPORT_JOB_SIZE: str = "Size of the exported archive in bytes."
+EXPORT_JOB_ERROR: str = "Error message in case the export failed."
+
+SUMMARY_MONTH: str = "First day of the month in which the counted sessions were acquired."
+SUMMARY_MEASUREMENT: str = "Measurement definition of the counted sessions."
+SUMMARY_STUDY: str = "Study of the counted scans' study groups."
+SUMMARY_GROUP: str = "Study group of the counted scans."
+SUMMARY_SEQUENCE_TYPE: str = "Sequence type of the counted scans."
+SUMMARY_GROUPING: str = "Bitmask of the study, group and sequence type dimensions aggregated in this row (in that order, most significant bit first)."
+SUMMARY_SCAN_COUNT: str = "Number of scans."
+SUMMARY_SESSION_COUNT: str = "Number of distinct sessions."
+
 
 # flake8: noqa: E501
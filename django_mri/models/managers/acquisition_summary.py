@@ -0,0 +1,266 @@
+"""
+Definition of the :class:`AcquisitionSummaryQuerySet` class.
+"""
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Tuple
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import QuerySet, Sum
+from django.utils import timezone
+
+#: Summary dimensions.
+DIMENSIONS: Tuple[str] = (
+    "month",
+    "measurement",
+    "study",
+    "group",
+    "sequence_type",
+)
+
+#: Dimensions by which counts are not additive, and are therefore
+#: precomputed for every combination (see :attr:`REFRESH_SQL`).
+CUBE_DIMENSIONS: Tuple[str] = ("study", "group", "sequence_type")
+
+INVALID_DIMENSION: str = "Invalid summary dimension '{dimension}'! Valid dimensions are: {valid}."  # noqa: E501
+
+REFRESH_SQL: str = """
+INSERT INTO {summary} ({summary_columns})
+SELECT
+    date_trunc('month', session.{time}{time_zone})::date AS summary_month,
+    session.{measurement},
+    study_group.{study},
+    scan_group.{group},
+    series.{sequence_type},
+    GROUPING(study_group.{study}, scan_group.{group}, series.{sequence_type}),
+    COUNT(DISTINCT scan.{scan_pk}),
+    COUNT(DISTINCT session.{session_pk})
+FROM {scan_table} scan
+INNER JOIN {session_table} session
+    ON session.{session_pk} = scan.{scan_session}
+LEFT OUTER JOIN {scan_groups_table} scan_group
+    ON scan_group.{group_scan} = scan.{scan_pk}
+LEFT OUTER JOIN {group_table} study_group
+    ON study_group.{group_pk} = scan_group.{group}
+LEFT OUTER JOIN {series_table} series
+    ON series.{series_pk} = scan.{scan_dicom}
+{condition}
+GROUP BY
+    summary_month,
+    session.{measurement},
+    CUBE(study_group.{study}, scan_group.{group}, series.{sequence_type})
+"""  # noqa: E501
+
+#: Serializes concurrent refreshes (reads are not blocked), so that rows
+#: inserted by one are deleted by the other rather than duplicated.
+LOCK_SQL: str = "LOCK TABLE {summary} IN EXCLUSIVE MODE"
+
+
+def get_month(value: datetime) -> date:
+    """
+    Returns the first day of the (local) month of the provided time.
+    """
+    if timezone.is_aware(value):
+        value = timezone.localtime(value)
+    return value.date().replace(day=1)
+
+
+def get_next_month(month: date) -> date:
+    if month.month == 12:
+        return month.replace(year=month.year + 1, month=1)
+    return month.replace(month=month.month + 1)
+
+
+def get_grouping(dimensions: Iterable[str]) -> int:
+    """
+    Returns the grouping bitmask of summary rows in which only the provided
+    dimensions (out of :attr:`CUBE_DIMENSIONS`) are not aggregated, as
+    returned by PostgreSQL's GROUPING() function.
+    """
+    dimensions = set(dimensions)
+    n_dimensions = len(CUBE_DIMENSIONS)
+    return sum(
+        1 << (n_dimensions - 1 - i)
+        for i, dimension in enumerate(CUBE_DIMENSIONS)
+        if dimension not in dimensions
+    )
+
+
+class AcquisitionSummaryQuerySet(QuerySet):
+    """
+    Custom QuerySet methods for the
+    :class:`~django_mri.models.acquisition_summary.AcquisitionSummary`
+    model.
+    """
+
+    def get_refresh_sql(self, bounded: bool = False) -> str:
+        """
+        Returns the SQL used to insert recalculated summary rows, optionally
+        limited to sessions acquired within some time range.
+
+        Parameters
+        ----------
+        bounded : bool, optional
+            Whether to include start and end time parameters, by default
+            False
+
+        Returns
+        -------
+        str
+            Refresh SQL
+        """
+        quote = connection.ops.quote_name
+        Scan = apps.get_model("django_mri", "Scan")
+        Session = apps.get_model("django_mri", "Session")
+        scan_groups = Scan._meta.get_field("study_groups")
+        Group = scan_groups.related_model
+        Series = Scan._meta.get_field("dicom").related_model
+        summary_columns = [
+            self.model._meta.get_field(name).column
+            for name in (
+                "month",
+                "measurement",
+                "study",
+                "group",
+                "sequence_type",
+                "grouping",
+                "scan_count",
+                "session_count",
+            )
+        ]
+        time = quote(Session._meta.get_field("time").column)
+        condition = (
+            f"WHERE session.{time} >= %s AND session.{time} < %s"
+            if bounded
+            else ""
+        )
+        return REFRESH_SQL.format(
+            summary=quote(self.model._meta.db_table),
+            summary_columns=", ".join(map(quote, summary_columns)),
+            time=time,
+            time_zone=" AT TIME ZONE %s" if settings.USE_TZ else "",
+            measurement=quote(Session._meta.get_field("measurement").column),
+            study=quote(Group._meta.get_field("study").column),
+            group=quote(scan_groups.m2m_reverse_name()),
+            sequence_type=quote(
+                Series._meta.get_field("sequence_type").column
+            ),
+            scan_pk=quote(Scan._meta.pk.column),
+            session_pk=quote(Session._meta.pk.column),
+            scan_table=quote(Scan._meta.db_table),
+            session_table=quote(Session._meta.db_table),
+            scan_session=quote(Scan._meta.get_field("session").column),
+            scan_groups_table=quote(scan_groups.m2m_db_table()),
+            group_scan=quote(scan_groups.m2m_column_name()),
+            group_table=quote(Group._meta.db_table),
+            group_pk=quote(Group._meta.pk.column),
+            series_table=quote(Series._meta.db_table),
+            series_pk=quote(Series._meta.pk.column),
+            scan_dicom=quote(Scan._meta.get_field("dicom").column),
+            condition=condition,
+        )
+
+    def refresh(self, start: date = None, end: date = None) -> int:
+        """
+        Recalculates the summary rows of sessions acquired between *start*
+        (inclusive) and *end* (exclusive), or all rows if no range is
+        provided. The summary table is locked against concurrent writes
+        until the transaction is committed.
+
+        Parameters
+        ----------
+        start : date, optional
+            First day of the first refreshed month, by default None
+        end : date, optional
+            First day of the month following the last refreshed month, by
+            default None
+
+        Returns
+        -------
+        int
+            Number of created summary rows
+        """
+        params = []
+        if settings.USE_TZ:
+            params.append(timezone.get_current_timezone_name())
+        rows = self.model.objects.all()
+        bounded = start is not None and end is not None
+        if bounded:
+            rows = rows.filter(month__gte=start, month__lt=end)
+            params += [self._to_datetime(start), self._to_datetime(end)]
+        sql = self.get_refresh_sql(bounded=bounded)
+        table = connection.ops.quote_name(self.model._meta.db_table)
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(LOCK_SQL.format(summary=table))
+            rows.delete()
+            cursor.execute(sql, params)
+            return cursor.rowcount
+
+    def refresh_month(self, month: date) -> int:
+        """
+        Recalculates the summary rows of a single month.
+
+        Parameters
+        ----------
+        month : date
+            Any day of the refreshed month
+
+        Returns
+        -------
+        int
+            Number of created summary rows
+        """
+        start = month.replace(day=1)
+        return self.refresh(start, get_next_month(start))
+
+    def summarize(
+        self, group_by: Iterable[str] = (), keep: Iterable[str] = ()
+    ) -> List[Dict]:
+        """
+        Returns scan and session counts grouped by the provided dimensions.
+
+        Parameters
+        ----------
+        group_by : Iterable[str], optional
+            Dimensions (out of :attr:`DIMENSIONS`) to group counts by, by
+            default () (totals)
+        keep : Iterable[str], optional
+            Additional dimensions which the queryset was filtered by, and
+            should therefore not be aggregated in the selected rows, by
+            default ()
+
+        Returns
+        -------
+        List[Dict]
+            Grouped counts
+
+        Raises
+        ------
+        ValueError
+            Invalid dimension
+        """
+        group_by = list(group_by)
+        for dimension in [*group_by, *keep]:
+            if dimension not in DIMENSIONS:
+                message = INVALID_DIMENSION.format(
+                    dimension=dimension, valid=", ".join(DIMENSIONS)
+                )
+                raise ValueError(message)
+        grouping = get_grouping([*group_by, *keep])
+        queryset = self.filter(grouping=grouping)
+        counts = {
+            "scan_count": Sum("scan_count", default=0),
+            "session_count": Sum("session_count", default=0),
+        }
+        if not group_by:
+            return [queryset.aggregate(**counts)]
+        queryset = queryset.order_by(*group_by).values(*group_by)
+        return list(queryset.annotate(**counts))
+
+    @staticmethod
+    def _to_datetime(day: date) -> datetime:
+        value = datetime(day.year, day.month, day.day)
+        if settings.USE_TZ:
+            return timezone.make_aware(value)
+        return value
@@ -1,9 +1,11 @@
 """
 Definition of the :class:`AtlasQuerySet` class.
 """
-from typing import List
+from typing import Iterable, List, Tuple
 
+from django.db import transaction
 from django.db.models import QuerySet
+from django_mri.models.managers.utils import set_changed_fields
 from django_mri.models.region import Region
 
 
@@ -19,3 +21,54 @@ class AtlasQuerySet(QuerySet):
 
     def from_list(self, definitions: List[dict]):
         return [self.from_definition(definition) for definition in definitions]
+
+    def bulk_load(self, definitions: Iterable[dict]) -> List[Tuple]:
+        """
+        Creates or updates atlases (by title) and their regions from the
+        provided definitions, comparing them against existing rows and
+        writing only the differences with
+        :meth:`~django.db.models.query.QuerySet.bulk_create` and
+        :meth:`~django.db.models.query.QuerySet.bulk_update`, in a single
+        transaction. This is the bulk equivalent of :meth:`from_list`.
+
+        Parameters
+        ----------
+        definitions : Iterable[dict]
+            Atlas dictionary definitions (including their regions)
+
+        Returns
+        -------
+        List[Tuple]
+            Atlas instances and whether they were created, in the order of
+            the definitions
+        """
+        definitions = list(definitions)
+        titles = [definition["title"] for definition in definitions]
+        with transaction.atomic():
+            existing = {
+                atlas.title: atlas
+                for atlas in self.model.objects.filter(title__in=titles)
+            }
+            results, created, updated, fields = [], [], {}, set()
+            regions = []
+            for definition in definitions:
+                definition = dict(definition)
+                region_definitions = definition.pop("regions", [])
+                atlas = existing.get(definition["title"])
+                is_new = atlas is None or atlas.pk is None
+                if atlas is None:
+                    atlas = self.model(**definition)
+                    existing[atlas.title] = atlas
+                    created.append(atlas)
+                elif set_changed_fields(atlas, definition) and not is_new:
+                    updated[atlas.pk] = atlas
+                    fields.update(definition)
+                results.append((atlas, is_new))
+                regions.append((atlas, region_definitions))
+            self.model.objects.bulk_create(created)
+            if updated:
+                self.model.objects.bulk_update(
+                    updated.values(), sorted(fields - {"title"})
+                )
+            Region.objects.bulk_load(regions)
+        return results
@@ -0,0 +1,51 @@
+"""
+Definition of the :class:`BidsValidationQuerySet` class.
+"""
+from typing import Iterable
+
+from django.db.models import QuerySet
+
+
+class BidsValidationQuerySet(QuerySet):
+    """
+    Custom QuerySet methods for the
+    :class:`~django_mri.models.bids_validation.BidsValidation` model.
+    """
+
+    def filter_by_subject(self, subject) -> QuerySet:
+        """
+        Filters the queryset by BIDS subject label.
+
+        Parameters
+        ----------
+        subject : Union[Model, int, str]
+            Subject instance, primary key or BIDS label
+
+        Returns
+        -------
+        QuerySet
+            Validation records of the given subject
+        """
+        label = str(getattr(subject, "id", subject))
+        return self.filter(subject=label)
+
+    def mark_stale(self, paths: Iterable[str]) -> int:
+        """
+        Flags existing records as requiring validation.
+
+        Parameters
+        ----------
+        paths : Iterable[str]
+            Data file paths
+
+        Returns
+        -------
+        int
+            Number of updated records
+        """
+        return self.filter(path__in=[str(p) for p in paths]).update(
+            is_stale=True
+        )
+
+    def filter_invalid(self) -> QuerySet:
+        return self.filter(is_valid=False)
@@ -0,0 +1,55 @@
+"""
+Definition of the :class:`MetricQuerySet` class.
+"""
+from typing import Iterable, List, Tuple
+
+from django.db import transaction
+from django.db.models import QuerySet
+from django_mri.models.managers.utils import set_changed_fields
+
+
+class MetricQuerySet(QuerySet):
+    """
+    Custom QuerySet methods.
+    """
+
+    def bulk_load(self, definitions: Iterable[dict]) -> List[Tuple]:
+        """
+        Creates or updates metrics by title from the provided definitions,
+        using a constant number of queries in a single transaction.
+
+        Parameters
+        ----------
+        definitions : Iterable[dict]
+            Metric dictionary definitions
+
+        Returns
+        -------
+        List[Tuple]
+            Metric instances and whether they were created, in the order
+            of the definitions
+        """
+        definitions = list(definitions)
+        titles = [definition["title"] for definition in definitions]
+        with transaction.atomic():
+            existing = {}
+            for metric in self.model.objects.filter(title__in=titles):
+                existing.setdefault(metric.title, metric)
+            results, created, updated, fields = [], [], {}, set()
+            for definition in definitions:
+                metric = existing.get(definition["title"])
+                is_new = metric is None or metric.pk is None
+                if metric is None:
+                    metric = self.model(**definition)
+                    existing[metric.title] = metric
+                    created.append(metric)
+                elif set_changed_fields(metric, definition) and not is_new:
+                    updated[metric.pk] = metric
+                    fields.update(definition)
+                results.append((metric, is_new))
+            self.model.objects.bulk_create(created)
+            if updated:
+                self.model.objects.bulk_update(
+                    updated.values(), sorted(fields - {"title"})
+                )
+        return results
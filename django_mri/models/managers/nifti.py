@@ -0,0 +1,93 @@
+"""
+Definition of the :class:`NIfTIQuerySet` class.
+"""
+from typing import Iterable, Tuple
+
+from django.db.models import CharField, F, Func, QuerySet, Value
+
+#: Name of the annotation used to query NIfTI files by their base name.
+BASENAME_ANNOTATION: str = "basename"
+
+#: Possible NIfTI file name suffixes.
+NIFTI_SUFFIXES: Tuple[str] = (".nii.gz", ".nii")
+
+
+def get_basename_expression() -> Func:
+    """
+    Returns the expression used to extract a NIfTI file's base name from its
+    path. The same expression is indexed (see
+    :class:`~django_mri.models.nifti.NIfTI`), so filtering by it does not
+    require scanning the table, as an *endswith* lookup would.
+
+    Returns
+    -------
+    Func
+        Base name expression
+    """
+    return Func(
+        F("path"),
+        Value(r"^.*/"),
+        Value(""),
+        function="REGEXP_REPLACE",
+        output_field=CharField(),
+    )
+
+
+class NIfTIQuerySet(QuerySet):
+    """
+    Custom QuerySet methods for the :class:`~django_mri.models.nifti.NIfTI`
+    model.
+    """
+
+    def with_basename(self) -> QuerySet:
+        """
+        Annotates the queryset with each file's base name (as *basename*).
+
+        Returns
+        -------
+        QuerySet
+            Annotated queryset
+        """
+        expression = get_basename_expression()
+        return self.annotate(**{BASENAME_ANNOTATION: expression})
+
+    def filter_by_basenames(self, names: Iterable[str]) -> QuerySet:
+        """
+        Filters the queryset by file base names (e.g. "sub-1_T1w.nii.gz")
+        using the base name index.
+
+        Parameters
+        ----------
+        names : Iterable[str]
+            File base names
+
+        Returns
+        -------
+        QuerySet
+            Matching NIfTI instances, annotated with their base name
+        """
+        lookup = {f"{BASENAME_ANNOTATION}__in": list(names)}
+        return self.with_basename().filter(**lookup)
+
+    def filter_by_stems(
+        self, stems: Iterable[str], suffixes: Iterable[str] = NIFTI_SUFFIXES
+    ) -> QuerySet:
+        """
+        Filters the queryset by file name stems (base names without the
+        NIfTI suffix).
+
+        Parameters
+        ----------
+        stems : Iterable[str]
+            File name stems
+        suffixes : Iterable[str], optional
+            Possible file name suffixes, by default :attr:`NIFTI_SUFFIXES`
+
+        Returns
+        -------
+        QuerySet
+            Matching NIfTI instances, annotated with their base name
+        """
+        suffixes = list(suffixes)
+        names = [stem + suffix for stem in stems for suffix in suffixes]
+        return self.filter_by_basenames(names)
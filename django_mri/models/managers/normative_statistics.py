@@ -0,0 +1,278 @@
+"""
+Definition of the :class:`NormativeStatisticsQuerySet` class.
+"""
+from typing import Dict, List, NamedTuple, Tuple
+
+import numpy as np
+import pandas as pd
+from django.apps import apps
+from django.db import connection, transaction
+from django.db.models import QuerySet
+from django_mri.utils.utils import get_normative_age_bin_width
+
+#: Normative statistics group key fields (analysis version, metric, region,
+#: sex and age bin).
+KEY_FIELDS: List[str] = [
+    "analysis_version_id",
+    "metric_id",
+    "region_id",
+    "sex",
+    "age_bin",
+]
+
+#: Score lookups (or annotations) matching :attr:`KEY_FIELDS`.
+SCORE_KEY_LOOKUPS: List[str] = [
+    "run__analysis_version_id",
+    "metric_id",
+    "region_id",
+    "subject_sex",
+    "age_bin",
+]
+
+#: Nullable key fields, converted to floats (with NaN for missing values)
+#: so that keys may be grouped and merged consistently.
+NULLABLE_KEY_FIELDS: List[str] = ["region_id", "age_bin"]
+
+#: Z-score DataFrame columns.
+Z_SCORE_COLUMNS: List[str] = ["Score", "Mean", "SD", "N", "Z"]
+
+#: Namespace (first key) of the transaction-level advisory locks taken per
+#: analysis version while updating statistics. Row locks cannot protect
+#: groups that do not exist yet, so concurrent updates creating the same
+#: group would otherwise violate its unique constraint.
+LOCK_NAMESPACE: int = 46
+LOCK_SQL: str = "SELECT pg_advisory_xact_lock(%s, %s)"
+
+
+class Moments(NamedTuple):
+    """
+    Running statistics of a group of values (see `Welford's algorithm`_).
+
+    .. _Welford's algorithm:
+       https://en.wikipedia.org/wiki/Algorithms_for_calculating_variance#Welford's_online_algorithm
+    """
+
+    #: Number of values.
+    count: int
+
+    #: Mean value.
+    mean: float
+
+    #: Sum of squared differences from the mean.
+    m2: float
+
+    def add(self, other: "Moments") -> "Moments":
+        """
+        Returns the statistics of both groups of values combined (Chan et
+        al.'s parallel generalization of Welford's update).
+        """
+        if not other.count:
+            return self
+        if not self.count:
+            return other
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        mean = self.mean + delta * other.count / count
+        correction = delta ** 2 * self.count * other.count / count
+        m2 = self.m2 + other.m2 + correction
+        return Moments(count, mean, m2)
+
+    def remove(self, other: "Moments") -> "Moments":
+        """
+        Returns the statistics of this group of values without the other
+        (previously added) group, reversing :meth:`add`.
+        """
+        count = self.count - other.count
+        if count <= 0:
+            return Moments(0, 0.0, 0.0)
+        mean = (self.count * self.mean - other.count * other.mean) / count
+        delta = other.mean - mean
+        correction = delta ** 2 * count * other.count / self.count
+        m2 = self.m2 - other.m2 - correction
+        return Moments(count, mean, max(m2, 0.0))
+
+
+def get_score_moments(scores: QuerySet) -> Dict[Tuple, Moments]:
+    """
+    Returns the statistics of the provided scores grouped by
+    :attr:`KEY_FIELDS`, using a single query.
+
+    Parameters
+    ----------
+    scores : QuerySet
+        :class:`~django_mri.models.score.Score` instances
+
+    Returns
+    -------
+    Dict[Tuple, Moments]
+        Statistics by group key
+    """
+    df = get_score_keys(scores)
+    if df.empty:
+        return {}
+    grouped = df.groupby(KEY_FIELDS, dropna=False, sort=False)["value"]
+    stats = grouped.agg(["count", "mean"])
+    stats["m2"] = grouped.var(ddof=0) * stats["count"]
+    return {
+        _clean_key(key): Moments(int(count), mean, m2)
+        for key, (count, mean, m2) in zip(stats.index, stats.values)
+    }
+
+
+def get_score_keys(scores: QuerySet) -> pd.DataFrame:
+    """
+    Returns a DataFrame of the provided scores' normative statistics group
+    keys and values, indexed by score ID.
+    """
+    width = get_normative_age_bin_width()
+    rows = (
+        scores.with_age_bin(width)
+        .with_subject_sex()
+        .values_list("id", *SCORE_KEY_LOOKUPS, "value")
+    )
+    columns = ["id", *KEY_FIELDS, "value"]
+    df = pd.DataFrame(list(rows), columns=columns).set_index("id")
+    df["sex"] = df["sex"].fillna("")
+    return _clean_nullable_keys(df)
+
+
+def _clean_nullable_keys(df: pd.DataFrame) -> pd.DataFrame:
+    for field in NULLABLE_KEY_FIELDS:
+        df[field] = df[field].astype(float)
+    return df
+
+
+def _clean_key(key: Tuple) -> Tuple:
+    # Converts NumPy scalars (and NaN placeholders) back to native values.
+    version_id, metric_id, region_id, sex, age_bin = key
+    return (
+        int(version_id),
+        int(metric_id),
+        None if pd.isna(region_id) else int(region_id),
+        sex,
+        None if pd.isna(age_bin) else float(age_bin),
+    )
+
+
+class NormativeStatisticsQuerySet(QuerySet):
+    def update_from_scores(
+        self, scores: QuerySet, remove: bool = False
+    ) -> int:
+        """
+        Incrementally adds the provided scores to (or removes them from) the
+        matching normative statistics. Updates of the same analysis version
+        are serialized until the transaction is committed.
+
+        Parameters
+        ----------
+        scores : QuerySet
+            :class:`~django_mri.models.score.Score` instances
+        remove : bool, optional
+            Whether to remove the scores rather than add them, by default
+            False
+
+        Returns
+        -------
+        int
+            Number of updated groups
+        """
+        moments = get_score_moments(scores)
+        if not moments:
+            return 0
+        version_ids = {key[0] for key in moments}
+        metric_ids = {key[1] for key in moments}
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                # Sorted to avoid deadlocks between concurrent updates.
+                for version_id in sorted(version_ids):
+                    cursor.execute(LOCK_SQL, [LOCK_NAMESPACE, version_id])
+            queryset = self.model.objects.filter(
+                analysis_version_id__in=version_ids, metric_id__in=metric_ids
+            )
+            existing = {instance.key: instance for instance in queryset}
+            created, updated, deleted = [], [], []
+            for key, batch in moments.items():
+                instance = existing.get(key)
+                if instance is None:
+                    if remove:
+                        continue
+                    instance = self.model(**dict(zip(KEY_FIELDS, key)))
+                    created.append(instance)
+                else:
+                    updated.append(instance)
+                if remove:
+                    result = instance.moments.remove(batch)
+                else:
+                    result = instance.moments.add(batch)
+                instance.count, instance.mean, instance.m2 = result
+                if not instance.count and instance.pk:
+                    updated.remove(instance)
+                    deleted.append(instance.pk)
+            self.model.objects.bulk_create(created)
+            self.model.objects.bulk_update(updated, ["count", "mean", "m2"])
+            self.model.objects.filter(pk__in=deleted).delete()
+        return len(moments)
+
+    def rebuild(self) -> int:
+        """
+        Recalculates all normative statistics from the existing scores, one
+        analysis version at a time. Meant to backfill the statistics and to
+        correct changes that are not tracked incrementally (scores written
+        directly with
+        :meth:`~django_mri.models.managers.score.ScoreManager.bulk_upsert`,
+        or deleted).
+
+        Returns
+        -------
+        int
+            Number of created groups
+        """
+        Score = apps.get_model("django_mri", "Score")
+        version_ids = (
+            Score.objects.order_by()
+            .values_list("run__analysis_version_id", flat=True)
+            .distinct()
+        )
+        n_groups = 0
+        with transaction.atomic():
+            self.model.objects.all().delete()
+            for version_id in list(version_ids):
+                scores = Score.objects.filter(
+                    run__analysis_version_id=version_id
+                )
+                n_groups += self.update_from_scores(scores)
+        return n_groups
+
+    def z_score(self, scores: QuerySet) -> pd.DataFrame:
+        """
+        Returns the z-scores of the provided scores relative to the matching
+        normative statistics, using two queries.
+
+        Parameters
+        ----------
+        scores : QuerySet
+            :class:`~django_mri.models.score.Score` instances
+
+        Returns
+        -------
+        pd.DataFrame
+            Scores, normative means, standard deviations, group sizes and
+            z-scores, indexed by score ID
+        """
+        df = get_score_keys(scores)
+        rows = self.filter(
+            analysis_version_id__in=set(df["analysis_version_id"]),
+            metric_id__in=set(df["metric_id"]),
+        ).values_list(*KEY_FIELDS, "count", "mean", "m2")
+        stats = pd.DataFrame(
+            list(rows), columns=[*KEY_FIELDS, "count", "mean", "m2"]
+        )
+        stats = _clean_nullable_keys(stats)
+        df = df.reset_index().merge(stats, how="left", on=KEY_FIELDS)
+        variance = df["m2"] / (df["count"] - 1).where(df["count"] > 1)
+        df["sd"] = np.sqrt(variance)
+        df["z"] = (df["value"] - df["mean"]) / df["sd"].replace(0, np.nan)
+        df = df.set_index("id")[["value", "mean", "sd", "count", "z"]]
+        df.columns = Z_SCORE_COLUMNS
+        df.index.name = "ID"
+        return df
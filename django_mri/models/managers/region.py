@@ -1,9 +1,11 @@
 """
 Definition of the :class:`RegionQuerySet` class.
 """
-from typing import List
+from typing import Iterable, List, Tuple
 
+from django.db import transaction
 from django.db.models import QuerySet
+from django_mri.models.managers.utils import set_changed_fields
 
 
 class RegionQuerySet(QuerySet):
@@ -63,3 +65,78 @@ class RegionQuerySet(QuerySet):
             self.from_definition(atlas, definition)
             for definition in definitions
         ]
+
+    def bulk_load(self, regions: Iterable[Tuple]) -> list:
+        """
+        Creates or updates regions from the provided atlases and region
+        definitions, comparing them against existing rows (by atlas,
+        hemisphere, and title or index) and writing only the differences
+        with :meth:`~django.db.models.query.QuerySet.bulk_create` and
+        :meth:`~django.db.models.query.QuerySet.bulk_update`, in a single
+        transaction. This is the bulk equivalent of :meth:`from_list`.
+
+        Parameters
+        ----------
+        regions : Iterable[Tuple]
+            (atlas, region definitions) pairs
+
+        Returns
+        -------
+        list
+            Created or updated region instances
+        """
+        expected = []
+        for atlas, definitions in regions:
+            for definition in definitions:
+                definition = dict(definition)
+                symmetric = definition.pop("symmetric", False)
+                if atlas.symmetric or symmetric:
+                    hemispheres = ["L", "R"]
+                else:
+                    hemispheres = [definition.pop("hemisphere", None)]
+                for hemisphere in hemispheres:
+                    expected.append((atlas, hemisphere, definition))
+        atlas_ids = {atlas.id for atlas, _, _ in expected}
+        with transaction.atomic():
+            existing = {}
+            queryset = self.model.objects.filter(atlas_id__in=atlas_ids)
+            for region in queryset.order_by("id"):
+                key = get_region_key(
+                    region.atlas_id,
+                    region.hemisphere,
+                    {"title": region.title, "index": region.index},
+                )
+                existing.setdefault(key, region)
+            results, created, updated, fields = [], [], {}, set()
+            for atlas, hemisphere, definition in expected:
+                key = get_region_key(atlas.id, hemisphere, definition)
+                region = existing.get(key)
+                if region is None:
+                    region = self.model(
+                        atlas=atlas, hemisphere=hemisphere, **definition
+                    )
+                    # bulk_create() does not call save().
+                    region.validate()
+                    existing[key] = region
+                    created.append(region)
+                elif set_changed_fields(region, definition) and region.pk:
+                    updated[region.pk] = region
+                    fields.update(definition)
+                results.append(region)
+            self.model.objects.bulk_create(created)
+            if updated:
+                self.model.objects.bulk_update(
+                    updated.values(), sorted(fields)
+                )
+        return results
+
+
+def get_region_key(atlas_id: int, hemisphere: str, definition: dict) -> Tuple:
+    """
+    Returns the key used to match a region definition to an existing region:
+    its atlas, hemisphere and title (or index, if no title is provided).
+    """
+    title = definition.get("title")
+    if title:
+        return atlas_id, hemisphere, "title", title
+    return atlas_id, hemisphere, "index", definition.get("index")
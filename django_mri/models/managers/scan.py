@@ -10,6 +10,7 @@ from typing import Iterable, List, Union
 from django.db.models import Model, QuerySet
 from django_dicom.models.image import Image as DicomImage
 from django_mri.models.managers import logs
+from django_mri.utils.demographics import annotate_age_at_acquisition
 from django_mri.utils.scan_type import ScanType
 from tqdm import tqdm
 
@@ -219,6 +220,57 @@ class ScanQuerySet(QuerySet):
         )
         self._logger.debug(success_log)
 
+    def with_subject_age(self) -> QuerySet:
+        """
+        Annotates the queryset with the subject's age in years at the time of
+        each scan's acquisition (as *age_at_acquisition*), computed in the
+        database. Annotated instances' :attr:`subject_age` property returns
+        the annotated value without querying related instances.
+
+        Returns
+        -------
+        QuerySet
+            Annotated queryset
+        """
+        return annotate_age_at_acquisition(
+            self, "time", "session__subject__date_of_birth"
+        )
+
+    def export_bids(
+        self,
+        destination: Union[Path, str] = None,
+        archive_format: str = "zip",
+        **kwargs,
+    ):
+        """
+        Exports the queryset's NIfTI files as a BIDS-compliant archive,
+        including generated *participants.tsv* and
+        *dataset_description.json* files.
+
+        Parameters
+        ----------
+        destination : Union[Path, str], optional
+            Output archive path, by default None (returns the archive stream)
+        archive_format : str, optional
+            "zip" or "tar", by default "zip"
+
+        Returns
+        -------
+        Union[Path, ArchiveStream]
+            Output archive path if *destination* was provided, otherwise an
+            iterable archive stream
+
+        See Also
+        --------
+        * :class:`~django_mri.utils.bids_export.BidsExporter`
+        """
+        from django_mri.utils.bids_export import BidsExporter
+
+        exporter = BidsExporter(self, archive_format=archive_format, **kwargs)
+        if destination is None:
+            return exporter.to_stream()
+        return exporter.write(destination)
+
     def filter_by_collaborators(
         self, collaborators: Union[Model, List[Model]]
     ) -> QuerySet:
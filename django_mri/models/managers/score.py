@@ -1,11 +1,43 @@
 """
 Definition of the :class:`ScoreManager` class.
 """
+from typing import Dict, Iterable, Iterator, List, Tuple, Union
+
 import pandas as pd
-from django.db.models import F, Manager, QuerySet
+from django.apps import apps
+from django.contrib.postgres.aggregates import ArrayAgg
+from django.db import transaction
+from django.db.models import (
+    CharField,
+    Expression,
+    F,
+    FloatField,
+    Manager,
+    OuterRef,
+    QuerySet,
+    Subquery,
+    Value,
+    Window,
+)
 from django.db.models.aggregates import Avg, StdDev
+from django.db.models.functions import Floor, NullIf
 from django_analyses.models.run import Run
 from django_mri.analysis.score.scorers import get_scorer
+from django_mri.utils.caching import bump_model_version
+from django_mri.utils.demographics import age_at_acquisition
+
+#: Fields identifying a regional score (see the model's unique constraint).
+UNIQUE_FIELDS: Tuple[str] = ("run", "metric", "region")
+
+#: Fields by which scores are always partitioned when standardized.
+STANDARDIZATION_PARTITION: Tuple[str] = ("metric", "region")
+
+#: Names of the annotations added by :meth:`ScoreQuerySet.standardize`,
+#: :meth:`ScoreQuerySet.with_age_bin` and
+#: :meth:`ScoreQuerySet.with_subject_sex`.
+STANDARDIZED_ANNOTATION: str = "standardized"
+AGE_BIN_ANNOTATION: str = "age_bin"
+SEX_ANNOTATION: str = "subject_sex"
 
 
 class ScoreManager(Manager):
@@ -21,6 +53,13 @@ class ScoreManager(Manager):
         :func:`~django_analyses.models.run.Run.parse_output`) and return a
         DataFrame of estimated metric values.
 
+        Any scores previously created for the *run* are replaced, and the
+        matching
+        :class:`~django_mri.models.normative_statistics.NormativeStatistics`
+        are updated incrementally. This assumes the previous scores were
+        counted, i.e. were created using this method or included by a
+        rebuild (see :func:`~django_mri.tasks.rebuild_normative_statistics`).
+
         Parameters
         ----------
         run : Run
@@ -28,25 +67,355 @@ class ScoreManager(Manager):
         Returns
         -------
         QuerySet
-            Created or existing score instances for the provided *run*
+            Created or updated score instances for the provided *run*
         """
         scorer = get_scorer(run)
         if scorer:
-            return scorer(run)
+            entries = scorer(run)
+            Statistics = apps.get_model("django_mri", "NormativeStatistics")
+            with transaction.atomic():
+                previous = self.filter(run=run)
+                Statistics.objects.update_from_scores(previous, remove=True)
+                scores = self.bulk_upsert(run, entries)
+                # Scores that were not recreated are no longer counted.
+                previous.exclude(id__in=scores.values("id")).delete()
+                Statistics.objects.update_from_scores(scores)
+            return scores
+
+    def bulk_upsert(self, run: Run, entries: Iterable) -> QuerySet:
+        """
+        Creates or updates the provided scores of a run, along with their
+        origin relations, in a single transaction.
+
+        Regional scores are written using a single ``INSERT ... ON CONFLICT
+        DO UPDATE`` statement against the (run, metric, region) unique
+        constraint. Scores without a region (which PostgreSQL never
+        considers conflicting) are matched by metric and origin scans
+        instead. Re-scoring a run is therefore idempotent.
+
+        Note
+        ----
+        Scores written by this method are not added to the
+        :class:`~django_mri.models.normative_statistics.NormativeStatistics`
+        (use :meth:`from_run`, or rebuild the statistics afterwards).
+
+        Parameters
+        ----------
+        run : Run
+            Run the scores were derived from
+        entries : Iterable
+            :class:`~django_mri.analysis.score.utils.ScoreEntry` instances
+
+        Returns
+        -------
+        QuerySet
+            Created or updated scores
+        """
+        regional, nonregional = {}, {}
+        for entry in entries:
+            if entry.region_id is None:
+                key = (entry.metric_id, tuple(sorted(entry.origin_ids)))
+                nonregional[key] = entry
+            else:
+                regional[(entry.metric_id, entry.region_id)] = entry
+        with transaction.atomic():
+            ids = self._upsert_regional(run, regional)
+            ids += self._upsert_nonregional(run, nonregional)
+        # Bulk operations do not send save signals.
+        bump_model_version(self.model)
+        return self.filter(id__in=ids)
+
+    def _upsert_regional(self, run: Run, entries: Dict[Tuple, object]):
+        if not entries:
+            return []
+        scores = [
+            self.model(
+                run=run,
+                metric_id=metric_id,
+                region_id=region_id,
+                value=entry.value,
+            )
+            for (metric_id, region_id), entry in entries.items()
+        ]
+        self.bulk_create(
+            scores,
+            update_conflicts=True,
+            unique_fields=UNIQUE_FIELDS,
+            update_fields=["value"],
+        )
+        # Primary keys are not returned for conflicting rows.
+        existing = self.filter(run=run, region__isnull=False).values_list(
+            "metric_id", "region_id", "id"
+        )
+        score_ids = {
+            (metric_id, region_id): score_id
+            for metric_id, region_id, score_id in existing
+            if (metric_id, region_id) in entries
+        }
+        self._set_origins(
+            (score_ids[key], entry.origin_ids)
+            for key, entry in entries.items()
+        )
+        return list(score_ids.values())
+
+    def _upsert_nonregional(self, run: Run, entries: Dict[Tuple, object]):
+        if not entries:
+            return []
+        existing = (
+            self.filter(run=run, region__isnull=True)
+            .annotate(origin_ids=ArrayAgg("origin__id", ordering="origin__id"))
+            .values_list("metric_id", "origin_ids", "id")
+        )
+        score_ids = {
+            (metric_id, tuple(_clean_origin(origin_ids))): score_id
+            for metric_id, origin_ids, score_id in existing
+        }
+        updated, created, created_entries = [], [], []
+        for key, entry in entries.items():
+            score_id = score_ids.get(key)
+            if score_id is None:
+                score = self.model(
+                    run=run, metric_id=entry.metric_id, value=entry.value
+                )
+                created.append(score)
+                created_entries.append(entry)
+            else:
+                updated.append(self.model(id=score_id, value=entry.value))
+        self.bulk_update(updated, ["value"])
+        created = self.bulk_create(created)
+        self._set_origins(
+            (score.id, entry.origin_ids)
+            for score, entry in zip(created, created_entries)
+        )
+        return [score.id for score in updated + created]
+
+    def _set_origins(self, origins: Iterable[Tuple[int, Iterable[int]]]):
+        # Replaces the origins of the provided scores, so that re-scoring a
+        # run with different origin scans does not keep the previous ones.
+        Origin = self.model.origin.through
+        origins = dict(origins)
+        Origin.objects.filter(score_id__in=origins).delete()
+        rows = [
+            Origin(score_id=score_id, scan_id=scan_id)
+            for score_id, origin_ids in origins.items()
+            for scan_id in set(origin_ids)
+        ]
+        Origin.objects.bulk_create(rows)
+
+
+#: Score DataFrame columns by the lookups used to query them.
+DATAFRAME_COLUMNS: Dict[str, str] = {
+    "id": "ID",
+    "run__id": "Run ID",
+    "run__analysis_version__analysis__title": "Analysis",
+    "run__analysis_version__title": "Version",
+    "region__atlas__title": "Atlas",
+    "region__index": "Index",
+    "region__hemisphere": "Hemisphere",
+    "region__title": "Region",
+    "metric__title": "Metric",
+    "value": "Score",
+}
+#: Fields of exported score tables (including the aggregated origin IDs).
+TABLE_FIELDS: List[str] = [*DATAFRAME_COLUMNS, "origin_ids"]
+#: Column names of exported score tables.
+TABLE_COLUMNS: List[str] = [*DATAFRAME_COLUMNS.values(), "Origin"]
+#: Score DataFrame index columns.
+DATAFRAME_INDEX: List[str] = ["Run ID", "Origin", "Metric"]
+#: Score DataFrame index columns, if any of the scores is regional.
+REGIONAL_DATAFRAME_INDEX: List[str] = [
+    "Run ID",
+    "Origin",
+    "Atlas",
+    "Hemisphere",
+    "Region",
+    "Metric",
+]
+
+
+def _clean_origin(origin: list) -> List[int]:
+    # Scores without any origin aggregate to a single null.
+    return [scan_id for scan_id in origin or [] if scan_id is not None]
+
+
+def _format_origin(origin: list):
+    origin = _clean_origin(origin)
+    if not origin:
+        return None
+    return origin[0] if len(origin) == 1 else tuple(origin)
 
 
 class ScoreQuerySet(QuerySet):
     def to_dataframe(self) -> pd.DataFrame:
-        df = pd.concat([score.to_series() for score in self.all()], axis=1).T
-        df = df.dropna(axis=1, how="all")
-        if "Region" in df.columns:
-            return df.set_index(["Run ID", "Origin", "Atlas", "Hemisphere", "Region", "Metric"], drop=True)["Score"].unstack("Metric")
-        return df.set_index(["Run ID", "Origin", "Metric"], drop=True)["Score"].unstack("Metric")
+        """
+        Returns the scores as a DataFrame indexed by run, origin and
+        (optionally) region, with a column for each metric. All fields are
+        retrieved using a single query, with the score's origin scans
+        aggregated as an array.
+
+        Returns
+        -------
+        pd.DataFrame
+            Scores
+        """
+        rows = self.get_table_rows().iterator()
+        df = pd.DataFrame.from_records(rows, columns=TABLE_COLUMNS)
+        df["Origin"] = pd.Series(
+            [_format_origin(origin) for origin in df["Origin"]],
+            index=df.index,
+            dtype=object,
+        )
+        # Index columns are kept even if they are empty (e.g. scores without
+        # an origin, or regions without a hemisphere).
+        is_regional = df["Region"].notna().any()
+        index = REGIONAL_DATAFRAME_INDEX if is_regional else DATAFRAME_INDEX
+        return df.set_index(index)["Score"].unstack("Metric")
+
+    def get_table_rows(self) -> QuerySet:
+        """
+        Returns a :meth:`~django.db.models.query.QuerySet.values_list`
+        queryset of the scores' :attr:`TABLE_COLUMNS`, with each score's
+        origin scan IDs aggregated as an array.
+
+        Returns
+        -------
+        QuerySet
+            Score table rows
+        """
+        return (
+            self.values(*DATAFRAME_COLUMNS)
+            .annotate(
+                origin_ids=ArrayAgg("origin__id", ordering="origin__id")
+            )
+            .values_list(*TABLE_FIELDS)
+        )
+
+    def iter_table_rows(self, chunk_size: int = 2000) -> Iterator[Tuple]:
+        """
+        Iterates over the scores' table rows using a server-side cursor.
+
+        Parameters
+        ----------
+        chunk_size : int, optional
+            Number of rows fetched at once, by default 2000
+
+        Yields
+        ------
+        Tuple
+            Score table row
+        """
+        rows = self.get_table_rows().iterator(chunk_size=chunk_size)
+        for *values, origin in rows:
+            yield (*values, _clean_origin(origin))
+
+    def get_normative_z_scores(self) -> pd.DataFrame:
+        """
+        Returns the z-scores of the scores relative to the matching
+        :class:`~django_mri.models.normative_statistics.NormativeStatistics`
+        (by analysis version, metric, region, and the subject's sex and age
+        bin).
+
+        Returns
+        -------
+        pd.DataFrame
+            Scores, normative means, standard deviations, group sizes and
+            z-scores, indexed by score ID
+        """
+        Statistics = apps.get_model("django_mri", "NormativeStatistics")
+        return Statistics.objects.z_score(self)
 
     def _repr_html_(self) -> pd.DataFrame:
         return self.to_dataframe()
 
-    def standardize(self) -> QuerySet:
-        average = self.aggregate(Avg("value"))["value__avg"]
-        std_dev = self.aggregate(StdDev("value"))["value__stddev"]
-        return self.annotate(standardized=(F("value") - average) / std_dev)
+    def with_age_bin(self, width: float) -> QuerySet:
+        """
+        Annotates the queryset with the subject's age at the time of
+        acquisition of each score's (first) origin scan, rounded down to a
+        multiple of *width* years (as *age_bin*).
+
+        Parameters
+        ----------
+        width : float
+            Age bin width in years
+
+        Returns
+        -------
+        QuerySet
+            Annotated queryset
+        """
+        expression = age_at_acquisition(
+            "time", "session__subject__date_of_birth"
+        )
+        age = self._get_origin_value(expression, FloatField())
+        age_bin = Floor(age / Value(float(width))) * Value(float(width))
+        return self.annotate(**{AGE_BIN_ANNOTATION: age_bin})
+
+    def with_subject_sex(self) -> QuerySet:
+        """
+        Annotates the queryset with the sex of the subject of each score's
+        (first) origin scan (as *subject_sex*).
+
+        Returns
+        -------
+        QuerySet
+            Annotated queryset
+        """
+        sex = self._get_origin_value(F("session__subject__sex"), CharField())
+        return self.annotate(**{SEX_ANNOTATION: sex})
+
+    def _get_origin_value(self, expression, output_field) -> Subquery:
+        Scan = self.model._meta.get_field("origin").related_model
+        values = (
+            Scan.objects.filter(score=OuterRef("pk"))
+            .order_by("id")
+            .annotate(_origin_value=expression)
+            .values("_origin_value")[:1]
+        )
+        return Subquery(values, output_field=output_field)
+
+    def standardize(
+        self,
+        covariates: Iterable[Union[str, Expression]] = (),
+        age_bin_width: float = None,
+    ) -> QuerySet:
+        """
+        Annotates each score with its z-score (as *standardized*) relative
+        to the scores in this queryset sharing its metric, region and any of
+        the provided covariates. The group means and standard deviations are
+        calculated by the database using window functions, so that the
+        scores are standardized in a single query.
+
+        Parameters
+        ----------
+        covariates : Iterable[Union[str, Expression]], optional
+            Additional field lookups, annotations or expressions to
+            partition scores by (e.g. "run__analysis_version"), by default
+            (). Lookups must be single-valued: lookups spanning the
+            *origin* many-to-many relation would duplicate each score once
+            per origin scan, skewing the groups' statistics. Subject
+            covariates are provided as annotations instead, e.g. the
+            subject's sex using :meth:`with_subject_sex` and
+            :attr:`SEX_ANNOTATION`.
+        age_bin_width : float, optional
+            If provided, scores are also partitioned by the subject's age
+            bin (see :meth:`with_age_bin`), by default None
+
+        Returns
+        -------
+        QuerySet
+            Annotated queryset
+        """
+        queryset = self
+        partition_by = [F(field) for field in STANDARDIZATION_PARTITION]
+        for covariate in covariates:
+            if isinstance(covariate, str):
+                covariate = F(covariate)
+            partition_by.append(covariate)
+        if age_bin_width:
+            queryset = queryset.with_age_bin(age_bin_width)
+            partition_by.append(F(AGE_BIN_ANNOTATION))
+        average = Window(Avg("value"), partition_by=partition_by)
+        std_dev = Window(StdDev("value"), partition_by=partition_by)
+        # Groups of identical values (or a single score) have no z-scores.
+        standardized = (F("value") - average) / NullIf(std_dev, Value(0.0))
+        return queryset.annotate(**{STANDARDIZED_ANNOTATION: standardized})
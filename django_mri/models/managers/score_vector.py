@@ -0,0 +1,258 @@
+"""
+Definition of the :class:`ScoreVectorManager` and
+:class:`ScoreVectorQuerySet` classes.
+"""
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from django.apps import apps
+from django.db import transaction
+from django.db.models import Manager, QuerySet
+from django_analyses.models.run import Run
+from django_mri.analysis.score.scorers import get_scorer
+from django_mri.utils.caching import bump_model_version
+
+#: Fields identifying a score vector (see the model's unique constraint).
+UNIQUE_FIELDS: Tuple[str] = ("run", "metric", "atlas")
+
+#: Score vector DataFrame index and column level names.
+INDEX_NAMES: List[str] = ["Run ID", "Metric"]
+COLUMN_NAMES: List[str] = ["Atlas", "Hemisphere", "Region"]
+
+
+def get_region_ids(atlas_ids: Iterable[int]) -> Dict[int, List[int]]:
+    """
+    Returns the IDs of the provided atlases' regions, ordered by primary key.
+
+    Parameters
+    ----------
+    atlas_ids : Iterable[int]
+        Atlas IDs
+
+    Returns
+    -------
+    Dict[int, List[int]]
+        Region IDs by atlas ID
+    """
+    Region = apps.get_model("django_mri", "Region")
+    regions = (
+        Region.objects.filter(atlas_id__in=set(atlas_ids))
+        .order_by("atlas_id", "id")
+        .values_list("atlas_id", "id")
+    )
+    region_ids = defaultdict(list)
+    for atlas_id, region_id in regions:
+        region_ids[atlas_id].append(region_id)
+    return dict(region_ids)
+
+
+def align_vectors(
+    vectors: Sequence[Tuple[Sequence[int], Sequence[Optional[float]]]],
+    region_ids: Sequence[int],
+) -> np.ndarray:
+    """
+    Stacks packed score vectors into a 2D array with a column for each of
+    the provided region IDs. Values of regions that are not listed (e.g.
+    deleted regions) are dropped, and missing values are replaced with NaN.
+
+    Parameters
+    ----------
+    vectors : Sequence[Tuple[Sequence[int], Sequence[Optional[float]]]]
+        Region IDs and values of each packed score vector
+    region_ids : Sequence[int]
+        Region IDs to align the vectors to
+
+    Returns
+    -------
+    np.ndarray
+        Aligned vectors
+    """
+    positions = {region_id: i for i, region_id in enumerate(region_ids)}
+    array = np.full((len(vectors), len(region_ids)), np.nan)
+    for i, (vector_region_ids, values) in enumerate(vectors):
+        columns, row = [], []
+        for region_id, value in zip(vector_region_ids, values):
+            if region_id in positions:
+                columns.append(positions[region_id])
+                row.append(value)
+        array[i, columns] = np.array(row, dtype=float)
+    return array
+
+
+class ScoreVectorManager(Manager):
+    """
+    Custom manager methods for the
+    :class:`~django_mri.models.score_vector.ScoreVector` model.
+    """
+
+    def from_run(self, run: Run) -> QuerySet:
+        """
+        Creates or updates the score vectors of the given *run*, using the
+        same scorers as
+        :meth:`~django_mri.models.managers.score.ScoreManager.from_run`.
+        Scores without a region are ignored.
+
+        Parameters
+        ----------
+        run : Run
+            Run instance to extract metric scores from
+
+        Returns
+        -------
+        QuerySet
+            Created or updated score vectors
+        """
+        scorer = get_scorer(run)
+        if scorer:
+            return self.bulk_upsert(run, scorer(run))
+
+    def bulk_upsert(self, run: Run, entries: Iterable) -> QuerySet:
+        """
+        Packs the provided regional scores into a vector per metric and
+        atlas, and creates or updates them using a single ``INSERT ... ON
+        CONFLICT DO UPDATE`` statement.
+
+        Parameters
+        ----------
+        run : Run
+            Run the scores were derived from
+        entries : Iterable
+            :class:`~django_mri.analysis.score.utils.ScoreEntry` instances
+
+        Returns
+        -------
+        QuerySet
+            Created or updated score vectors
+        """
+        entries = [entry for entry in entries if entry.region_id is not None]
+        Region = apps.get_model("django_mri", "Region")
+        atlas_by_region = dict(
+            Region.objects.filter(
+                id__in={entry.region_id for entry in entries}
+            ).values_list("id", "atlas_id")
+        )
+        values, origins = defaultdict(dict), defaultdict(set)
+        for entry in entries:
+            key = (entry.metric_id, atlas_by_region[entry.region_id])
+            values[key][entry.region_id] = entry.value
+            origins[key].update(entry.origin_ids)
+        region_ids = get_region_ids(atlas_by_region.values())
+        vectors = [
+            self.model(
+                run=run,
+                metric_id=metric_id,
+                atlas_id=atlas_id,
+                region_ids=region_ids[atlas_id],
+                values=[
+                    values_by_region.get(region_id)
+                    for region_id in region_ids[atlas_id]
+                ],
+            )
+            for (metric_id, atlas_id), values_by_region in values.items()
+        ]
+        with transaction.atomic():
+            self.bulk_create(
+                vectors,
+                update_conflicts=True,
+                unique_fields=UNIQUE_FIELDS,
+                update_fields=["region_ids", "values"],
+            )
+            # Primary keys are not returned for conflicting rows.
+            vector_ids = {
+                (metric_id, atlas_id): vector_id
+                for metric_id, atlas_id, vector_id in self.filter(
+                    run=run
+                ).values_list("metric_id", "atlas_id", "id")
+                if (metric_id, atlas_id) in values
+            }
+            # Origins are replaced, so that re-scoring a run with different
+            # origin scans does not keep the previous ones.
+            Origin = self.model.origin.through
+            Origin.objects.filter(
+                scorevector_id__in=vector_ids.values()
+            ).delete()
+            Origin.objects.bulk_create(
+                [
+                    Origin(scorevector_id=vector_ids[key], scan_id=scan_id)
+                    for key, scan_ids in origins.items()
+                    for scan_id in scan_ids
+                ]
+            )
+        bump_model_version(self.model)
+        return self.filter(id__in=vector_ids.values())
+
+
+class ScoreVectorQuerySet(QuerySet):
+    def to_array(self) -> np.ndarray:
+        """
+        Returns the score vectors as a 2D array with a row per vector (in the
+        queryset's order). Each row is aligned to its atlas's current regions
+        (ordered by primary key) and padded with NaN.
+
+        Returns
+        -------
+        np.ndarray
+            Score vectors
+        """
+        rows = list(self.values_list("atlas_id", "region_ids", "values"))
+        region_ids = get_region_ids(atlas_id for atlas_id, _, _ in rows)
+        length = max(map(len, region_ids.values()), default=0)
+        array = np.full((len(rows), length), np.nan)
+        for i, (atlas_id, vector_region_ids, values) in enumerate(rows):
+            atlas_region_ids = region_ids.get(atlas_id, [])
+            vector = align_vectors(
+                [(vector_region_ids, values)], atlas_region_ids
+            )
+            array[i, :len(atlas_region_ids)] = vector[0]
+        return array
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """
+        Returns the score vectors as a DataFrame indexed by run and metric,
+        with a column for each current (atlas, hemisphere, region).
+
+        Returns
+        -------
+        pd.DataFrame
+            Score vectors
+        """
+        rows = self.values_list(
+            "run_id",
+            "metric__title",
+            "atlas_id",
+            "atlas__title",
+            "region_ids",
+            "values",
+        )
+        by_atlas = defaultdict(list)
+        titles = {}
+        for run_id, metric, atlas_id, atlas, region_ids, values in rows:
+            by_atlas[atlas_id].append(((run_id, metric), (region_ids, values)))
+            titles[atlas_id] = atlas
+        Region = apps.get_model("django_mri", "Region")
+        regions, region_ids = defaultdict(list), defaultdict(list)
+        for atlas_id, region_id, hemisphere, title in (
+            Region.objects.filter(atlas_id__in=by_atlas)
+            .order_by("atlas_id", "id")
+            .values_list("atlas_id", "id", "hemisphere", "title")
+        ):
+            regions[atlas_id].append((titles[atlas_id], hemisphere, title))
+            region_ids[atlas_id].append(region_id)
+        frames = []
+        for atlas_id, vectors in by_atlas.items():
+            keys, values = zip(*vectors)
+            columns = regions[atlas_id]
+            frame = pd.DataFrame(
+                align_vectors(values, region_ids[atlas_id]),
+                index=pd.MultiIndex.from_tuples(keys, names=INDEX_NAMES),
+                columns=pd.MultiIndex.from_tuples(columns, names=COLUMN_NAMES),
+            )
+            frames.append(frame)
+        if not frames:
+            return pd.DataFrame(
+                index=pd.MultiIndex.from_tuples([], names=INDEX_NAMES),
+                columns=pd.MultiIndex.from_tuples([], names=COLUMN_NAMES),
+            )
+        return pd.concat(frames, axis=1)
@@ -2,7 +2,8 @@
 Definition of the :class:`SessionQuerySet` class.
 """
 import logging
-from typing import Iterable
+from pathlib import Path
+from typing import Iterable, Sequence, Union
 
 import pandas as pd
 from bokeh.plotting import Figure
@@ -10,6 +11,10 @@ from django.db.models import Count, Model, QuerySet
 from django_mri.models.managers import logs
 from django_mri.plots.session import plot_measurement_by_month
 from django_mri.utils import get_group_model, get_study_model
+from django_mri.utils.demographics import (
+    AGE_ANNOTATION,
+    annotate_age_at_acquisition,
+)
 from tqdm import tqdm
 
 Group = get_group_model()
@@ -26,6 +31,7 @@ DATAFRAME_FIELDS = (
     "measurement__title",
     "irb",
     "scan_count",
+    AGE_ANNOTATION,
 )
 #: Column names to use when exporting a Session queryset as a DataFrame.
 DATAFRAME_COLUMNS = (
@@ -38,6 +44,7 @@ DATAFRAME_COLUMNS = (
     "Data Acquisition",
     "IRB Approval",
     "Scan Count",
+    "Subject Age",
 )
 
 
@@ -69,6 +76,38 @@ class SessionQuerySet(QuerySet):
         Scan = self.model.scan_set.rel.related_model
         return Scan.objects.filter(session__in=self.all())
 
+    def with_subject_age(self) -> QuerySet:
+        """
+        Annotates the queryset with the subject's age in years at the time of
+        each session's acquisition (as *age_at_acquisition*), computed in the
+        database.
+
+        Returns
+        -------
+        QuerySet
+            Annotated queryset
+        """
+        return annotate_age_at_acquisition(
+            self, "time", "subject__date_of_birth"
+        )
+
+    def export_bids(
+        self,
+        destination: Union[Path, str] = None,
+        archive_format: str = "zip",
+        **kwargs,
+    ):
+        """
+        Exports the sessions' NIfTI files as a BIDS-compliant archive.
+
+        See Also
+        --------
+        * :meth:`~django_mri.models.managers.scan.ScanQuerySet.export_bids`
+        """
+        return self.get_scan_set().export_bids(
+            destination=destination, archive_format=archive_format, **kwargs
+        )
+
     def plot_measurement_by_month(self) -> Figure:
         """
         Returns a Bokeh plot of measurement counts by month.
@@ -84,17 +123,48 @@ class SessionQuerySet(QuerySet):
         """
         Export the queryset as a DataFrame.
 
+        Note
+        ----
+        The "Subject Age" column (the subject's age in years at the time of
+        acquisition, see :meth:`with_subject_age`) is included as of this
+        version. It is missing (NaN) for subjects without a date of birth.
+
         Returns
         -------
         pd.DataFrame
             Queryset information
         """
-        queryset = self.annotate(scan_count=Count("scan"))
+        queryset = self.with_subject_age().annotate(scan_count=Count("scan"))
         values = queryset.values(*DATAFRAME_FIELDS)
         df = pd.DataFrame(values)
         df.columns = DATAFRAME_COLUMNS
         return df.set_index("Session PK").sort_index()
 
+    def get_table_rows(
+        self, fields: Sequence[str] = DATAFRAME_FIELDS
+    ) -> QuerySet:
+        """
+        Returns a :meth:`~django.db.models.query.QuerySet.values_list`
+        queryset of the provided fields (by default
+        :attr:`DATAFRAME_FIELDS`), ordered by primary key.
+
+        Parameters
+        ----------
+        fields : Sequence[str], optional
+            Exported fields, by default :attr:`DATAFRAME_FIELDS`
+
+        Returns
+        -------
+        QuerySet
+            Session table rows
+        """
+        queryset = (
+            self.prefetch_related(None)
+            .with_subject_age()
+            .annotate(scan_count=Count("scan", distinct=True))
+        )
+        return queryset.order_by("id").values_list(*fields)
+
     def convert_to_nifti(
         self,
         force: bool = False,
@@ -0,0 +1,30 @@
+"""
+Utilities shared by the app's custom managers.
+"""
+from django.db.models import Model
+
+
+def set_changed_fields(instance: Model, fields: dict) -> bool:
+    """
+    Sets the provided field values on an existing instance, returning
+    whether any of them changed (and the instance should therefore be
+    updated).
+
+    Parameters
+    ----------
+    instance : Model
+        Model instance
+    fields : dict
+        Field values by name
+
+    Returns
+    -------
+    bool
+        Whether any field value changed
+    """
+    changed = False
+    for name, value in fields.items():
+        if getattr(instance, name) != value:
+            setattr(instance, name, value)
+            changed = True
+    return changed
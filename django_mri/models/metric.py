@@ -3,6 +3,7 @@ Definition of the :class:`Metric` model.
 """
 from django.db import models
 from django_mri.models import help_text
+from django_mri.models.managers.metric import MetricQuerySet
 
 
 class Metric(models.Model):
@@ -18,6 +19,8 @@ class Metric(models.Model):
         blank=True, null=True, help_text=help_text.METRIC_DESCRIPTION
     )
 
+    objects = MetricQuerySet.as_manager()
+
     def __str__(self) -> str:
         """
         Returns the string representation of this instance.
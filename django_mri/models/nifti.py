@@ -12,6 +12,10 @@ import numpy as np
 from django.db import IntegrityError, models
 from django_analyses.models.input import FileInput, ListInput
 from django_extensions.db.models import TimeStampedModel
+from django_mri.models.managers.nifti import (
+    NIfTIQuerySet,
+    get_basename_expression,
+)
 from django_mri.models.messages import (
     NIFTI_FILE_MISSING,
     PROCESSED_SEQUENCE_TYPE,
@@ -53,12 +57,19 @@ class NIfTI(TimeStampedModel):
     # Used to cache JSON data to prevent multiple reads.
     _json_data = None
 
+    objects = NIfTIQuerySet.as_manager()
+
     # Logger instance for this model.
     _logger = logging.getLogger("data.mri.nifti")
 
     class Meta:
         verbose_name = "NIfTI"
         ordering = ("-id",)
+        indexes = [
+            models.Index(
+                get_basename_expression(), name="django_mri_nifti_basename"
+            )
+        ]
 
     def get_instance(self) -> nib.nifti1.Nifti1Image:
         return nib.load(str(self.path))
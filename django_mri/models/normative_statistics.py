@@ -0,0 +1,151 @@
+"""
+Definition of the :class:`NormativeStatistics` model.
+"""
+import math
+
+from django.db import models
+from django.db.models.functions import Coalesce
+from django_mri.models import help_text
+from django_mri.models.managers.normative_statistics import (
+    Moments,
+    NormativeStatisticsQuerySet,
+)
+
+
+class NormativeStatistics(models.Model):
+    """
+    Running statistics of the :class:`~django_mri.models.score.Score`
+    values of some metric and (optionally) region, derived using a
+    particular analysis version from subjects of some sex and age bin.
+
+    Statistics are maintained incrementally, using the count, mean and sum
+    of squared differences from the mean (M2) of Welford's algorithm,
+    whenever scores are created using
+    :meth:`~django_mri.models.managers.score.ScoreManager.from_run`. Other
+    changes (e.g. deleted runs) require a rebuild, see
+    :func:`~django_mri.tasks.rebuild_normative_statistics`.
+    """
+
+    analysis_version = models.ForeignKey(
+        "django_analyses.AnalysisVersion",
+        on_delete=models.CASCADE,
+        help_text=help_text.NORMATIVE_ANALYSIS_VERSION,
+    )
+    metric = models.ForeignKey(
+        "django_mri.Metric",
+        on_delete=models.CASCADE,
+        help_text=help_text.NORMATIVE_METRIC,
+    )
+    region = models.ForeignKey(
+        "django_mri.Region",
+        on_delete=models.CASCADE,
+        blank=True,
+        null=True,
+        help_text=help_text.NORMATIVE_REGION,
+    )
+    sex = models.CharField(
+        max_length=5,
+        blank=True,
+        default="",
+        help_text=help_text.NORMATIVE_SEX,
+    )
+    age_bin = models.FloatField(
+        blank=True, null=True, help_text=help_text.NORMATIVE_AGE_BIN
+    )
+    count = models.PositiveIntegerField(
+        default=0, help_text=help_text.NORMATIVE_COUNT
+    )
+    mean = models.FloatField(default=0, help_text=help_text.NORMATIVE_MEAN)
+    m2 = models.FloatField(default=0, help_text=help_text.NORMATIVE_M2)
+
+    objects = NormativeStatisticsQuerySet.as_manager()
+
+    class Meta:
+        verbose_name_plural = "Normative statistics"
+        constraints = [
+            # Missing regions and age bins are coalesced so that they are
+            # not considered distinct.
+            models.UniqueConstraint(
+                "analysis_version",
+                "metric",
+                Coalesce("region", models.Value(0)),
+                "sex",
+                Coalesce("age_bin", models.Value(-1.0)),
+                name="django_mri_normativestatistics_unique_group",
+            )
+        ]
+
+    def __str__(self) -> str:
+        """
+        Returns the string representation of this instance.
+
+        Returns
+        -------
+        str
+            Normative statistics string representation
+        """
+        region = f" [{self.region}]" if self.region_id else ""
+        stats = f"{self.mean} ± {self.std} (n={self.count})"
+        return f"{self.metric}{region}: {stats}"
+
+    @property
+    def key(self) -> tuple:
+        return (
+            self.analysis_version_id,
+            self.metric_id,
+            self.region_id,
+            self.sex,
+            self.age_bin,
+        )
+
+    @property
+    def moments(self) -> Moments:
+        return Moments(self.count, self.mean, self.m2)
+
+    @property
+    def variance(self) -> float:
+        """
+        Returns the sample variance of the scores, or None if fewer than two
+        scores were included.
+
+        Returns
+        -------
+        float
+            Sample variance
+        """
+        if self.count > 1:
+            return self.m2 / (self.count - 1)
+
+    @property
+    def std(self) -> float:
+        """
+        Returns the sample standard deviation of the scores, or None if
+        fewer than two scores were included.
+
+        Returns
+        -------
+        float
+            Sample standard deviation
+        """
+        variance = self.variance
+        if variance is not None:
+            return math.sqrt(variance)
+
+    def z_score(self, value: float) -> float:
+        """
+        Returns the z-score of the provided value relative to these
+        statistics.
+
+        Parameters
+        ----------
+        value : float
+            Score value
+
+        Returns
+        -------
+        float
+            Z-score, or None if the standard deviation is unavailable
+        """
+        std = self.std
+        if std:
+            return (value - self.mean) / std
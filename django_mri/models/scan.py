@@ -9,7 +9,7 @@ from typing import Any, Dict, List, Union
 from django.contrib.auth import get_user_model
 from django.contrib.postgres.fields import ArrayField
 from django.core.validators import MinValueValidator
-from django.db import IntegrityError, models
+from django.db import IntegrityError, models, transaction
 from django_analyses.models.input import (DirectoryInput, FileInput, Input,
                                           ListInput)
 from django_analyses.models.run import Run
@@ -20,6 +20,9 @@ from django_mri.models.managers.scan import ScanQuerySet
 from django_mri.models.messages import SCAN_UPDATE_NO_DICOM
 from django_mri.models.nifti import NIfTI
 from django_mri.utils.bids import BidsManager
+from django_mri.utils.demographics import get_annotated_age
+from django_mri.utils.staging import (publish_files, staging_directory,
+                                      unpublish_files)
 from django_mri.utils.utils import (get_bids_manager, get_group_model,
                                     get_mri_root)
 from nilearn.image import mean_img
@@ -314,23 +317,18 @@ class Scan(TimeStampedModel):
                     bids = True
             elif not isinstance(destination, Path):
                 destination = Path(destination)
-            destination.parent.mkdir(exist_ok=True, parents=True)
             try:
-                nifti_path = Dcm2niix().convert(
-                    self.dicom.path,
+                nifti = self._convert_and_publish(
                     destination,
                     compressed=compressed,
                     generate_json=generate_json,
                 )
-            except RuntimeError as e:
+            except (RuntimeError, IntegrityError) as e:
                 if persistent:
                     warnings.warn(str(e))
                 else:
                     raise
             else:
-                nifti = NIfTI.objects.create(path=nifti_path, is_raw=True)
-                self._nifti = nifti
-                self.save()
                 if bids:
                     self.bids_manager.postprocess(nifti)
                 return nifti
@@ -338,6 +336,59 @@ class Scan(TimeStampedModel):
             message = messages.DICOM_TO_NIFTI_NO_DICOM.format(scan_id=self.id)
             raise AttributeError(message)
 
+    def _convert_and_publish(
+        self,
+        destination: Path,
+        compressed: bool = True,
+        generate_json: bool = True,
+    ) -> NIfTI:
+        """
+        Runs dcm2niix into a per-job staging directory and publishes the
+        outputs to *destination* together with the creation of the
+        :class:`~django_mri.models.nifti.NIfTI` instance. Interrupted or
+        failed conversions therefore never leave partial files in the BIDS
+        directory, nor database records without files.
+
+        Parameters
+        ----------
+        destination : Path
+            Final conversion output path (without extension)
+        compressed : bool, optional
+            Whether to create compressed (*.nii.gz*) files or not, by default
+            True
+        generate_json : bool, optional
+            Whether to generate a JSON sidecar or not, by default True
+
+        Returns
+        -------
+        NIfTI
+            Created NIfTI instance
+
+        Raises
+        ------
+        IntegrityError
+            Conversion outputs collide with existing files
+        """
+        with staging_directory(prefix=f"scan-{self.id}-") as staging_dir:
+            staged_path = Dcm2niix().convert(
+                self.dicom.path,
+                staging_dir / destination.name,
+                compressed=compressed,
+                generate_json=generate_json,
+            )
+            nifti_path = destination.parent / Path(staged_path).name
+            published = publish_files(staging_dir, destination.parent)
+        try:
+            with transaction.atomic():
+                nifti = NIfTI.objects.create(path=nifti_path, is_raw=True)
+                self._nifti = nifti
+                self.save()
+        except Exception:
+            unpublish_files(published)
+            self._nifti = None
+            raise
+        return nifti
+
     def sync_bids(self, log_level: int = logging.DEBUG):
         self._logger.log(log_level, f"Checking scan #{self.id} BIDS status...")
         mri_root = get_mri_root()
@@ -743,6 +794,9 @@ class Scan(TimeStampedModel):
         float
             Subject age in years at the time of the scan's acquisition
         """
+        is_annotated, age = get_annotated_age(self)
+        if is_annotated:
+            return age
         conditions = (
             self.time
             and self.session
@@ -40,6 +40,14 @@ class Score(models.Model):
 
     objects = ScoreManager.from_queryset(ScoreQuerySet)()
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=("run", "metric", "region"),
+                name="django_mri_score_unique_run_metric_region",
+            )
+        ]
+
     def __str__(self) -> str:
         """
         Returns the string representation of this instance.
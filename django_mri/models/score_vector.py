@@ -0,0 +1,95 @@
+"""
+Definition of the :class:`ScoreVector` model.
+"""
+import pandas as pd
+from django.contrib.postgres.fields import ArrayField
+from django.db import models
+from django_mri.models import help_text
+from django_mri.models.managers.score_vector import (
+    ScoreVectorManager,
+    ScoreVectorQuerySet,
+    align_vectors,
+)
+
+
+class ScoreVector(models.Model):
+    """
+    Represents the :class:`~django_mri.models.metric.Metric` scores of all
+    the regions of some :class:`~django_mri.models.atlas.Atlas`, derived
+    from a particular :class:`~django_analyses.models.run.Run` instance.
+
+    This is a compact alternative to
+    :class:`~django_mri.models.score.Score` for high-cardinality outputs:
+    values are packed in a single array (missing values are stored as
+    nulls) aligned to the stored IDs of the atlas's regions at the time of
+    scoring. Vectors are realigned to the atlas's current regions when read,
+    so that regions added later on are missing and deleted regions are
+    dropped.
+    """
+
+    origin = models.ManyToManyField(
+        "django_mri.Scan", help_text=help_text.SCORE_ORIGIN,
+    )
+    atlas = models.ForeignKey(
+        "django_mri.Atlas",
+        on_delete=models.CASCADE,
+        help_text=help_text.SCORE_VECTOR_ATLAS,
+    )
+    metric = models.ForeignKey(
+        "django_mri.Metric",
+        on_delete=models.CASCADE,
+        help_text=help_text.SCORE_METRIC,
+    )
+    run = models.ForeignKey(
+        "django_analyses.Run",
+        on_delete=models.CASCADE,
+        help_text=help_text.SCORE_RUN,
+    )
+    region_ids = ArrayField(
+        models.IntegerField(), help_text=help_text.SCORE_VECTOR_REGION_IDS,
+    )
+    values = ArrayField(
+        models.FloatField(null=True), help_text=help_text.SCORE_VECTOR_VALUES,
+    )
+
+    objects = ScoreVectorManager.from_queryset(ScoreVectorQuerySet)()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=("run", "metric", "atlas"),
+                name="django_mri_scorevector_unique_run_metric_atlas",
+            )
+        ]
+
+    def __str__(self) -> str:
+        """
+        Returns the string representation of this instance.
+
+        Returns
+        -------
+        str
+            Score vector string representation
+        """
+        return f"{self.metric} [{self.atlas}] ({len(self.values)} values)"
+
+    def to_series(self) -> pd.Series:
+        """
+        Returns the values of this vector indexed by hemisphere and region.
+
+        Returns
+        -------
+        pd.Series
+            Regional scores
+        """
+        regions = list(
+            self.atlas.region_set.order_by("id").values_list(
+                "id", "hemisphere", "title"
+            )
+        )
+        region_ids = [region_id for region_id, _, _ in regions]
+        values = align_vectors([(self.region_ids, self.values)], region_ids)
+        index = pd.MultiIndex.from_tuples(
+            [region[1:] for region in regions], names=["Hemisphere", "Region"]
+        )
+        return pd.Series(values[0], index=index, name=self.metric.title)
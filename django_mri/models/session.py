@@ -26,6 +26,7 @@ from django_mri.utils import (
     get_study_model,
     get_subject_model,
 )
+from django_mri.utils.demographics import get_annotated_age
 
 Group = get_group_model()
 MeasurementDefinition = get_measurement_model()
@@ -124,6 +125,9 @@ class Session(TimeStampedModel):
         float
             Subject age in years at the time of the session's acquisition
         """
+        is_annotated, age = get_annotated_age(self)
+        if is_annotated:
+            return age
         has_required_info = (
             self.time and self.subject and self.subject.date_of_birth
         )
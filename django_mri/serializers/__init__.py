@@ -10,6 +10,7 @@ References
 """
 
 from django_mri.serializers.atlas import AtlasSerializer
+from django_mri.serializers.export_job import ExportJobSerializer
 from django_mri.serializers.irb_approval import IrbApprovalSerializer
 from django_mri.serializers.nifti import NiftiSerializer
 from django_mri.serializers.region import RegionSerializer
@@ -0,0 +1,70 @@
+"""
+Definition of the :class:`ExportJobSerializer` class.
+"""
+from rest_framework import serializers
+
+from django_mri.models.export_job import ExportJob
+from django_mri.models.scan import Scan
+from django_mri.models.session import Session
+
+#: Supported export file formats.
+FILE_FORMATS = ("dicom", "nifti")
+
+
+class ExportJobSerializer(serializers.HyperlinkedModelSerializer):
+    """
+    Serializer class for the
+    :class:`~django_mri.models.export_job.ExportJob` model.
+
+    Exported scans may be selected directly (*scans*) or by session
+    (*sessions*), in which case all of the sessions' scans are included.
+    """
+
+    url = serializers.HyperlinkedIdentityField(
+        view_name="mri:exportjob-detail"
+    )
+    scans = serializers.PrimaryKeyRelatedField(
+        queryset=Scan.objects.all(), many=True, required=False
+    )
+    sessions = serializers.PrimaryKeyRelatedField(
+        queryset=Session.objects.all(),
+        many=True,
+        required=False,
+        write_only=True,
+    )
+    file_formats = serializers.ListField(
+        child=serializers.ChoiceField(choices=FILE_FORMATS), required=False
+    )
+    user = serializers.PrimaryKeyRelatedField(read_only=True)
+
+    class Meta:
+        model = ExportJob
+        fields = (
+            "id",
+            "url",
+            "user",
+            "scans",
+            "sessions",
+            "file_formats",
+            "archive_format",
+            "status",
+            "progress",
+            "size",
+            "error",
+            "created",
+            "modified",
+        )
+        read_only_fields = ("status", "progress", "size", "error")
+
+    def validate(self, data: dict) -> dict:
+        sessions = data.pop("sessions", [])
+        scans = list(data.get("scans", []))
+        if sessions:
+            session_ids = [session.id for session in sessions]
+            scans += Scan.objects.filter(session__id__in=session_ids)
+        if not scans:
+            raise serializers.ValidationError(
+                "At least one scan or session must be selected for export."
+            )
+        data["scans"] = list({scan.id: scan for scan in scans}.values())
+        return data
@@ -57,7 +57,7 @@ class SessionReadSerializer(SessionSerializer):
     dicom_zip = serializers.SerializerMethodField()
     nifti_zip = serializers.SerializerMethodField()
     n_scans = serializers.SerializerMethodField()
-    study_groups = MiniGroupSerializer(many=True)
+    study_groups = serializers.SerializerMethodField()
 
     class Meta:
         model = Session
@@ -72,7 +72,26 @@ class SessionReadSerializer(SessionSerializer):
         return reverse("mri:session_nifti_zip", args=(instance.id,))
 
     def get_n_scans(self, instance: Session) -> int:
-        return instance.scan_set.count()
+        # Use the viewset's annotation when available.
+        n_scans = getattr(instance, "n_scans", None)
+        if n_scans is None:
+            return instance.scan_set.count()
+        return n_scans
+
+    def get_study_groups(self, instance: Session) -> list:
+        prefetched = getattr(instance, "_prefetched_objects_cache", {})
+        if "scan_set" in prefetched:
+            # Collect study groups from the prefetched scans rather than
+            # querying them for each session.
+            groups = {
+                group.id: group
+                for scan in instance.scan_set.all()
+                for group in scan.study_groups.all()
+            }
+            groups = [groups[key] for key in sorted(groups)]
+        else:
+            groups = instance.study_groups
+        return MiniGroupSerializer(groups, many=True).data
 
 
 class AdminSessionReadSerializer(SessionReadSerializer):
@@ -9,18 +9,34 @@ References
    https://docs.djangoproject.com/en/3.0/ref/signals/
 """
 import logging
+import threading
+from datetime import datetime
 from pathlib import Path
 
-from django.db import IntegrityError
+from django.db import IntegrityError, transaction
 from django.db.models import Model
-from django.db.models.signals import post_delete, post_save
+from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.dispatch import receiver
 from django_dicom.models.series import Series
 
+from django_mri.models.acquisition_summary import AcquisitionSummary
+from django_mri.models.export_job import ExportJob
+from django_mri.models.managers.acquisition_summary import get_month
 from django_mri.models.nifti import NIfTI
 from django_mri.models.scan import Scan
+from django_mri.models.score import Score
 from django_mri.models.session import Session
-from django_mri.utils import get_session_by_series, get_subject_model
+from django_mri.utils import (
+    get_bids_manager,
+    get_group_model,
+    get_measurement_model,
+    get_session_by_series,
+    get_study_model,
+    get_subject_model,
+)
+from django_mri.utils.bids_validation import BidsValidator
+from django_mri.utils.caching import bump_model_version
+from django_mri.utils.utils import get_summary_auto_refresh
 
 _SCAN_FROM_SERIES_FAILURE = (
     "Failed to create Scan instance for DICOM series {series_id}!\n{exception}"
@@ -28,6 +44,100 @@ _SCAN_FROM_SERIES_FAILURE = (
 
 _logger = logging.getLogger("data.mri.signals")
 
+Group = get_group_model()
+Measurement = get_measurement_model()
+Study = get_study_model()
+Subject = get_subject_model()
+
+#: Months with a pending acquisition summary refresh (per thread).
+_pending_summary_refresh = threading.local()
+
+#: NIfTI paths pending BIDS validation invalidation (per thread).
+_pending_bids_invalidation = threading.local()
+
+#: Models whose API representations include data of another model (e.g.
+#: sessions list their scan counts and study groups), by that model.
+DEPENDENT_CACHED_MODELS = {
+    Scan: (Session, Score),
+    Subject: (Scan, Session),
+    Measurement: (Session,),
+    Group: (Scan, Session),
+    Study: (Scan, Session),
+}
+
+
+def schedule_summary_refresh(time: datetime) -> None:
+    """
+    Schedules a refresh of the acquisition summary rows of the month of the
+    provided time once the current transaction is committed. Each month is
+    refreshed at most once per transaction.
+
+    Parameters
+    ----------
+    time : datetime
+        Acquisition time
+    """
+    if time is None or not get_summary_auto_refresh():
+        return
+    month = get_month(time)
+    pending = getattr(_pending_summary_refresh, "months", None)
+    if pending is None:
+        pending = _pending_summary_refresh.months = set()
+    if month in pending:
+        return
+    pending.add(month)
+
+    def refresh() -> None:
+        pending.discard(month)
+        AcquisitionSummary.objects.refresh_month(month)
+
+    transaction.on_commit(refresh)
+
+
+def schedule_bids_invalidation(path: Path) -> None:
+    """
+    Schedules flagging the provided data file for BIDS validation once the
+    current transaction is committed. All paths saved within a transaction
+    are flagged using a single query, and files outside of the BIDS
+    directory are skipped without touching the database.
+
+    Parameters
+    ----------
+    path : Path
+        Data file path
+    """
+    validator = BidsValidator()
+    if validator.get_subject_label(path) is None:
+        return
+    pending = getattr(_pending_bids_invalidation, "paths", None)
+    if pending is None:
+        pending = _pending_bids_invalidation.paths = set()
+    pending.add(str(path))
+
+    def invalidate() -> None:
+        # The first callback to run flushes the whole batch (including any
+        # paths left over from a rolled back transaction).
+        if pending:
+            paths = list(pending)
+            pending.clear()
+            validator.invalidate_many(paths)
+
+    transaction.on_commit(invalidate)
+
+
+def bump_cached_model_versions(model: Model) -> None:
+    """
+    Bumps the version of the provided model and of any models whose API
+    representations depend on it.
+
+    Parameters
+    ----------
+    model : ~django.db.models.Model
+        Changed model
+    """
+    for changed_model in (model, *DEPENDENT_CACHED_MODELS.get(model, ())):
+        bump_model_version(changed_model)
+
 
 @receiver(post_save, sender=Session)
 def session_post_save_receiver(
@@ -48,7 +158,6 @@ def session_post_save_receiver(
         Whether the session instance was created or not
     """
     if not instance.subject:
-        Subject = get_subject_model()
         scan = instance.scan_set.first()
         if scan and scan.dicom.patient:
             instance.subject, _ = Subject.objects.from_dicom_patient(
@@ -93,6 +202,26 @@ def series_post_save_receiver(
                 session.save()
 
 
+@receiver(post_save, sender=NIfTI)
+def nifti_post_save_receiver(
+    sender: Model, instance: NIfTI, created: bool, **kwargs
+) -> None:
+    """
+    Flags saved NIfTI files for BIDS validation once the transaction is
+    committed (see :func:`schedule_bids_invalidation`).
+
+    Parameters
+    ----------
+    sender : Model
+        NIfTI model
+    instance : NIfTI
+        Saved NIfTI instance
+    created : bool
+        Whether the NIfTI instance was created or not
+    """
+    schedule_bids_invalidation(instance.path)
+
+
 @receiver(post_delete, sender=NIfTI)
 def nifti_post_delete_receiver(
     sender: Model, instance: NIfTI, *args, **kwargs
@@ -107,6 +236,9 @@ def nifti_post_delete_receiver(
     instance : NIfTI
         Deleted NIfTI instance
     """
+    bids_manager = get_bids_manager()
+    if bids_manager is not None:
+        bids_manager.validator.remove(instance.path)
     path = Path(instance.path)
     if path.exists():
         base_name = path.name.split(".")[0]
@@ -125,3 +257,160 @@ def nifti_post_delete_receiver(
         empty_subject = not any(subject_dir.iterdir())
         if empty_subject:
             subject_dir.rmdir()
+
+
+@receiver(post_delete, sender=ExportJob)
+def export_job_post_delete_receiver(
+    sender: Model, instance: ExportJob, **kwargs
+) -> None:
+    """
+    Removes the exported archive after an
+    :class:`~django_mri.models.export_job.ExportJob` instance is deleted.
+
+    Parameters
+    ----------
+    sender : ~django.db.models.Model
+        The :class:`~django_mri.models.export_job.ExportJob` model
+    instance : ~django_mri.models.export_job.ExportJob
+        ExportJob instance
+    """
+    instance.delete_file()
+
+
+@receiver(post_save, sender=Scan)
+@receiver(post_delete, sender=Scan)
+@receiver(post_save, sender=Session)
+@receiver(post_delete, sender=Session)
+@receiver(post_save, sender=Score)
+@receiver(post_delete, sender=Score)
+@receiver(post_save, sender=Subject)
+@receiver(post_delete, sender=Subject)
+@receiver(post_save, sender=Measurement)
+@receiver(post_delete, sender=Measurement)
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+@receiver(post_save, sender=Study)
+@receiver(post_delete, sender=Study)
+def cached_model_change_receiver(sender: Model, **kwargs) -> None:
+    """
+    Invalidates cached API responses and validators of the saved or deleted
+    instance's model and its :attr:`DEPENDENT_CACHED_MODELS` (see
+    :mod:`django_mri.views.caching`).
+
+    Parameters
+    ----------
+    sender : ~django.db.models.Model
+        Saved or deleted instance's model
+    """
+    bump_cached_model_versions(sender)
+
+
+@receiver(m2m_changed, sender=Scan.study_groups.through)
+@receiver(m2m_changed, sender=Score.origin.through)
+def cached_relation_change_receiver(
+    sender: Model, action: str, **kwargs
+) -> None:
+    """
+    Invalidates cached API responses and validators of the model declaring
+    a changed many-to-many relation, from either side of the relation, and
+    its :attr:`DEPENDENT_CACHED_MODELS`.
+
+    Parameters
+    ----------
+    sender : ~django.db.models.Model
+        Scan study groups or score origin through model
+    action : str
+        Type of change
+    """
+    if action.startswith("post_"):
+        model = Scan if sender is Scan.study_groups.through else Score
+        bump_cached_model_versions(model)
+
+
+@receiver(post_save, sender=Session)
+@receiver(post_delete, sender=Session)
+def session_summary_receiver(
+    sender: Model, instance: Session, **kwargs
+) -> None:
+    """
+    Refreshes the acquisition summary of a saved or deleted session's month.
+
+    Parameters
+    ----------
+    sender : ~django.db.models.Model
+        The :class:`~django_mri.models.session.Session` model
+    instance : ~django_mri.models.session.Session
+        Session instance
+    """
+    schedule_summary_refresh(instance.time)
+
+
+@receiver(post_save, sender=Scan)
+@receiver(post_delete, sender=Scan)
+def scan_summary_receiver(sender: Model, instance: Scan, **kwargs) -> None:
+    """
+    Refreshes the acquisition summary of a saved or deleted scan's month.
+
+    Parameters
+    ----------
+    sender : ~django.db.models.Model
+        The :class:`~django_mri.models.scan.Scan` model
+    instance : ~django_mri.models.scan.Scan
+        Scan instance
+    """
+    # The session may already be deleted if the scan was deleted by cascade,
+    # in which case the session's receiver handles the refresh.
+    time = (
+        Session.objects.filter(id=instance.session_id)
+        .values_list("time", flat=True)
+        .first()
+    )
+    schedule_summary_refresh(time)
+
+
+@receiver(m2m_changed, sender=Scan.study_groups.through)
+def scan_study_groups_summary_receiver(
+    sender: Model,
+    instance: Model,
+    action: str,
+    reverse: bool,
+    pk_set: set,
+    **kwargs,
+) -> None:
+    """
+    Refreshes the acquisition summary of scans added to or removed from study
+    groups.
+
+    Parameters
+    ----------
+    sender : ~django.db.models.Model
+        Scan study groups through model
+    instance : ~django.db.models.Model
+        Scan or group instance, depending on *reverse*
+    action : str
+        Type of change
+    reverse : bool
+        Whether the change was made from the group's side
+    pk_set : set
+        Primary keys of the added or removed instances (None when cleared)
+    """
+    if reverse and action == "pre_clear":
+        # The post_clear signal has no *pk_set*, and the cleared scans are no
+        # longer related to the group by then.
+        scans = instance.mri_scan_set.values_list("id", flat=True)
+        instance._cleared_scan_ids = list(scans)
+        return
+    if not action.startswith("post_"):
+        return
+    if not reverse:
+        scans = Scan.objects.filter(id=instance.id)
+    elif action == "post_clear":
+        scan_ids = instance.__dict__.pop("_cleared_scan_ids", [])
+        scans = Scan.objects.filter(id__in=scan_ids)
+    elif pk_set:
+        scans = Scan.objects.filter(id__in=pk_set)
+    else:
+        return
+    times = scans.values_list("session__time", flat=True).distinct()
+    for time in times:
+        schedule_summary_refresh(time)
@@ -8,9 +8,14 @@ from typing import Iterable, Union
 from celery import shared_task
 from django_analyses.models.run import Run
 
+from django_mri.models.acquisition_summary import AcquisitionSummary
 from django_mri.models.data_directory import DataDirectory
+from django_mri.models.export_job import ExportJob
+from django_mri.models.normative_statistics import NormativeStatistics
 from django_mri.models.scan import Scan
 from django_mri.models.score import Score
+from django_mri.utils.derivatives import DerivativesLayout
+from django_mri.utils.staging import remove_stale_staging_directories
 from django_mri.utils.utils import get_subject_model
 
 
@@ -70,3 +75,95 @@ def build_bids_directory(
     subjects.build_bids_directory(
         progressbar=False, force=force, persistent=persistent
     )
+
+
+@shared_task(name="django_mri.remove-stale-staging")
+def remove_stale_staging() -> int:
+    """
+    Removes conversion staging directories left behind by interrupted jobs.
+
+    Returns
+    -------
+    int
+        Number of removed directories
+    """
+    return remove_stale_staging_directories()
+
+
+@shared_task(name="django_mri.build-export")
+def build_export(export_job_id: int) -> str:
+    """
+    Builds the archive of an
+    :class:`~django_mri.models.export_job.ExportJob` instance.
+
+    Parameters
+    ----------
+    export_job_id : int
+        ExportJob instance ID
+
+    Returns
+    -------
+    str
+        Archive path
+    """
+    export_job = ExportJob.objects.get(id=export_job_id)
+    return str(export_job.build())
+
+
+@shared_task(name="django_mri.refresh-acquisition-summary")
+def refresh_acquisition_summary() -> int:
+    """
+    Rebuilds all
+    :class:`~django_mri.models.acquisition_summary.AcquisitionSummary` rows.
+    Meant to be scheduled periodically, either as the only refresh mechanism
+    (with *MRI_SUMMARY_AUTO_REFRESH* disabled) or to correct changes not
+    tracked by signals (e.g. bulk updates).
+
+    Returns
+    -------
+    int
+        Number of created summary rows
+    """
+    return AcquisitionSummary.objects.refresh()
+
+
+@shared_task(name="django_mri.export-derivatives")
+def export_derivatives(run_ids: Iterable[int], link: bool = True) -> int:
+    """
+    Exports the outputs of the provided analysis runs to the BIDS derivatives
+    directory.
+
+    Parameters
+    ----------
+    run_ids : Iterable[int]
+        Run instance IDs
+    link : bool, optional
+        Whether to hard-link outputs instead of copying them where possible,
+        by default True
+
+    Returns
+    -------
+    int
+        Number of exported files
+    """
+    runs = Run.objects.filter(id__in=run_ids).select_related(
+        "analysis_version__analysis"
+    )
+    return len(DerivativesLayout().export_runs(runs, link=link))
+
+
+@shared_task(name="django_mri.rebuild-normative-statistics")
+def rebuild_normative_statistics() -> int:
+    """
+    Rebuilds all
+    :class:`~django_mri.models.normative_statistics.NormativeStatistics`
+    from the existing scores (existing scores are backfilled by migration).
+    May be scheduled periodically to correct changes that are not tracked
+    incrementally.
+
+    Returns
+    -------
+    int
+        Number of created groups
+    """
+    return NormativeStatistics.objects.rebuild()
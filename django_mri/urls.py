@@ -32,6 +32,8 @@ router.register(r"atlas", views.AtlasViewSet)
 router.register(r"metric", views.MetricViewSet)
 router.register(r"region", views.RegionViewSet)
 router.register(r"score", views.ScoreViewSet)
+router.register(r"export", views.ExportJobViewSet)
+router.register(r"summary", views.AcquisitionSummaryViewSet)
 
 
 urlpatterns = [
@@ -0,0 +1,357 @@
+"""
+Definition of the :class:`ArchiveStream` class and related utilities, used to
+stream ZIP and TAR archives of data files with constant memory usage.
+"""
+import io
+import os
+import tarfile
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import (
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Tuple,
+    Union,
+)
+
+from django.utils.functional import cached_property
+
+#: Supported archive formats.
+ZIP: str = "zip"
+TAR: str = "tar"
+ARCHIVE_FORMATS: Tuple[str] = (ZIP, TAR)
+
+#: Suffixes of files that are already compressed and should be stored as-is.
+STORED_SUFFIXES: Tuple[str] = (".gz", ".zip", ".bz2", ".xz", ".png", ".jpg")
+
+#: Default size (in bytes) of individual read operations.
+DEFAULT_CHUNK_SIZE: int = 1024 * 1024
+
+#: Default number of threads used to read files.
+DEFAULT_MAX_WORKERS: int = 4
+
+#: Default number of chunks read ahead of the archive writer.
+DEFAULT_PREFETCH: int = 8
+
+#: TAR header encoding configuration.
+ENCODING: str = "utf-8"
+ERRORS: str = "surrogateescape"
+
+#: Content types by archive format.
+CONTENT_TYPES = {ZIP: "application/zip", TAR: "application/x-tar"}
+
+UNKNOWN_ARCHIVE_FORMAT: str = "Invalid archive format '{archive_format}'! Supported formats are: {supported}."  # noqa: E501
+
+
+class ArchiveEntry(NamedTuple):
+    """
+    A single member of an archive, either read from *path* or written from
+    in-memory *content*.
+    """
+
+    #: Member name within the archive.
+    name: str
+
+    #: Source file path.
+    path: Path = None
+
+    #: In-memory content (used for generated files).
+    content: bytes = None
+
+    #: Whether to store the member without compression regardless of its
+    #: suffix (e.g. for DICOM files, which barely compress).
+    stored: bool = False
+
+    @property
+    def size(self) -> int:
+        if self.content is not None:
+            return len(self.content)
+        return os.stat(self.path).st_size
+
+    @property
+    def mtime(self) -> float:
+        if self.content is not None:
+            return time.time()
+        return os.stat(self.path).st_mtime
+
+    @property
+    def is_compressed(self) -> bool:
+        return self.stored or str(self.name).lower().endswith(STORED_SUFFIXES)
+
+
+class StreamBuffer(io.RawIOBase):
+    """
+    Unseekable write-only buffer that is drained by the archive generator
+    after every write, so that only a single chunk is held in memory.
+    """
+
+    def __init__(self) -> None:
+        self._chunks: List[bytes] = []
+        self._position: int = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: bytes) -> int:
+        if data:
+            self._chunks.append(bytes(data))
+            self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def pop(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _tar_padding(size: int) -> bytes:
+    remainder = size % tarfile.BLOCKSIZE
+    if remainder:
+        return tarfile.NUL * (tarfile.BLOCKSIZE - remainder)
+    return b""
+
+
+def _read_chunk(path: Path, offset: int, size: int) -> bytes:
+    with open(path, "rb") as f:
+        f.seek(offset)
+        return f.read(size)
+
+
+def iter_entry_chunks(
+    entries: List[ArchiveEntry],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    prefetch: int = DEFAULT_PREFETCH,
+) -> Iterator[Tuple[int, bytes]]:
+    """
+    Reads the provided entries in fixed-size chunks using a thread pool,
+    keeping at most *prefetch* chunks in flight.
+
+    Parameters
+    ----------
+    entries : List[ArchiveEntry]
+        Archive entries
+    chunk_size : int, optional
+        Size of individual reads, by default :attr:`DEFAULT_CHUNK_SIZE`
+    max_workers : int, optional
+        Number of reader threads, by default :attr:`DEFAULT_MAX_WORKERS`
+    prefetch : int, optional
+        Maximal number of chunks read ahead, by default
+        :attr:`DEFAULT_PREFETCH`
+
+    Yields
+    ------
+    Tuple[int, bytes]
+        Entry index and chunk, in archive order
+    """
+
+    def jobs():
+        for index, entry in enumerate(entries):
+            if entry.content is not None:
+                yield index, None, 0, 0
+                continue
+            size = entry.size
+            for offset in range(0, size, chunk_size) or [0]:
+                yield index, entry.path, offset, min(chunk_size, size - offset)
+
+    def resolve(index: int, future) -> Tuple[int, bytes]:
+        if future is None:
+            return index, entries[index].content
+        return index, future.result()
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = deque()
+        for index, path, offset, size in jobs():
+            future = None
+            if path is not None:
+                future = executor.submit(_read_chunk, path, offset, size)
+            pending.append((index, future))
+            if len(pending) >= prefetch:
+                yield resolve(*pending.popleft())
+        while pending:
+            yield resolve(*pending.popleft())
+
+
+class ArchiveStream:
+    """
+    Streams a ZIP or TAR archive of the provided entries. Files are read
+    concurrently in fixed-size chunks and written to the output as soon as
+    they are available, so memory usage is independent of the archive's size.
+    Members that are already compressed (e.g. *.nii.gz*) are stored without
+    recompression.
+
+    Examples
+    --------
+    Write an archive to disk:
+
+    >>> ArchiveStream(entries).write_to("/tmp/export.zip")
+
+    Stream an archive as an HTTP response:
+
+    >>> StreamingHttpResponse(ArchiveStream(entries))
+    """
+
+    def __init__(
+        self,
+        entries: Iterable[ArchiveEntry],
+        archive_format: str = ZIP,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        prefetch: int = DEFAULT_PREFETCH,
+    ) -> None:
+        if archive_format not in ARCHIVE_FORMATS:
+            message = UNKNOWN_ARCHIVE_FORMAT.format(
+                archive_format=archive_format, supported=ARCHIVE_FORMATS
+            )
+            raise ValueError(message)
+        self.entries = list(entries)
+        self.archive_format = archive_format
+        self.chunk_size = chunk_size
+        self.max_workers = max_workers
+        self.prefetch = prefetch
+        self.bytes_read = 0
+
+    def __iter__(self) -> Iterator[bytes]:
+        if self.archive_format == ZIP:
+            return self.iter_zip()
+        return self.iter_tar()
+
+    def iter_chunks(self) -> Iterator[Tuple[int, bytes]]:
+        self.bytes_read = 0
+        for index, chunk in iter_entry_chunks(
+            self.entries,
+            chunk_size=self.chunk_size,
+            max_workers=self.max_workers,
+            prefetch=self.prefetch,
+        ):
+            self.bytes_read += len(chunk)
+            yield index, chunk
+
+    def get_zip_info(self, entry: ArchiveEntry) -> zipfile.ZipInfo:
+        date_time = time.localtime(entry.mtime)[:6]
+        info = zipfile.ZipInfo(str(entry.name), date_time=date_time)
+        info.compress_type = (
+            zipfile.ZIP_STORED if entry.is_compressed else zipfile.ZIP_DEFLATED
+        )
+        info.external_attr = 0o644 << 16
+        return info
+
+    def get_tar_info(self, entry: ArchiveEntry) -> tarfile.TarInfo:
+        info = tarfile.TarInfo(str(entry.name))
+        info.size = entry.size
+        info.mtime = int(entry.mtime)
+        info.mode = 0o644
+        return info
+
+    def iter_zip(self) -> Iterator[bytes]:
+        """
+        Generates the ZIP archive's bytes. ZIP64 extensions are always
+        enabled so that members and archives larger than 4 GiB are supported.
+
+        Yields
+        ------
+        bytes
+            Archive data
+        """
+        buffer = StreamBuffer()
+        with zipfile.ZipFile(buffer, "w", allowZip64=True) as archive:
+            member, current = None, None
+            for index, chunk in self.iter_chunks():
+                if index != current:
+                    if member is not None:
+                        member.close()
+                    info = self.get_zip_info(self.entries[index])
+                    member = archive.open(info, "w", force_zip64=True)
+                    current = index
+                member.write(chunk)
+                yield buffer.pop()
+            if member is not None:
+                member.close()
+        yield buffer.pop()
+
+    def iter_tar(self) -> Iterator[bytes]:
+        """
+        Generates the TAR (POSIX.1-2001) archive's bytes. Headers and block
+        padding are written directly rather than through :mod:`tarfile`, which
+        would otherwise buffer entire members.
+
+        Yields
+        ------
+        bytes
+            Archive data
+        """
+        current, written = None, 0
+        for index, chunk in self.iter_chunks():
+            if index != current:
+                if current is not None:
+                    yield _tar_padding(written)
+                info = self.get_tar_info(self.entries[index])
+                yield info.tobuf(tarfile.PAX_FORMAT, ENCODING, ERRORS)
+                current, written = index, 0
+            written += len(chunk)
+            yield chunk
+        if current is not None:
+            yield _tar_padding(written)
+        yield tarfile.NUL * (tarfile.BLOCKSIZE * 2)
+
+    def write_to(
+        self, destination: Union[Path, str], callback: Callable = None
+    ) -> Path:
+        """
+        Writes the archive to the provided *destination*. The archive is
+        first written to a temporary file in the same directory and then
+        renamed, so that partial archives are never exposed.
+
+        Parameters
+        ----------
+        destination : Union[Path, str]
+            Output archive path
+        callback : Callable, optional
+            Called with this instance after every write (e.g. to report
+            :attr:`progress`), by default None
+
+        Returns
+        -------
+        Path
+            Output archive path
+        """
+        destination = Path(destination)
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        partial = destination.with_name(f".{destination.name}.partial")
+        try:
+            with open(partial, "wb") as f:
+                for data in self:
+                    f.write(data)
+                    if callback is not None:
+                        callback(self)
+            os.replace(partial, destination)
+        finally:
+            if partial.exists():
+                partial.unlink()
+        return destination
+
+    @cached_property
+    def total_size(self) -> int:
+        """
+        Returns the total size of the archive's members (before compression),
+        used together with :attr:`bytes_read` to report progress.
+        """
+        return sum(entry.size for entry in self.entries)
+
+    @property
+    def progress(self) -> float:
+        total_size = self.total_size
+        return self.bytes_read / total_size if total_size else 1.0
+
+    @property
+    def content_type(self) -> str:
+        return CONTENT_TYPES[self.archive_format]
@@ -13,8 +13,10 @@ from typing import Union
 import nibabel as nib
 import pandas as pd
 from django.apps import apps
-from django.db.models import Q
+from django.db.models import Q, QuerySet
 from django_mri.utils import logs
+from django_mri.utils.bids_validation import BidsValidator
+from django_mri.utils.demographics import get_participants_dataframe
 from django_mri.utils.utils import get_bids_dir
 
 BASE_DIR = Path(__file__).parent
@@ -49,6 +51,44 @@ class BidsManager:
     def __init__(self, bids_dir: Union[Path, str] = None) -> None:
         self.bids_dir = bids_dir or get_bids_dir()
         self.bids_dir.mkdir(exist_ok=True, parents=True)
+        self.validator = BidsValidator(self.bids_dir)
+
+    def validate(self, subject: str = None) -> int:
+        """
+        Incrementally validates the BIDS directory, re-checking only files
+        that changed since the last pass.
+
+        Parameters
+        ----------
+        subject : str, optional
+            BIDS subject label to limit validation to, by default None
+
+        Returns
+        -------
+        int
+            Number of validated files
+
+        See Also
+        --------
+        * :class:`~django_mri.utils.bids_validation.BidsValidator`
+        """
+        return self.validator.update(subject=subject)
+
+    def is_subject_runnable(self, subject) -> bool:
+        """
+        Returns whether all of the given subject's BIDS data files are valid.
+
+        Parameters
+        ----------
+        subject : Union[Model, int, str]
+            Subject instance, primary key or BIDS label
+
+        Returns
+        -------
+        bool
+            Whether pipelines may be launched for this subject
+        """
+        return self.validator.is_subject_runnable(subject)
 
     def calculate_age(self, born: date) -> float:
         """
@@ -368,28 +408,65 @@ class BidsManager:
             https://bids-specification.readthedocs.io/en/stable/03-modality-agnostic-files.html
         """
 
-        subject_dict = self.get_subject_data(scan)
+        subject = scan.session.subject
+        subjects = subject.__class__.objects.filter(id=subject.id)
+        self.update_participants_tsv(subjects)
+
+    def update_participants_tsv(self, subjects: QuerySet) -> pd.DataFrame:
+        """
+        Adds the provided subjects to "participants.tsv" (and creates it along
+        with "participants.json" from the templates if required). Subject
+        information is queried in bulk, so this method should be preferred
+        over :meth:`set_participant_tsv_and_json` when updating multiple
+        subjects.
+
+        Parameters
+        ----------
+        subjects : QuerySet
+            Subject instances
 
+        Returns
+        -------
+        pd.DataFrame
+            Updated participants table
+        """
         participants_tsv = self.bids_dir / self.PARTICIPANTS_FILE_NAME
         participants_json = participants_tsv.with_suffix(".json")
         for participants_file in [participants_tsv, participants_json]:
             if not participants_file.is_file():
                 participants_template = TEMPLATES_DIR / participants_file.name
                 shutil.copy(str(participants_template), str(participants_file))
-        participants_df = pd.read_csv(participants_tsv, sep="\t")
-        subject_dict[
-            "participant_id"
-        ] = f"sub-{subject_dict['participant_id']}"
-        if (
-            not subject_dict["participant_id"]
-            in participants_df["participant_id"].values
-        ):
-            participants_df = participants_df.append(
-                pd.DataFrame(subject_dict, index=[0]), ignore_index=True
+        # Keep "n/a" labels as-is rather than parsing them as missing values.
+        participants_df = pd.read_csv(
+            participants_tsv, sep="\t", dtype=str, keep_default_na=False
+        )
+        new_participants = get_participants_dataframe(subjects)
+        is_new = ~new_participants["participant_id"].isin(
+            participants_df["participant_id"]
+        )
+        if is_new.any():
+            participants_df = pd.concat(
+                [participants_df, new_participants[is_new]], ignore_index=True
             )
             participants_df.to_csv(participants_tsv, sep="\t", index=False)
-        else:
-            pass
+        return participants_df
+
+    def get_participants_data(self, subjects: QuerySet) -> pd.DataFrame:
+        """
+        Returns "participants.tsv" rows for the provided subjects using a
+        single query.
+
+        Parameters
+        ----------
+        subjects : QuerySet
+            Subject instances
+
+        Returns
+        -------
+        pd.DataFrame
+            Participants table
+        """
+        return get_participants_dataframe(subjects)
 
     def set_description_json(self):
         """
@@ -0,0 +1,238 @@
+"""
+Definition of the :class:`BidsExporter` class.
+"""
+import io
+import logging
+from pathlib import Path
+from typing import Iterator, List, Union
+
+from django.db.models import QuerySet
+from django.http import StreamingHttpResponse
+from django_mri.utils.archive import ZIP, ArchiveEntry, ArchiveStream
+from django_mri.utils.bids import TEMPLATES_DIR, BidsManager
+from django_mri.utils.utils import get_bids_dir, get_subject_model
+
+#: Files generated at the root of the exported dataset.
+PARTICIPANTS_JSON_FILE_NAME: str = "participants.json"
+README_FILE_NAME: str = "README"
+BIDSIGNORE_FILE_NAME: str = ".bidsignore"
+
+#: Exported archive's default name (without extension).
+DEFAULT_ARCHIVE_NAME: str = "bids"
+
+CONTENT_DISPOSITION: str = "attachment; filename={name}.{extension}"
+
+
+class BidsExporter:
+    """
+    Exports a BIDS-compliant subset of the dataset as a single archive.
+
+    Data files are collected from the scans' associated
+    :class:`~django_mri.models.nifti.NIfTI` instances and the dataset-level
+    *participants.tsv* and *dataset_description.json* files are generated for
+    the exported subjects. The archive itself is streamed by
+    :class:`~django_mri.utils.archive.ArchiveStream`, so memory usage is
+    independent of the dataset's size.
+
+    Examples
+    --------
+    >>> scans = Scan.objects.filter(session__subject__id__in=[1, 2, 3])
+    >>> BidsExporter(scans).write("/tmp/bids.zip")
+    """
+
+    _logger = logging.getLogger("data.mri.bids")
+
+    def __init__(
+        self,
+        scans: QuerySet,
+        bids_dir: Union[Path, str] = None,
+        archive_format: str = ZIP,
+        **stream_kwargs,
+    ) -> None:
+        self.scans = scans
+        self.bids_dir = Path(bids_dir or get_bids_dir())
+        self.archive_format = archive_format
+        self.stream_kwargs = stream_kwargs
+        self.bids_manager = BidsManager(self.bids_dir)
+
+    def query_scans(self) -> QuerySet:
+        """
+        Returns the scans to export, including their associated NIfTI, DICOM
+        series and subject instances in a single query.
+
+        Returns
+        -------
+        QuerySet
+            Scans with an associated NIfTI instance
+        """
+        return (
+            self.scans.filter(_nifti__isnull=False)
+            .select_related("_nifti", "dicom", "session__subject")
+            .order_by("session__subject", "session__time", "number")
+        )
+
+    def iter_data_entries(self, scans: List) -> Iterator[ArchiveEntry]:
+        """
+        Generates archive entries for the scans' data files. Files that do not
+        reside within the BIDS directory are skipped.
+
+        Parameters
+        ----------
+        scans : List
+            :class:`~django_mri.models.scan.Scan` instances
+
+        Yields
+        ------
+        ArchiveEntry
+            Data file archive entry
+        """
+        seen = set()
+        for scan in scans:
+            for path in scan._nifti.get_file_paths():
+                path = Path(path)
+                try:
+                    name = path.relative_to(self.bids_dir).as_posix()
+                except ValueError:
+                    self._logger.debug(
+                        f"Skipping non-BIDS file for scan #{scan.id}: {path}"
+                    )
+                    continue
+                if name not in seen and path.is_file():
+                    seen.add(name)
+                    yield ArchiveEntry(name=name, path=path)
+
+    def generate_participants_tsv(self, scans: List) -> bytes:
+        """
+        Generates the *participants.tsv* content for the exported subjects.
+
+        Parameters
+        ----------
+        scans : List
+            :class:`~django_mri.models.scan.Scan` instances
+
+        Returns
+        -------
+        bytes
+            *participants.tsv* content
+        """
+        subject_ids = {scan.session.subject_id for scan in scans}
+        subject_ids.discard(None)
+        Subject = get_subject_model()
+        subjects = Subject.objects.filter(id__in=subject_ids)
+        df = self.bids_manager.get_participants_data(subjects)
+        buffer = io.StringIO()
+        df.to_csv(buffer, sep="\t", index=False)
+        return buffer.getvalue().encode()
+
+    def read_dataset_file(self, name: str) -> bytes:
+        """
+        Returns the content of the dataset-level file with the given *name*,
+        falling back to the template if it does not exist in the BIDS
+        directory.
+
+        Parameters
+        ----------
+        name : str
+            File name
+
+        Returns
+        -------
+        bytes
+            File content
+        """
+        path = self.bids_dir / name
+        if not path.is_file():
+            path = TEMPLATES_DIR / name
+        return path.read_bytes()
+
+    def get_entries(self) -> List[ArchiveEntry]:
+        """
+        Returns all archive entries, starting with the dataset-level files.
+
+        Returns
+        -------
+        List[ArchiveEntry]
+            Archive entries
+        """
+        scans = list(self.query_scans())
+        description = self.bids_manager.DATASET_DESCRIPTION_FILE_NAME
+        entries = [
+            ArchiveEntry(
+                name=description, content=self.read_dataset_file(description)
+            ),
+            ArchiveEntry(
+                name=self.bids_manager.PARTICIPANTS_FILE_NAME,
+                content=self.generate_participants_tsv(scans),
+            ),
+            ArchiveEntry(
+                name=PARTICIPANTS_JSON_FILE_NAME,
+                content=self.read_dataset_file(PARTICIPANTS_JSON_FILE_NAME),
+            ),
+            ArchiveEntry(
+                name=README_FILE_NAME,
+                content=self.read_dataset_file(README_FILE_NAME),
+            ),
+        ]
+        bidsignore = self.bids_dir / BIDSIGNORE_FILE_NAME
+        if bidsignore.is_file():
+            entries.append(
+                ArchiveEntry(name=BIDSIGNORE_FILE_NAME, path=bidsignore)
+            )
+        return entries + list(self.iter_data_entries(scans))
+
+    def to_stream(self) -> ArchiveStream:
+        """
+        Returns the exported dataset's archive stream.
+
+        Returns
+        -------
+        ArchiveStream
+            Archive stream
+        """
+        return ArchiveStream(
+            self.get_entries(),
+            archive_format=self.archive_format,
+            **self.stream_kwargs,
+        )
+
+    def write(self, destination: Union[Path, str]) -> Path:
+        """
+        Writes the exported dataset's archive to *destination*.
+
+        Parameters
+        ----------
+        destination : Union[Path, str]
+            Output archive path
+
+        Returns
+        -------
+        Path
+            Output archive path
+        """
+        return self.to_stream().write_to(destination)
+
+    def to_response(
+        self, name: str = DEFAULT_ARCHIVE_NAME
+    ) -> StreamingHttpResponse:
+        """
+        Returns a streaming HTTP response of the exported dataset's archive.
+
+        Parameters
+        ----------
+        name : str, optional
+            Downloaded file name (without extension), by default
+            :attr:`DEFAULT_ARCHIVE_NAME`
+
+        Returns
+        -------
+        StreamingHttpResponse
+            Streamed archive response
+        """
+        stream = self.to_stream()
+        response = StreamingHttpResponse(
+            stream, content_type=stream.content_type
+        )
+        response["Content-Disposition"] = CONTENT_DISPOSITION.format(
+            name=name, extension=self.archive_format
+        )
+        return response
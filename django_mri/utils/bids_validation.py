@@ -0,0 +1,394 @@
+"""
+Definition of the :class:`BidsValidator` class.
+"""
+import json
+import logging
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, Union
+
+from django.apps import apps
+from django.db import transaction
+from django_mri.utils.utils import get_bids_dir
+
+#: BIDS data file name pattern.
+BIDS_NAME_PATTERN = re.compile(
+    r"^sub-(?P<subject>[a-zA-Z0-9]+)"
+    r"(_ses-(?P<session>[a-zA-Z0-9]+))?"
+    r"(_[a-zA-Z]+-[a-zA-Z0-9]+)*"
+    r"_(?P<suffix>[a-zA-Z0-9]+)\.nii(\.gz)?$"
+)
+
+#: Supported BIDS data types (data file parent directory names).
+DATATYPES = ("anat", "func", "dwi", "fmap", "perf")
+
+#: Sidecar keys required by the BIDS specification by file suffix.
+REQUIRED_SIDECAR_KEYS: Dict[str, tuple] = {
+    "bold": ("TaskName", "RepetitionTime"),
+    "sbref": ("TaskName",),
+    "epi": ("PhaseEncodingDirection", "IntendedFor"),
+}
+
+#: Companion files required by the BIDS specification by file suffix.
+REQUIRED_COMPANIONS: Dict[str, tuple] = {"dwi": (".bval", ".bvec")}
+
+#: Prefix of BIDS URIs, which are relative to the dataset root.
+BIDS_URI_PREFIX: str = "bids::"
+
+#: Fields updated when saving validation results.
+UPDATE_FIELDS = ["subject", "mtime", "is_valid", "errors", "is_stale"]
+
+#: Validation error messages.
+INVALID_NAME: str = "Invalid BIDS file name: {name}"
+INVALID_LOCATION: str = "File is not located at sub-<label>/[ses-<label>/]<datatype>/: {relative_path}"  # noqa: E501
+SUBJECT_MISMATCH: str = "Subject label '{label}' does not match the subject directory ({directory})."  # noqa: E501
+SESSION_MISMATCH: str = "Session label '{label}' does not match the session directory ({directory})."  # noqa: E501
+UNKNOWN_DATATYPE: str = "Unknown datatype directory: {datatype}"
+MISSING_SIDECAR: str = "Missing JSON sidecar with required keys: {keys}"
+INVALID_SIDECAR: str = "Failed to read JSON sidecar: {exception}"
+MISSING_KEY: str = "Missing required sidecar key: {key}"
+MISSING_COMPANION: str = "Missing required companion file: {name}"
+MISSING_TARGET: str = "IntendedFor target does not exist: {target}"
+
+
+def split_name(path: Path) -> str:
+    """
+    Returns the file name without any suffixes (*.nii.gz* files have two).
+    """
+    return Path(path).name.split(".")[0]
+
+
+class BidsValidator:
+    """
+    Incrementally validates the data files within the BIDS directory and
+    caches their state in the database
+    (:class:`~django_mri.models.bids_validation.BidsValidation`).
+
+    Each data file is checked for a valid name and location, for the sidecar
+    keys and companion files required by its suffix, and for the existence of
+    any *IntendedFor* targets. A full pass (:meth:`update`) only re-validates
+    files whose modification time changed, while :meth:`update_stale` only
+    re-validates files flagged by the NIfTI conversion hooks and does not walk
+    the directory tree at all.
+    """
+
+    _logger = logging.getLogger("data.mri.bids")
+
+    def __init__(self, bids_dir: Union[Path, str] = None) -> None:
+        self.bids_dir = Path(bids_dir or get_bids_dir())
+
+    @property
+    def model(self):
+        return apps.get_model("django_mri", "BidsValidation")
+
+    def get_subject_label(self, path: Union[Path, str]) -> str:
+        """
+        Returns the BIDS subject label of a file within the BIDS directory,
+        or *None* if the file isn't in a subject directory.
+        """
+        try:
+            relative_path = Path(path).relative_to(self.bids_dir)
+        except ValueError:
+            return None
+        subject_dir = relative_path.parts[0]
+        if subject_dir.startswith("sub-"):
+            return subject_dir[len("sub-"):]
+
+    def iter_data_files(self, subject: str = None) -> Iterable[Path]:
+        """
+        Generates the data files within the BIDS directory.
+
+        Parameters
+        ----------
+        subject : str, optional
+            BIDS subject label to limit the search to, by default None
+
+        Yields
+        ------
+        Path
+            *.nii* or *.nii.gz* file
+        """
+        pattern = f"sub-{subject}" if subject else "sub-*"
+        for subject_dir in self.bids_dir.glob(pattern):
+            yield from subject_dir.rglob("*.nii*")
+
+    def get_mtime(self, path: Path) -> float:
+        """
+        Returns the latest modification time of the data file and its JSON
+        sidecar.
+        """
+        mtime = path.stat().st_mtime
+        sidecar = path.with_name(split_name(path) + ".json")
+        if sidecar.exists():
+            mtime = max(mtime, sidecar.stat().st_mtime)
+        return mtime
+
+    def validate_location(self, path: Path) -> List[str]:
+        relative_path = path.relative_to(self.bids_dir)
+        parts = relative_path.parts
+        match = BIDS_NAME_PATTERN.match(path.name)
+        if not match:
+            return [INVALID_NAME.format(name=path.name)]
+        if len(parts) not in (3, 4):
+            return [INVALID_LOCATION.format(relative_path=relative_path)]
+        errors = []
+        subject_label = match.group("subject")
+        if parts[0] != f"sub-{subject_label}":
+            errors.append(
+                SUBJECT_MISMATCH.format(
+                    label=subject_label, directory=parts[0]
+                )
+            )
+        session_label = match.group("session")
+        if len(parts) == 4 and parts[1] != f"ses-{session_label}":
+            errors.append(
+                SESSION_MISMATCH.format(
+                    label=session_label, directory=parts[1]
+                )
+            )
+        datatype = parts[-2]
+        if datatype not in DATATYPES:
+            errors.append(UNKNOWN_DATATYPE.format(datatype=datatype))
+        return errors
+
+    def validate_intended_for(self, path: Path, targets) -> List[str]:
+        if isinstance(targets, str):
+            targets = [targets]
+        subject_dir = self.bids_dir / path.relative_to(self.bids_dir).parts[0]
+        errors = []
+        for target in targets:
+            if target.startswith(BIDS_URI_PREFIX):
+                target_path = self.bids_dir / target[len(BIDS_URI_PREFIX):]
+            else:
+                target_path = subject_dir / target
+            if not target_path.exists():
+                errors.append(MISSING_TARGET.format(target=target))
+        return errors
+
+    def validate_file(self, path: Union[Path, str]) -> List[str]:
+        """
+        Validates a single data file.
+
+        Parameters
+        ----------
+        path : Union[Path, str]
+            Data file path
+
+        Returns
+        -------
+        List[str]
+            Validation errors (empty if the file is valid)
+        """
+        path = Path(path)
+        errors = self.validate_location(path)
+        match = BIDS_NAME_PATTERN.match(path.name)
+        suffix = match.group("suffix") if match else None
+        base_name = split_name(path)
+        for extension in REQUIRED_COMPANIONS.get(suffix, ()):
+            companion = path.with_name(base_name + extension)
+            if not companion.exists():
+                errors.append(MISSING_COMPANION.format(name=companion.name))
+        required_keys = REQUIRED_SIDECAR_KEYS.get(suffix, ())
+        sidecar = path.with_name(base_name + ".json")
+        if not sidecar.exists():
+            if required_keys:
+                errors.append(MISSING_SIDECAR.format(keys=required_keys))
+            return errors
+        try:
+            with open(sidecar, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            return errors + [INVALID_SIDECAR.format(exception=e)]
+        errors += [
+            MISSING_KEY.format(key=key)
+            for key in required_keys
+            if key not in data
+        ]
+        if "IntendedFor" in data:
+            errors += self.validate_intended_for(path, data["IntendedFor"])
+        return errors
+
+    def build_record(self, path: Path, mtime: float = None):
+        errors = self.validate_file(path)
+        return self.model(
+            path=str(path),
+            subject=self.get_subject_label(path),
+            mtime=mtime if mtime is not None else self.get_mtime(path),
+            is_valid=not errors,
+            errors=errors,
+            is_stale=False,
+        )
+
+    def save_records(self, records: list) -> None:
+        self.model.objects.bulk_create(
+            records,
+            update_conflicts=True,
+            unique_fields=["path"],
+            update_fields=UPDATE_FIELDS,
+        )
+
+    def update(self, subject: str = None) -> int:
+        """
+        Runs a full validation pass, re-validating only new files and files
+        that were modified since they were last validated. Fieldmaps of
+        subjects in which files were added or removed are re-validated as
+        well, since their *IntendedFor* targets may have changed.
+
+        Parameters
+        ----------
+        subject : str, optional
+            BIDS subject label to limit the pass to, by default None
+
+        Returns
+        -------
+        int
+            Number of validated files
+        """
+        queryset = self.model.objects.all()
+        if subject is not None:
+            queryset = queryset.filter_by_subject(subject)
+        known = dict(queryset.values_list("path", "mtime"))
+        stale = set(
+            queryset.filter(is_stale=True).values_list("path", flat=True)
+        )
+        current = {
+            str(path): self.get_mtime(path)
+            for path in self.iter_data_files(subject)
+        }
+        added = current.keys() - known.keys()
+        removed = known.keys() - current.keys()
+        affected_subjects = {
+            self.get_subject_label(path) for path in added | removed
+        }
+        changed = {
+            path
+            for path, mtime in current.items()
+            if path in stale
+            or known.get(path) != mtime
+            or (
+                self.get_subject_label(path) in affected_subjects
+                and Path(path).parent.name == "fmap"
+            )
+        }
+        records = [self.build_record(Path(p), current[p]) for p in changed]
+        with transaction.atomic():
+            queryset.filter(path__in=removed).delete()
+            self.save_records(records)
+        self._logger.debug(
+            f"BIDS validation pass: {len(records)} validated, {len(removed)} removed."  # noqa: E501
+        )
+        return len(records)
+
+    def update_stale(self, subject: str = None) -> int:
+        """
+        Re-validates only files flagged as stale by the conversion hooks.
+
+        Parameters
+        ----------
+        subject : str, optional
+            BIDS subject label to limit validation to, by default None
+
+        Returns
+        -------
+        int
+            Number of validated files
+        """
+        queryset = self.model.objects.filter(is_stale=True)
+        if subject is not None:
+            queryset = queryset.filter_by_subject(subject)
+        records, missing = [], []
+        for path in queryset.values_list("path", flat=True):
+            path = Path(path)
+            if path.exists():
+                records.append(self.build_record(path))
+            else:
+                missing.append(str(path))
+        with transaction.atomic():
+            self.model.objects.filter(path__in=missing).delete()
+            self.save_records(records)
+        return len(records)
+
+    def invalidate(self, path: Union[Path, str]) -> None:
+        """
+        Flags a (new or modified) data file for validation. Used as a
+        conversion hook.
+
+        Parameters
+        ----------
+        path : Union[Path, str]
+            Data file path
+        """
+        self.invalidate_many([path])
+
+    def invalidate_many(self, paths: Iterable[Union[Path, str]]) -> int:
+        """
+        Flags (new or modified) data files for validation using a single
+        query. Files outside of the BIDS directory's subject directories are
+        ignored.
+
+        Parameters
+        ----------
+        paths : Iterable[Union[Path, str]]
+            Data file paths
+
+        Returns
+        -------
+        int
+            Number of flagged files
+        """
+        records = []
+        for path in set(map(str, paths)):
+            subject = self.get_subject_label(path)
+            if subject is not None:
+                records.append(
+                    self.model(path=path, subject=subject, is_stale=True)
+                )
+        self.model.objects.bulk_create(
+            records,
+            update_conflicts=True,
+            unique_fields=["path"],
+            update_fields=["subject", "is_stale"],
+        )
+        return len(records)
+
+    def remove(self, path: Union[Path, str]) -> None:
+        """
+        Removes a deleted data file's record and flags its subject's
+        fieldmaps for validation. Used as a conversion hook.
+
+        Parameters
+        ----------
+        path : Union[Path, str]
+            Data file path
+        """
+        subject = self.get_subject_label(path)
+        if subject is None:
+            return
+        records = self.model.objects.filter_by_subject(subject)
+        records.filter(path=str(path)).delete()
+        records.filter(path__contains="/fmap/").update(is_stale=True)
+
+    def is_subject_runnable(self, subject) -> bool:
+        """
+        Returns whether all of the given subject's data files are valid.
+        Only files flagged by the conversion hooks are re-validated, so this
+        check does not walk the directory tree.
+
+        Parameters
+        ----------
+        subject : Union[Model, int, str]
+            Subject instance, primary key or BIDS label
+
+        Returns
+        -------
+        bool
+            Whether the subject's data may be used to launch pipelines
+        """
+        label = str(getattr(subject, "id", subject))
+        self.update_stale(subject=label)
+        records = self.model.objects.filter_by_subject(label)
+        if not records.exists():
+            # Subject was never validated, run a full pass limited to its
+            # directory.
+            self.update(subject=label)
+        return records.exists() and not records.filter_invalid().exists()
@@ -0,0 +1,44 @@
+"""
+Per-model versions used to invalidate cached API responses and validators
+(see :mod:`django_mri.views.caching`).
+"""
+import time
+
+from django.core.cache import cache
+from django.db.models import Model
+
+#: Cache key template of model versions.
+MODEL_VERSION_KEY: str = "django_mri:version:{label}"
+
+
+def get_model_version(model: Model) -> int:
+    """
+    Returns the current version of the provided model, which changes every
+    time an instance is saved or deleted.
+
+    Parameters
+    ----------
+    model : Model
+        Model class
+
+    Returns
+    -------
+    int
+        Model version
+    """
+    key = MODEL_VERSION_KEY.format(label=model._meta.label_lower)
+    return cache.get_or_set(key, time.time_ns, timeout=None)
+
+
+def bump_model_version(model: Model) -> None:
+    """
+    Changes the version of the provided model, invalidating any cached
+    responses and validators derived from it.
+
+    Parameters
+    ----------
+    model : Model
+        Model class
+    """
+    key = MODEL_VERSION_KEY.format(label=model._meta.label_lower)
+    cache.set(key, time.time_ns(), timeout=None)
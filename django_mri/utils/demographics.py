@@ -0,0 +1,153 @@
+"""
+Bulk subject demographics utilities.
+"""
+from datetime import date
+
+import numpy as np
+import pandas as pd
+from django.db.models import DateField, F, FloatField, Func, QuerySet
+from django.db.models.functions import Cast
+
+#: Name of the annotation added by :func:`annotate_age_at_acquisition`.
+AGE_ANNOTATION: str = "age_at_acquisition"
+
+#: Number of days in a year, matching the Python implementation of
+#: :attr:`~django_mri.models.scan.Scan.subject_age`.
+DAYS_IN_YEAR: float = 365.0
+
+#: BIDS *participants.tsv* columns.
+PARTICIPANTS_COLUMNS = ["participant_id", "handedness", "age", "sex"]
+
+#: Handedness values that are included as-is in *participants.tsv*.
+HANDEDNESS_VALUES = ("R", "L", "A")
+
+#: BIDS "not available" label.
+NA_LABEL: str = "n/a"
+
+#: Oldest age reported in *participants.tsv* (older ages are reported as
+#: "89+" for anonymity).
+MAX_REPORTED_AGE: int = 89
+
+
+class YearsBetween(Func):
+    """
+    Returns the number of years between two date expressions, computed in
+    the database as the difference in days divided by
+    :attr:`DAYS_IN_YEAR`.
+    """
+
+    arg_joiner = " - "
+    template = f"((%(expressions)s)::float / {DAYS_IN_YEAR})"
+    output_field = FloatField()
+
+
+def age_at_acquisition(time_field: str, date_of_birth_field: str) -> Func:
+    """
+    Returns an expression evaluating the subject's age (in years) at the time
+    of acquisition.
+
+    Parameters
+    ----------
+    time_field : str
+        Acquisition datetime field lookup
+    date_of_birth_field : str
+        Subject date of birth field lookup
+
+    Returns
+    -------
+    Func
+        Age expression
+    """
+    return YearsBetween(
+        Cast(F(time_field), output_field=DateField()), F(date_of_birth_field)
+    )
+
+
+def annotate_age_at_acquisition(
+    queryset: QuerySet, time_field: str, date_of_birth_field: str
+) -> QuerySet:
+    """
+    Annotates the queryset with the subject's age at the time of acquisition
+    as :attr:`AGE_ANNOTATION`.
+    """
+    expression = age_at_acquisition(time_field, date_of_birth_field)
+    return queryset.annotate(**{AGE_ANNOTATION: expression})
+
+
+def get_annotated_age(instance):
+    """
+    Returns a tuple of whether the instance was annotated with the subject's
+    age and the annotated value.
+    """
+    if AGE_ANNOTATION in instance.__dict__:
+        return True, instance.__dict__[AGE_ANNOTATION]
+    return False, None
+
+
+def calculate_participant_ages(
+    dates_of_birth: pd.Series, today: date = None
+) -> pd.Series:
+    """
+    Vectorized equivalent of
+    :meth:`~django_mri.utils.bids.BidsManager.calculate_age`.
+
+    Parameters
+    ----------
+    dates_of_birth : pd.Series
+        Subject dates of birth
+    today : date, optional
+        Reference date, by default today
+
+    Returns
+    -------
+    pd.Series
+        Age labels
+    """
+    today = today or date.today()
+    born = pd.to_datetime(dates_of_birth, errors="coerce")
+    before_birthday = (today.month < born.dt.month) | (
+        (today.month == born.dt.month) & (today.day < born.dt.day)
+    )
+    years = today.year - born.dt.year - before_birthday.astype(int)
+    labels = years.astype("Int64").astype(str)
+    labels[years >= MAX_REPORTED_AGE] = f"{MAX_REPORTED_AGE}+"
+    labels[born.isna()] = NA_LABEL
+    return labels
+
+
+def get_participants_dataframe(subjects: QuerySet) -> pd.DataFrame:
+    """
+    Returns BIDS *participants.tsv* rows for the provided subjects using a
+    single query.
+
+    Parameters
+    ----------
+    subjects : QuerySet
+        Subject instances
+
+    Returns
+    -------
+    pd.DataFrame
+        Participants table
+    """
+    values = subjects.order_by("id").values(
+        "id", "dominant_hand", "sex", "date_of_birth"
+    )
+    df = pd.DataFrame.from_records(
+        values, columns=["id", "dominant_hand", "sex", "date_of_birth"]
+    )
+    sex = df["sex"].fillna("")
+    handedness = np.where(
+        df["dominant_hand"].isin(HANDEDNESS_VALUES),
+        df["dominant_hand"].str.lower(),
+        NA_LABEL,
+    )
+    return pd.DataFrame(
+        {
+            "participant_id": "sub-" + df["id"].astype(str),
+            "handedness": handedness,
+            "age": calculate_participant_ages(df["date_of_birth"]),
+            "sex": sex.where(sex != "", NA_LABEL),
+        },
+        columns=PARTICIPANTS_COLUMNS,
+    )
@@ -0,0 +1,367 @@
+"""
+Definition of the :class:`DerivativesLayout` class, used to export analysis
+run outputs to a BIDS derivatives directory.
+"""
+import json
+import logging
+import os
+import re
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Tuple, Union
+
+from django_mri.utils.utils import get_bids_dir, get_mri_root
+
+#: Name of the derivatives directory under the MRI data root.
+DERIVATIVES_DIR_NAME: str = "derivatives"
+
+#: BIDS version declared in generated derivative dataset descriptions.
+BIDS_VERSION: str = "1.6.0"
+
+#: Default number of threads used to copy files and create directories.
+DEFAULT_MAX_WORKERS: int = 8
+
+#: Maximal number of memoized run destinations.
+MAX_CACHED_RUNS: int = 4096
+
+#: Number of seconds a memoized run destination remains valid (runs' inputs
+#: may be modified, so destinations are never memoized indefinitely).
+DESTINATION_CACHE_TTL: float = 300.0
+
+#: Analysis titles with a dedicated layout.
+RECON_ALL: str = "ReconAll"
+FMRIPREP: str = "fMRIPrep"
+DMRIPREP: str = "dMRIPrep"
+
+#: Regular expressions used to resolve fMRIPrep outputs.
+SUBJECT_DIR_PATTERN = re.compile(r"^sub-[0-9]*$")
+SUBJECT_REPORT_PATTERN = re.compile(r"^sub-[0-9]*\.html$")
+
+DESCRIPTION_FILE_NAME: str = "dataset_description.json"
+UNSUPPORTED_ANALYSIS: str = "No derivatives layout is defined for {title} runs!"  # noqa: E501
+
+#: A run's destination directory and a function mapping paths relative to the
+#: run's output directory to paths relative to the destination directory.
+RunDestination = Tuple[Path, Callable[[Path], Path]]
+
+
+def get_analysis_id(analysis_version) -> str:
+    """
+    Returns the name of an analysis version's derivatives directory.
+
+    Parameters
+    ----------
+    analysis_version : AnalysisVersion
+        Analysis version
+
+    Returns
+    -------
+    str
+        Derivatives directory name
+    """
+    return str(analysis_version).replace(" ", "_").replace(".", "").lower()
+
+
+def _map_recon_all_path(relative_path: Path) -> Path:
+    return relative_path
+
+
+def _map_fmriprep_path(relative_path: Path) -> Path:
+    if SUBJECT_REPORT_PATTERN.match(relative_path.name):
+        # Subject HTML reports are saved at the analysis directory's root.
+        return Path("..", relative_path.name)
+    parts = [
+        part
+        for part in relative_path.parts
+        if part != "fmriprep" and not SUBJECT_DIR_PATTERN.match(part)
+    ]
+    return Path(*parts)
+
+
+def _map_dmriprep_path(relative_path: Path) -> Path:
+    return Path(*relative_path.parts[2:])
+
+
+def _transfer_file(source: Path, destination: Path, link: bool) -> Path:
+    """
+    Hard-links (if *link* is True and possible) or copies *source* to
+    *destination*, replacing any existing file.
+    """
+    if destination.exists():
+        destination.unlink()
+    if link:
+        try:
+            os.link(source, destination)
+            return destination
+        except OSError:
+            pass
+    shutil.copy2(source, destination)
+    return destination
+
+
+class DerivativesLayout:
+    """
+    Resolves the destinations of analysis run outputs within the BIDS
+    derivatives directory
+    (*<mri root>/derivatives/<analysis id>/sub-<label>/...*).
+
+    Each run's destination directory is resolved once (querying its inputs
+    only the first time) and memoized for :attr:`DESTINATION_CACHE_TTL`
+    seconds, so that mapping thousands of output files does not require any
+    further queries. Outputs are transferred
+    (hard-linked where possible) by a thread pool.
+
+    Examples
+    --------
+    >>> layout = DerivativesLayout()
+    >>> layout.export_run(run)
+    """
+
+    _logger = logging.getLogger("data.mri.derivatives")
+
+    def __init__(self, root: Union[Path, str] = None) -> None:
+        self.root = Path(root or get_mri_root() / DERIVATIVES_DIR_NAME)
+        self._destinations: Dict[int, Tuple[float, RunDestination]] = {}
+
+    def clear_cache(self) -> None:
+        """
+        Clears the memoized run destinations.
+        """
+        self._destinations.clear()
+
+    def get_analysis_dir(self, analysis_version) -> Path:
+        return self.root / get_analysis_id(analysis_version)
+
+    def resolve_recon_all_destination(self, run) -> RunDestination:
+        t1_files = [
+            i for i in run.input_set.all() if i.definition.key == "T1_files"
+        ][0]
+        t1_path = Path(t1_files.query_related_instance()[0].path)
+        relative_path = t1_path.relative_to(Path(get_bids_dir()))
+        name = relative_path.name.split(".")[0]
+        destination = (
+            self.get_analysis_dir(run.analysis_version)
+            / relative_path.parent
+            / name
+        )
+        return destination, _map_recon_all_path
+
+    def resolve_fmriprep_destination(self, run) -> RunDestination:
+        participant_label = run.get_input("participant_label")[0]
+        destination = (
+            self.get_analysis_dir(run.analysis_version)
+            / f"sub-{participant_label}"
+        )
+        return destination, _map_fmriprep_path
+
+    def resolve_dmriprep_destination(self, run) -> RunDestination:
+        participant_label = run.get_input("participant_label")[0]
+        destination = (
+            self.get_analysis_dir(run.analysis_version)
+            / f"sub-{participant_label}"
+        )
+        return destination, _map_dmriprep_path
+
+    def get_run_destination(self, run) -> RunDestination:
+        """
+        Returns the run's (memoized) destination directory and output path
+        mapping function.
+
+        Parameters
+        ----------
+        run : Run
+            Analysis run
+
+        Returns
+        -------
+        RunDestination
+            Destination directory and path mapping function
+
+        Raises
+        ------
+        ValueError
+            No layout is defined for the run's analysis
+        """
+        now = time.monotonic()
+        cached = self._destinations.get(run.id)
+        if cached is not None and now - cached[0] < DESTINATION_CACHE_TTL:
+            return cached[1]
+        title = run.analysis_version.analysis.title
+        resolvers = {
+            RECON_ALL: self.resolve_recon_all_destination,
+            FMRIPREP: self.resolve_fmriprep_destination,
+            DMRIPREP: self.resolve_dmriprep_destination,
+        }
+        try:
+            resolver = resolvers[title]
+        except KeyError:
+            message = UNSUPPORTED_ANALYSIS.format(title=title)
+            raise ValueError(message)
+        if len(self._destinations) >= MAX_CACHED_RUNS:
+            self._destinations.clear()
+        destination = resolver(run)
+        self._destinations[run.id] = now, destination
+        return destination
+
+    def get_destination(self, run, path: Union[Path, str]) -> Path:
+        """
+        Returns the destination of a single run output file.
+
+        Parameters
+        ----------
+        run : Run
+            Analysis run
+        path : Union[Path, str]
+            Output file path (within the run's output directory)
+
+        Returns
+        -------
+        Path
+            Destination path
+        """
+        destination_dir, map_path = self.get_run_destination(run)
+        relative_path = Path(path).relative_to(run.path)
+        return Path(
+            os.path.normpath(destination_dir / map_path(relative_path))
+        )
+
+    def get_destinations(self, run) -> Dict[Path, Path]:
+        """
+        Returns the destinations of all of the run's output files.
+
+        Parameters
+        ----------
+        run : Run
+            Analysis run
+
+        Returns
+        -------
+        Dict[Path, Path]
+            Destination paths by source path
+        """
+        return {
+            path: self.get_destination(run, path)
+            for path in Path(run.path).rglob("*")
+            if path.is_file()
+        }
+
+    def create_directories(
+        self, paths: Iterable[Path], max_workers: int = DEFAULT_MAX_WORKERS
+    ) -> None:
+        """
+        Creates the parent directories of the provided paths concurrently.
+        Each directory is only created once, deepest directories first, so
+        that intermediate directories are created by a single worker.
+
+        Parameters
+        ----------
+        paths : Iterable[Path]
+            File paths
+        max_workers : int, optional
+            Number of threads, by default :attr:`DEFAULT_MAX_WORKERS`
+        """
+        directories = {Path(path).parent for path in paths}
+        ancestors = {
+            parent for directory in directories for parent in directory.parents
+        }
+        leaves = directories - ancestors
+
+        def create(directory: Path) -> None:
+            directory.mkdir(parents=True, exist_ok=True)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            list(executor.map(create, leaves))
+
+    def write_dataset_description(
+        self, analysis_version, overwrite: bool = False
+    ) -> Path:
+        """
+        Writes the derivative dataset's *dataset_description.json* file.
+
+        Parameters
+        ----------
+        analysis_version : AnalysisVersion
+            Analysis version
+        overwrite : bool, optional
+            Whether to overwrite an existing file, by default False
+
+        Returns
+        -------
+        Path
+            Description file path
+
+        References
+        ----------
+        * `BIDS derived dataset description`_
+
+        .. _BIDS derived dataset description:
+            https://bids-specification.readthedocs.io/en/stable/03-modality-agnostic-files.html#derived-dataset-and-pipeline-description
+        """
+        path = self.get_analysis_dir(analysis_version) / DESCRIPTION_FILE_NAME
+        if path.is_file() and not overwrite:
+            return path
+        description = {
+            "Name": str(analysis_version),
+            "BIDSVersion": BIDS_VERSION,
+            "DatasetType": "derivative",
+            "GeneratedBy": [
+                {
+                    "Name": analysis_version.analysis.title,
+                    "Version": analysis_version.title,
+                }
+            ],
+        }
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(description, f, indent=4)
+        return path
+
+    def export_runs(
+        self,
+        runs: Iterable,
+        link: bool = True,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+    ) -> List[Path]:
+        """
+        Exports the outputs of the provided runs to the derivatives
+        directory.
+
+        Parameters
+        ----------
+        runs : Iterable
+            Analysis runs
+        link : bool, optional
+            Whether to hard-link outputs instead of copying them where
+            possible, by default True
+        max_workers : int, optional
+            Number of threads, by default :attr:`DEFAULT_MAX_WORKERS`
+
+        Returns
+        -------
+        List[Path]
+            Exported file paths
+        """
+        destinations, analysis_versions = {}, {}
+        for run in runs:
+            destinations.update(self.get_destinations(run))
+            analysis_versions[run.analysis_version.id] = run.analysis_version
+        for analysis_version in analysis_versions.values():
+            self.write_dataset_description(analysis_version)
+        self.create_directories(destinations.values(), max_workers)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(_transfer_file, source, destination, link)
+                for source, destination in destinations.items()
+            ]
+            exported = [future.result() for future in futures]
+        self._logger.debug(f"Exported {len(exported)} derivative files.")
+        return exported
+
+    def export_run(self, run, **kwargs) -> List[Path]:
+        """
+        Exports a single run's outputs to the derivatives directory. See
+        :meth:`export_runs` for keyword arguments.
+        """
+        return self.export_runs([run], **kwargs)
@@ -0,0 +1,455 @@
+"""
+Utilities used to render NIfTI slices and downsampled volumes as compact
+8-bit tiles for the web viewer.
+
+Slices are read lazily from the image's data proxy, so only the requested
+slab is loaded into memory. Rendered tiles are cached in memory (and
+optionally on disk) and identified by an ETag derived from the source file's
+state and the rendering parameters.
+"""
+import hashlib
+import os
+import struct
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from threading import Lock
+from typing import Callable, NamedTuple, Tuple, Union
+
+import nibabel as nib
+import numpy as np
+from django.conf import settings
+
+#: Slice planes by the index of the axis they are perpendicular to.
+PLANES = {"sagittal": 0, "coronal": 1, "axial": 2}
+
+#: Supported tile formats.
+PNG: str = "png"
+RAW: str = "raw"
+TILE_FORMATS: Tuple[str] = (PNG, RAW)
+CONTENT_TYPES = {PNG: "image/png", RAW: "application/octet-stream"}
+
+#: Percentiles used to determine the default display window.
+WINDOW_PERCENTILES: Tuple[float, float] = (0.5, 99.5)
+
+#: Stride used to subsample the volume when estimating the display window.
+WINDOW_SAMPLING_STRIDE: int = 4
+
+#: Maximal total size (in bytes) of the tiles kept in memory.
+MAX_CACHED_TILE_BYTES: int = 64 * 1024 ** 2
+
+#: Minimal volume downsampling stride, bounding the size of volume tiles.
+MIN_VOLUME_STRIDE: int = 2
+
+#: Maximal number of display windows kept in memory.
+MAX_CACHED_WINDOWS: int = 256
+
+#: PNG compression level (lower is faster).
+PNG_COMPRESSION_LEVEL: int = 3
+
+PNG_SIGNATURE: bytes = b"\x89PNG\r\n\x1a\n"
+
+INVALID_PLANE: str = "Invalid plane '{plane}'! Valid planes are: {valid}."
+INVALID_INDEX: str = "Slice index {index} is out of range for a {plane} plane of size {size}."  # noqa: E501
+INVALID_VOLUME: str = "Volume index {volume} is out of range for an image with {n_volumes} volumes."  # noqa: E501
+INVALID_FORMAT: str = "Invalid tile format '{tile_format}'! Valid formats are: {valid}."  # noqa: E501
+INVALID_STRIDE: str = "Volume stride must be at least {minimum} (got {stride})."  # noqa: E501
+
+
+class Tile(NamedTuple):
+    """
+    A rendered tile.
+    """
+
+    #: Encoded tile data.
+    data: bytes
+
+    #: Tile array shape.
+    shape: Tuple[int, ...]
+
+    #: Tile format.
+    tile_format: str
+
+    @property
+    def content_type(self) -> str:
+        return CONTENT_TYPES[self.tile_format]
+
+
+class LRUCache:
+    """
+    Minimal thread-safe least-recently-used cache.
+
+    Parameters
+    ----------
+    max_size : int
+        Maximal total size of the cached values
+    get_size : Callable, optional
+        Returns the size of a cached value, by default every value counts
+        as 1 (i.e. *max_size* is the maximal number of entries)
+    """
+
+    def __init__(self, max_size: int, get_size: Callable = None) -> None:
+        self.max_size = max_size
+        self.get_size = get_size or (lambda value: 1)
+        self.size = 0
+        self._data = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key):
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                return None
+            return self._data[key]
+
+    def set(self, key, value) -> None:
+        size = self.get_size(value)
+        with self._lock:
+            if key in self._data:
+                self.size -= self.get_size(self._data.pop(key))
+            # Values larger than the whole cache are not cached at all.
+            if size > self.max_size:
+                return
+            self._data[key] = value
+            self.size += size
+            while self.size > self.max_size:
+                _, evicted = self._data.popitem(last=False)
+                self.size -= self.get_size(evicted)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.size = 0
+
+
+_tiles = LRUCache(MAX_CACHED_TILE_BYTES, get_size=lambda tile: len(tile.data))
+_windows = LRUCache(MAX_CACHED_WINDOWS)
+
+
+def get_tile_cache_dir() -> Path:
+    """
+    Returns the directory in which rendered tiles are cached on disk, or None
+    if disk caching is disabled (the default).
+    """
+    path = getattr(settings, "MRI_TILE_CACHE_DIR", None)
+    return Path(path) if path else None
+
+
+def get_file_state(path: Union[Path, str]) -> Tuple[str, int, int]:
+    """
+    Returns a tuple identifying the current state of a file.
+
+    Raises
+    ------
+    FileNotFoundError
+        If the file does not exist
+    """
+    stat = os.stat(path)
+    return str(path), stat.st_mtime_ns, stat.st_size
+
+
+def get_etag(path: Union[Path, str], *parameters) -> str:
+    """
+    Returns an ETag for the provided file's current state and rendering
+    parameters. Computing the ETag only requires a single *stat* call, so it
+    may be checked before any rendering is done.
+    """
+    key = repr((get_file_state(path), parameters)).encode()
+    return '"' + hashlib.sha1(key).hexdigest() + '"'
+
+
+def encode_png(array: np.ndarray) -> bytes:
+    """
+    Encodes a 2D uint8 array as an 8-bit grayscale PNG.
+
+    Parameters
+    ----------
+    array : np.ndarray
+        2D uint8 array
+
+    Returns
+    -------
+    bytes
+        PNG data
+    """
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        crc = zlib.crc32(kind + data) & 0xFFFFFFFF
+        length = struct.pack(">I", len(data))
+        return length + kind + data + struct.pack(">I", crc)
+
+    height, width = array.shape
+    header = struct.pack(">IIBBBBB", width, height, 8, 0, 0, 0, 0)
+    # Prefix each row with the "None" filter type byte.
+    rows = np.zeros((height, width + 1), dtype=np.uint8)
+    rows[:, 1:] = array
+    data = zlib.compress(rows.tobytes(), PNG_COMPRESSION_LEVEL)
+    return (
+        PNG_SIGNATURE
+        + chunk(b"IHDR", header)
+        + chunk(b"IDAT", data)
+        + chunk(b"IEND", b"")
+    )
+
+
+def to_uint8(data: np.ndarray, vmin: float, vmax: float) -> np.ndarray:
+    """
+    Rescales data to the uint8 range using the provided display window.
+    """
+    data = np.asarray(data, dtype=np.float32)
+    scale = 255.0 / (vmax - vmin) if vmax > vmin else 0.0
+    scaled = (data - vmin) * scale
+    return np.clip(scaled, 0, 255).astype(np.uint8)
+
+
+def orient(data: np.ndarray) -> np.ndarray:
+    """
+    Rotates a slice from voxel (column-major) order to display order.
+    """
+    return np.ascontiguousarray(np.rot90(data))
+
+
+class SliceRenderer:
+    """
+    Renders slices and downsampled volumes of a NIfTI file.
+
+    Examples
+    --------
+    >>> renderer = SliceRenderer(scan.nifti.path)
+    >>> tile = renderer.render_slice("axial", 40)
+    """
+
+    def __init__(self, path: Union[Path, str]) -> None:
+        self.path = Path(path)
+        self._image = None
+
+    @property
+    def image(self) -> nib.Nifti1Image:
+        if self._image is None:
+            self._image = nib.load(str(self.path))
+        return self._image
+
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        return self.image.shape
+
+    @property
+    def n_volumes(self) -> int:
+        return self.shape[3] if len(self.shape) > 3 else 1
+
+    def validate_volume(self, volume: int) -> None:
+        if not 0 <= volume < self.n_volumes:
+            message = INVALID_VOLUME.format(
+                volume=volume, n_volumes=self.n_volumes
+            )
+            raise ValueError(message)
+
+    def read_volume(self, volume: int = 0, stride: int = 1) -> np.ndarray:
+        """
+        Reads a (strided) 3D volume through the image's data proxy.
+        """
+        self.validate_volume(volume)
+        index = (slice(None, None, stride),) * 3
+        if len(self.shape) > 3:
+            index += (volume,)
+        return np.asarray(self.image.dataobj[index])
+
+    def read_slice(self, plane: str, index: int, volume: int = 0):
+        """
+        Reads a single slice through the image's data proxy, so that only the
+        requested slab is read from disk.
+
+        Parameters
+        ----------
+        plane : str
+            One of :attr:`PLANES`
+        index : int
+            Slice index
+        volume : int, optional
+            Volume index (for 4D images), by default 0
+
+        Returns
+        -------
+        np.ndarray
+            2D slice data (voxel order)
+        """
+        try:
+            axis = PLANES[plane]
+        except KeyError:
+            message = INVALID_PLANE.format(plane=plane, valid=tuple(PLANES))
+            raise ValueError(message)
+        size = self.shape[axis]
+        if not 0 <= index < size:
+            message = INVALID_INDEX.format(index=index, plane=plane, size=size)
+            raise ValueError(message)
+        self.validate_volume(volume)
+        slicer = [slice(None)] * 3
+        slicer[axis] = index
+        if len(self.shape) > 3:
+            slicer.append(volume)
+        return np.asarray(self.image.dataobj[tuple(slicer)])
+
+    def get_window(self, volume: int = 0) -> Tuple[float, float]:
+        """
+        Returns the default display window of a volume, estimated from
+        a strided subsample and cached by file state.
+
+        Parameters
+        ----------
+        volume : int, optional
+            Volume index, by default 0
+
+        Returns
+        -------
+        Tuple[float, float]
+            Minimal and maximal display values
+        """
+        key = (get_file_state(self.path), volume)
+        window = _windows.get(key)
+        if window is None:
+            sample = self.read_volume(volume, stride=WINDOW_SAMPLING_STRIDE)
+            sample = sample[np.isfinite(sample)]
+            if sample.size:
+                window = tuple(
+                    float(value)
+                    for value in np.percentile(sample, WINDOW_PERCENTILES)
+                )
+            else:
+                window = (0.0, 0.0)
+            _windows.set(key, window)
+        return window
+
+    def render_slice(
+        self,
+        plane: str,
+        index: int,
+        volume: int = 0,
+        vmin: float = None,
+        vmax: float = None,
+        tile_format: str = PNG,
+    ) -> Tile:
+        """
+        Renders a single slice as an 8-bit tile.
+
+        Parameters
+        ----------
+        plane : str
+            One of :attr:`PLANES`
+        index : int
+            Slice index
+        volume : int, optional
+            Volume index (for 4D images), by default 0
+        vmin : float, optional
+            Display window minimum, by default estimated from the volume
+        vmax : float, optional
+            Display window maximum, by default estimated from the volume
+        tile_format : str, optional
+            One of :attr:`TILE_FORMATS`, by default PNG
+
+        Returns
+        -------
+        Tile
+            Rendered tile
+        """
+        if tile_format not in TILE_FORMATS:
+            message = INVALID_FORMAT.format(
+                tile_format=tile_format, valid=TILE_FORMATS
+            )
+            raise ValueError(message)
+        data = self.read_slice(plane, index, volume)
+        if vmin is None or vmax is None:
+            default_min, default_max = self.get_window(volume)
+            vmin = default_min if vmin is None else vmin
+            vmax = default_max if vmax is None else vmax
+        array = orient(to_uint8(data, vmin, vmax))
+        if tile_format == PNG:
+            encoded = encode_png(array)
+        else:
+            encoded = array.tobytes()
+        return Tile(data=encoded, shape=array.shape, tile_format=tile_format)
+
+    def render_volume(self, stride: int = 4, volume: int = 0) -> Tile:
+        """
+        Renders a downsampled volume as raw uint8 voxels (C order).
+
+        Parameters
+        ----------
+        stride : int, optional
+            Downsampling stride, at least :attr:`MIN_VOLUME_STRIDE`, by
+            default 4
+        volume : int, optional
+            Volume index (for 4D images), by default 0
+
+        Returns
+        -------
+        Tile
+            Rendered volume
+
+        Raises
+        ------
+        ValueError
+            If the stride is smaller than :attr:`MIN_VOLUME_STRIDE`
+        """
+        if stride < MIN_VOLUME_STRIDE:
+            message = INVALID_STRIDE.format(
+                minimum=MIN_VOLUME_STRIDE, stride=stride
+            )
+            raise ValueError(message)
+        data = self.read_volume(volume, stride=int(stride))
+        vmin, vmax = self.get_window(volume)
+        array = np.ascontiguousarray(to_uint8(data, vmin, vmax))
+        return Tile(data=array.tobytes(), shape=array.shape, tile_format=RAW)
+
+
+def get_cached_tile(etag: str, render, *args, **kwargs) -> Tile:
+    """
+    Returns a tile from the in-memory or disk cache by its ETag, rendering
+    (and caching) it if required.
+
+    Parameters
+    ----------
+    etag : str
+        Tile ETag, see :func:`get_etag`
+    render : Callable
+        Rendering method, called with *args* and *kwargs* on a cache miss
+
+    Returns
+    -------
+    Tile
+        Rendered tile
+    """
+    tile = _tiles.get(etag)
+    if tile is not None:
+        return tile
+    cache_dir = get_tile_cache_dir()
+    cache_path = None
+    if cache_dir is not None:
+        cache_path = cache_dir / etag.strip('"')
+        if cache_path.is_file():
+            tile = _read_tile(cache_path)
+    if tile is None:
+        tile = render(*args, **kwargs)
+        if cache_path is not None:
+            _write_tile(cache_path, tile)
+    _tiles.set(etag, tile)
+    return tile
+
+
+def _write_tile(path: Path, tile: Tile) -> None:
+    header = f"{tile.tile_format};{','.join(map(str, tile.shape))}\n"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_name(f".{path.name}.{os.getpid()}")
+    with open(partial, "wb") as f:
+        f.write(header.encode())
+        f.write(tile.data)
+    os.replace(partial, path)
+
+
+def _read_tile(path: Path) -> Tile:
+    with open(path, "rb") as f:
+        header = f.readline().decode().strip()
+        data = f.read()
+    tile_format, shape = header.split(";")
+    shape = tuple(int(size) for size in shape.split(","))
+    return Tile(data=data, shape=shape, tile_format=tile_format)
@@ -0,0 +1,175 @@
+"""
+Utilities used to stage conversion outputs in a temporary directory and
+publish them to their final location atomically.
+"""
+import errno
+import logging
+import os
+import shutil
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, List
+
+from django.db import IntegrityError
+from django_mri.utils.utils import get_mri_root
+
+#: The name of the subdirectory under the MRI data root in which conversion
+#: outputs are staged.
+STAGING_DIR_NAME: str = ".staging"
+
+#: Staging directories older than this (in seconds) are considered stale.
+STALE_STAGING_AGE: int = 60 * 60 * 24
+
+PUBLISH_COLLISION: str = "Failed to publish {source}! An existing file was found at {destination}."  # noqa: E501
+
+_logger = logging.getLogger("data.mri.staging")
+
+
+def get_staging_root() -> Path:
+    """
+    Returns the path of the directory in which conversion outputs are staged.
+    This directory is kept under the MRI data root to make sure staged files
+    may be renamed into place without copying.
+
+    Returns
+    -------
+    Path
+        Staging root directory
+    """
+    return get_mri_root() / STAGING_DIR_NAME
+
+
+@contextmanager
+def staging_directory(prefix: str = "job-") -> Iterator[Path]:
+    """
+    Creates a unique per-job staging directory and removes it (along with any
+    unpublished files) on exit.
+
+    Parameters
+    ----------
+    prefix : str, optional
+        Staging directory name prefix, by default "job-"
+
+    Yields
+    ------
+    Path
+        Staging directory
+    """
+    root = get_staging_root()
+    root.mkdir(parents=True, exist_ok=True)
+    path = Path(tempfile.mkdtemp(prefix=prefix, dir=root))
+    try:
+        yield path
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def _publish_file(source: Path, destination: Path) -> None:
+    """
+    Moves *source* to *destination* without ever overwriting an existing file.
+    Hard-linking is an atomic exclusive create, so concurrent publishers
+    can't clobber each other. Falls back to a checked rename where hard links
+    are not supported.
+    """
+    try:
+        os.link(source, destination)
+    except FileExistsError:
+        message = PUBLISH_COLLISION.format(
+            source=source, destination=destination
+        )
+        raise IntegrityError(message)
+    except OSError as e:
+        if e.errno == errno.EXDEV:
+            raise
+        if destination.exists():
+            message = PUBLISH_COLLISION.format(
+                source=source, destination=destination
+            )
+            raise IntegrityError(message)
+        os.replace(source, destination)
+    else:
+        source.unlink()
+
+
+def publish_files(source_dir: Path, destination_dir: Path) -> List[Path]:
+    """
+    Publishes all files in *source_dir* to *destination_dir*. If any of the
+    files can't be published, files that were already published are removed
+    again so that a failed publication leaves no partial outputs behind.
+
+    Parameters
+    ----------
+    source_dir : Path
+        Staging directory
+    destination_dir : Path
+        Final output directory
+
+    Returns
+    -------
+    List[Path]
+        Published file paths
+
+    Raises
+    ------
+    IntegrityError
+        A file already exists in one of the destination paths
+    """
+    destination_dir.mkdir(parents=True, exist_ok=True)
+    published = []
+    try:
+        for source in sorted(Path(source_dir).iterdir()):
+            if not source.is_file():
+                continue
+            destination = destination_dir / source.name
+            _publish_file(source, destination)
+            published.append(destination)
+    except Exception:
+        unpublish_files(published)
+        raise
+    return published
+
+
+def unpublish_files(paths: List[Path]) -> None:
+    """
+    Removes previously published files.
+
+    Parameters
+    ----------
+    paths : List[Path]
+        Published file paths
+    """
+    for path in paths:
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def remove_stale_staging_directories(max_age: int = STALE_STAGING_AGE) -> int:
+    """
+    Removes staging directories left behind by interrupted jobs.
+
+    Parameters
+    ----------
+    max_age : int, optional
+        Minimal age (in seconds) of directories to remove, by default
+        :attr:`STALE_STAGING_AGE`
+
+    Returns
+    -------
+    int
+        Number of removed directories
+    """
+    root = get_staging_root()
+    if not root.is_dir():
+        return 0
+    threshold = time.time() - max_age
+    n_removed = 0
+    for path in root.iterdir():
+        if path.is_dir() and path.stat().st_mtime < threshold:
+            _logger.debug(f"Removing stale staging directory: {path}")
+            shutil.rmtree(path, ignore_errors=True)
+            n_removed += 1
+    return n_removed
@@ -0,0 +1,317 @@
+"""
+Utilities used to stream tabular query results as CSV or Parquet with
+bounded memory usage.
+
+Rows are consumed lazily from any iterable (usually a
+:meth:`~django.db.models.query.QuerySet.values_list` queryset's
+:meth:`~django.db.models.query.QuerySet.iterator`, which uses a server-side
+cursor) and encoded chunk by chunk. Parquet schemas are derived from the
+queried model fields (see :func:`get_arrow_schema`), so that the column types
+do not depend on the values of any particular chunk.
+"""
+import csv
+import io
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from django.conf import settings
+from django.db.models import Field, QuerySet
+from django.db.models.constants import LOOKUP_SEP
+
+#: Supported table formats.
+CSV: str = "csv"
+PARQUET: str = "parquet"
+TABLE_FORMATS: Tuple[str] = (CSV, PARQUET)
+CONTENT_TYPES = {CSV: "text/csv", PARQUET: "application/vnd.apache.parquet"}
+
+#: Default number of rows fetched and encoded at once.
+DEFAULT_CHUNK_SIZE: int = 2000
+
+#: Separator used to join list values (e.g. score origins) in CSV cells.
+CSV_LIST_SEPARATOR: str = ";"
+
+#: Arrow data types by Django field internal type. Fields of any other type
+#: are exported as strings.
+ARROW_TYPES: Dict[str, pa.DataType] = {
+    "AutoField": pa.int64(),
+    "BigAutoField": pa.int64(),
+    "SmallAutoField": pa.int64(),
+    "IntegerField": pa.int64(),
+    "BigIntegerField": pa.int64(),
+    "SmallIntegerField": pa.int64(),
+    "PositiveIntegerField": pa.int64(),
+    "PositiveBigIntegerField": pa.int64(),
+    "PositiveSmallIntegerField": pa.int64(),
+    "FloatField": pa.float64(),
+    "BooleanField": pa.bool_(),
+    "NullBooleanField": pa.bool_(),
+    "DateField": pa.date32(),
+    "TimeField": pa.time64("us"),
+    "DurationField": pa.duration("us"),
+}
+
+INVALID_FORMAT: str = "Invalid table format '{table_format}'! Valid formats are: {valid}."  # noqa: E501
+
+
+class _StreamBuffer(io.RawIOBase):
+    """
+    Write-only buffer that is emptied each time it is read from.
+    """
+
+    def __init__(self) -> None:
+        self._chunks = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def iter_chunks(rows: Iterable, chunk_size: int) -> Iterator[List]:
+    """
+    Splits an iterable of rows into lists of (at most) *chunk_size* rows.
+    """
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _format_csv_value(value: Any) -> Any:
+    if isinstance(value, (list, tuple)):
+        return CSV_LIST_SEPARATOR.join(str(item) for item in value)
+    return value
+
+
+def iter_csv(
+    rows: Iterable[Sequence],
+    columns: Sequence[str],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[bytes]:
+    """
+    Encodes rows as CSV, yielding one encoded chunk at a time.
+
+    Parameters
+    ----------
+    rows : Iterable[Sequence]
+        Table rows
+    columns : Sequence[str]
+        Column names
+    chunk_size : int, optional
+        Number of rows encoded at once, by default
+        :attr:`DEFAULT_CHUNK_SIZE`
+
+    Yields
+    ------
+    bytes
+        CSV data
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for chunk in iter_chunks(rows, chunk_size):
+        writer.writerows(
+            [_format_csv_value(value) for value in row] for row in chunk
+        )
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    # Only the header is left unsent if there are no rows.
+    remaining = buffer.getvalue()
+    if remaining:
+        yield remaining.encode()
+
+
+def get_arrow_type(field: Field) -> pa.DataType:
+    """
+    Returns the Arrow data type used to export values of a Django field.
+
+    Parameters
+    ----------
+    field : Field
+        Model field (or expression output field)
+
+    Returns
+    -------
+    pa.DataType
+        Arrow data type
+    """
+    internal_type = field.get_internal_type()
+    if internal_type == "ArrayField":
+        return pa.list_(get_arrow_type(field.base_field))
+    if internal_type == "DateTimeField":
+        return pa.timestamp("us", tz="UTC" if settings.USE_TZ else None)
+    return ARROW_TYPES.get(internal_type, pa.string())
+
+
+def get_lookup_field(queryset: QuerySet, lookup: str) -> Field:
+    """
+    Returns the field queried by a
+    :meth:`~django.db.models.query.QuerySet.values` lookup, which may span
+    relations or refer to an annotation.
+
+    Parameters
+    ----------
+    queryset : QuerySet
+        Queryset
+    lookup : str
+        Field lookup or annotation name
+
+    Returns
+    -------
+    Field
+        Queried field
+    """
+    annotation = queryset.query.annotations.get(lookup)
+    if annotation is not None:
+        return annotation.output_field
+    model = queryset.model
+    for name in lookup.split(LOOKUP_SEP):
+        field = model._meta.get_field(name)
+        model = field.related_model
+    # Related fields are queried by the primary key of the related model.
+    return field.target_field if field.is_relation else field
+
+
+def get_arrow_schema(
+    queryset: QuerySet, fields: Sequence[str], columns: Sequence[str]
+) -> pa.Schema:
+    """
+    Returns the Arrow schema of a table of the provided queryset's fields.
+
+    Parameters
+    ----------
+    queryset : QuerySet
+        Queryset (including any annotated fields)
+    fields : Sequence[str]
+        Field lookups or annotation names
+    columns : Sequence[str]
+        Column names
+
+    Returns
+    -------
+    pa.Schema
+        Table schema
+    """
+    return pa.schema(
+        [
+            (column, get_arrow_type(get_lookup_field(queryset, field)))
+            for field, column in zip(fields, columns)
+        ]
+    )
+
+
+def _to_arrow_array(values: List, data_type: pa.DataType) -> pa.Array:
+    if pa.types.is_string(data_type):
+        values = [None if value is None else str(value) for value in values]
+    return pa.array(values, type=data_type)
+
+
+def iter_parquet(
+    rows: Iterable[Sequence],
+    columns: Sequence[str],
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    schema: pa.Schema = None,
+) -> Iterator[bytes]:
+    """
+    Encodes rows as a Parquet file, writing each chunk as a row group and
+    yielding the encoded data as soon as it is available.
+
+    Parameters
+    ----------
+    rows : Iterable[Sequence]
+        Table rows
+    columns : Sequence[str]
+        Column names
+    chunk_size : int, optional
+        Number of rows per row group, by default :attr:`DEFAULT_CHUNK_SIZE`
+    schema : pa.Schema, optional
+        Table schema (see :func:`get_arrow_schema`), by default inferred from
+        the first chunk. Inferred schemas fail for columns that are empty in
+        the first chunk, so exported querysets should provide one.
+
+    Yields
+    ------
+    bytes
+        Parquet data
+    """
+    buffer = _StreamBuffer()
+    sink = pa.PythonFile(buffer, mode="w")
+    writer = None
+    if schema is not None:
+        writer = pq.ParquetWriter(sink, schema)
+    for chunk in iter_chunks(rows, chunk_size):
+        data = dict(zip(columns, map(list, zip(*chunk))))
+        if writer is None:
+            table = pa.Table.from_pydict(data)
+            writer = pq.ParquetWriter(sink, table.schema)
+        else:
+            arrays = [
+                _to_arrow_array(data[field.name], field.type)
+                for field in writer.schema
+            ]
+            table = pa.Table.from_arrays(arrays, schema=writer.schema)
+        writer.write_table(table)
+        yield buffer.drain()
+    if writer is None:
+        schema = pa.schema([(column, pa.string()) for column in columns])
+        writer = pq.ParquetWriter(sink, schema)
+    writer.close()
+    yield buffer.drain()
+
+
+def iter_table(
+    rows: Iterable[Sequence],
+    columns: Sequence[str],
+    table_format: str = CSV,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    schema: pa.Schema = None,
+) -> Iterator[bytes]:
+    """
+    Encodes rows in the requested table format.
+
+    Parameters
+    ----------
+    rows : Iterable[Sequence]
+        Table rows
+    columns : Sequence[str]
+        Column names
+    table_format : str, optional
+        One of :attr:`TABLE_FORMATS`, by default CSV
+    chunk_size : int, optional
+        Number of rows encoded at once, by default
+        :attr:`DEFAULT_CHUNK_SIZE`
+    schema : pa.Schema, optional
+        Parquet table schema, see :func:`iter_parquet`
+
+    Returns
+    -------
+    Iterator[bytes]
+        Encoded table data
+
+    Raises
+    ------
+    ValueError
+        Invalid table format
+    """
+    if table_format == CSV:
+        return iter_csv(rows, columns, chunk_size=chunk_size)
+    if table_format == PARQUET:
+        return iter_parquet(
+            rows, columns, chunk_size=chunk_size, schema=schema
+        )
+    message = INVALID_FORMAT.format(
+        table_format=table_format, valid=TABLE_FORMATS
+    )
+    raise ValueError(message)
@@ -46,6 +46,22 @@ DATA_SHARE_ROOT_DEFAULT = "/mnt/"
 #: Default singularity images root
 DEFAULT_SINGULARITY_IMAGE_ROOT = "/my_images"
 
+#: The name of the subdirectory under MEDIA_ROOT in which exported archives
+#: will be saved.
+DEFAULT_EXPORT_DIR_NAME = "exports"
+
+#: The name of the subdirectory under MEDIA_ROOT in which parsed analysis
+#: outputs will be cached.
+DEFAULT_PARSED_OUTPUT_CACHE_DIR_NAME = "parsed_outputs"
+
+#: Default internal location (mapped to MEDIA_ROOT) used by nginx to serve
+#: files delegated with the X-Accel-Redirect header.
+DEFAULT_SENDFILE_URL = "/protected/"
+
+#: Default width (in years) of the age bins by which normative score
+#: statistics are maintained.
+DEFAULT_NORMATIVE_AGE_BIN_WIDTH: float = 5
+
 
 def get_subject_model():
     """
@@ -145,6 +161,71 @@ def get_analysis_dir() -> Path:
     return Path(path)
 
 
+def get_export_root() -> Path:
+    """
+    Returns the path of the directory in which exported archives should be
+    saved.
+    """
+    default = Path(settings.MEDIA_ROOT, DEFAULT_EXPORT_DIR_NAME)
+    path = getattr(settings, "MRI_EXPORT_ROOT", default)
+    return Path(path)
+
+
+def get_parsed_output_cache_root() -> Path:
+    """
+    Returns the path of the directory in which parsed analysis outputs
+    should be cached.
+    """
+    default = Path(settings.MEDIA_ROOT, DEFAULT_PARSED_OUTPUT_CACHE_DIR_NAME)
+    path = getattr(settings, "MRI_PARSED_OUTPUT_CACHE_ROOT", default)
+    return Path(path)
+
+
+def get_sendfile_header() -> str:
+    """
+    Returns the name of the header used to delegate file downloads to the
+    front-end server ("X-Accel-Redirect" for nginx or "X-Sendfile" for
+    Apache), or None if files should be served by Django.
+    """
+    return getattr(settings, "MRI_SENDFILE_HEADER", None)
+
+
+def get_sendfile_url() -> str:
+    """
+    Returns the internal location prefix used with the X-Accel-Redirect
+    header.
+    """
+    return getattr(settings, "MRI_SENDFILE_URL", DEFAULT_SENDFILE_URL)
+
+
+def get_response_cache_timeout() -> int:
+    """
+    Returns the number of seconds list and detail API responses should be
+    cached for, or None if response caching is disabled (the default).
+    """
+    return getattr(settings, "MRI_RESPONSE_CACHE_TIMEOUT", None)
+
+
+def get_summary_auto_refresh() -> bool:
+    """
+    Returns whether acquisition summary rows should be refreshed whenever
+    scans or sessions change (the default), rather than only periodically.
+    """
+    return getattr(settings, "MRI_SUMMARY_AUTO_REFRESH", True)
+
+
+def get_normative_age_bin_width() -> float:
+    """
+    Returns the width (in years) of the age bins by which normative score
+    statistics are maintained.
+    """
+    return getattr(
+        settings,
+        "MRI_NORMATIVE_AGE_BIN_WIDTH",
+        DEFAULT_NORMATIVE_AGE_BIN_WIDTH,
+    )
+
+
 def get_dicom_root() -> Path:
     """
     Returns the path of the directory in which DICOM data should be saved.
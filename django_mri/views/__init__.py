@@ -1,4 +1,6 @@
+from django_mri.views.acquisition_summary import AcquisitionSummaryViewSet
 from django_mri.views.atlas import AtlasViewSet
+from django_mri.views.export_job import ExportJobViewSet
 from django_mri.views.irb_approval import IrbApprovalViewSet
 from django_mri.views.metric import MetricViewSet
 from django_mri.views.nifti import NiftiViewSet
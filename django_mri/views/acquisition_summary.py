@@ -0,0 +1,52 @@
+"""
+Definition of the :class:`AcquisitionSummaryViewSet` class.
+"""
+from typing import List
+
+from django_mri.filters.acquisition_summary_filter import (
+    AcquisitionSummaryFilter,
+)
+from django_mri.models.acquisition_summary import AcquisitionSummary
+from django_mri.models.managers.acquisition_summary import CUBE_DIMENSIONS
+from django_mri.views.defaults import DefaultsMixin
+from rest_framework import viewsets
+from rest_framework.exceptions import ValidationError
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+#: Query parameter used to select the dimensions counts are grouped by.
+GROUP_BY_QUERY_PARAM: str = "group_by"
+
+
+class AcquisitionSummaryViewSet(DefaultsMixin, viewsets.GenericViewSet):
+    """
+    API endpoint that returns scan and session counts from the materialized
+    :class:`~django_mri.models.acquisition_summary.AcquisitionSummary`
+    table, grouped by the comma-separated dimensions passed as the
+    *group_by* query parameter (e.g. "?group_by=study,month").
+    """
+
+    queryset = AcquisitionSummary.objects.all()
+    filter_class = AcquisitionSummaryFilter
+
+    def get_group_by(self) -> List[str]:
+        value = self.request.query_params.get(GROUP_BY_QUERY_PARAM, "")
+        return [dimension for dimension in value.split(",") if dimension]
+
+    def list(self, request: Request) -> Response:
+        queryset = self.filter_queryset(self.get_queryset())
+        # Dimensions used for filtering must not be aggregated.
+        keep = [
+            dimension
+            for dimension in CUBE_DIMENSIONS
+            if request.query_params.get(dimension)
+        ]
+        user = request.user
+        if not user.is_superuser:
+            queryset = queryset.filter(study__in=user.study_set.all())
+            keep.append("study")
+        try:
+            counts = queryset.summarize(self.get_group_by(), keep=keep)
+        except ValueError as e:
+            raise ValidationError({GROUP_BY_QUERY_PARAM: str(e)})
+        return Response(counts)
@@ -0,0 +1,167 @@
+"""
+Conditional GET and response caching utilities for the API's viewsets.
+
+List responses are validated using a single aggregate query over the
+filtered queryset (count, maximal primary key and, if available, maximal
+*modified* timestamp), combined with a per-model version which is bumped by
+save and delete signals (see :mod:`django_mri.signals`). Unchanged responses
+may then be answered with *304 Not Modified* or served from the (optional)
+per-user response cache.
+
+Note
+----
+Models without a modification timestamp (e.g.
+:class:`~django_mri.models.score.Score`) rely on the model version to detect
+updates, which requires a cache backend shared between processes.
+"""
+import hashlib
+from typing import Any, Dict, Optional
+
+from django.core.cache import cache
+from django.db.models import Count, Max, Model, QuerySet
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+from django_mri.utils.caching import get_model_version
+from django_mri.utils.utils import get_response_cache_timeout
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+#: Cache key template of cached responses.
+RESPONSE_KEY: str = "django_mri:response:{etag}"
+
+#: Name of the field used to determine the last modification time.
+MODIFIED_FIELD: str = "modified"
+
+
+def has_modified_field(model: Model) -> bool:
+    return any(field.name == MODIFIED_FIELD for field in model._meta.fields)
+
+
+def get_queryset_state(queryset: QuerySet) -> Dict[str, Any]:
+    """
+    Returns the state of a (filtered) queryset using a single aggregate
+    query.
+
+    Parameters
+    ----------
+    queryset : QuerySet
+        Queryset to evaluate
+
+    Returns
+    -------
+    Dict[str, Any]
+        Instance count, maximal primary key and last modification time (if
+        available)
+    """
+    aggregates = {"count": Count("pk"), "max_pk": Max("pk")}
+    if has_modified_field(queryset.model):
+        aggregates["last_modified"] = Max(MODIFIED_FIELD)
+    queryset = queryset.order_by().prefetch_related(None)
+    return queryset.aggregate(**aggregates)
+
+
+def make_etag(*parts) -> str:
+    key = repr(parts).encode()
+    return '"' + hashlib.sha1(key).hexdigest() + '"'
+
+
+class ConditionalGetMixin:
+    """
+    Adds ETag/Last-Modified validation and optional per-user response
+    caching (see :func:`~django_mri.utils.utils.get_response_cache_timeout`)
+    to a viewset's *list* and *retrieve* actions.
+    """
+
+    def get_validators(self, state: Dict[str, Any]):
+        request = self.request
+        model = self.get_queryset().model
+        etag = make_etag(
+            get_model_version(model),
+            request.user.pk,
+            request.build_absolute_uri(),
+            request.accepted_media_type,
+            state,
+        )
+        last_modified = state.get("last_modified")
+        if last_modified is not None:
+            last_modified = int(last_modified.timestamp())
+        return etag, last_modified
+
+    def conditional_response(
+        self, request: Request, state: Dict[str, Any], render
+    ) -> HttpResponse:
+        """
+        Returns *304 Not Modified* if the client's cached response is still
+        valid, a cached response if one exists, or otherwise calls *render*.
+
+        Parameters
+        ----------
+        request : Request
+            GET request
+        state : Dict[str, Any]
+            Values determining whether the response changed
+        render : Callable
+            Function returning the full response
+
+        Returns
+        -------
+        HttpResponse
+            Response
+        """
+        etag, last_modified = self.get_validators(state)
+        not_modified = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if not_modified is not None:
+            response = not_modified
+        else:
+            response = self.get_cached_response(etag, render)
+        set_validators(response, etag, last_modified)
+        return response
+
+    def get_cached_response(self, etag: str, render) -> Response:
+        timeout = get_response_cache_timeout()
+        if not timeout:
+            return render()
+        key = RESPONSE_KEY.format(etag=etag)
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+        response = render()
+        if response.status_code == 200:
+            cache.set(key, response.data, timeout)
+        return response
+
+    def list(self, request: Request, *args, **kwargs) -> HttpResponse:
+        queryset = self.filter_queryset(self.get_queryset())
+        state = get_queryset_state(queryset)
+
+        def render() -> Response:
+            return super(ConditionalGetMixin, self).list(
+                request, *args, **kwargs
+            )
+
+        return self.conditional_response(request, state, render)
+
+    def retrieve(self, request: Request, *args, **kwargs) -> HttpResponse:
+        instance = self.get_object()
+        state = {
+            "pk": instance.pk,
+            "last_modified": getattr(instance, MODIFIED_FIELD, None),
+        }
+        return self.conditional_response(
+            request,
+            state,
+            lambda: Response(self.get_serializer(instance).data),
+        )
+
+
+def set_validators(
+    response: HttpResponse, etag: str, last_modified: Optional[int]
+) -> None:
+    response["ETag"] = etag
+    if last_modified is not None:
+        response["Last-Modified"] = http_date(last_modified)
+    # Make clients revalidate every time, which is cheap.
+    patch_cache_control(response, private=True, no_cache=True)
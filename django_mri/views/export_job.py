@@ -0,0 +1,94 @@
+"""
+Definition of the :class:`ExportJobViewSet` class.
+"""
+from django.db import transaction
+from django.db.models.query import QuerySet
+from django.http import HttpResponse
+from django_mri.models.export_job import ExportJob
+from django_mri.models.scan import Scan
+from django_mri.serializers.export_job import ExportJobSerializer
+from django_mri.tasks import build_export
+from django_mri.utils.archive import CONTENT_TYPES
+from django_mri.views.defaults import DefaultsMixin
+from django_mri.views.pagination import StandardResultsSetPagination
+from django_mri.views.utils import file_response
+from rest_framework import mixins, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import PermissionDenied
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+EXPORT_NOT_READY: str = "Export #{export_id} is not ready for download (status: {status})."  # noqa: E501
+SCAN_PERMISSION_DENIED: str = "You do not have permission to export scans: {scan_ids}."  # noqa: E501
+
+
+class ExportJobViewSet(
+    DefaultsMixin,
+    mixins.CreateModelMixin,
+    mixins.RetrieveModelMixin,
+    mixins.ListModelMixin,
+    mixins.DestroyModelMixin,
+    viewsets.GenericViewSet,
+):
+    """
+    API endpoint that allows users to request data exports, poll their
+    progress and download the resulting archives.
+    """
+
+    pagination_class = StandardResultsSetPagination
+    queryset = ExportJob.objects.order_by("-created")
+    serializer_class = ExportJobSerializer
+    ordering_fields = ("id", "created", "status")
+
+    def get_queryset(self) -> QuerySet:
+        """
+        Returns the requesting user's export jobs, unless the user is staff,
+        in which case all export jobs are returned.
+
+        Returns
+        -------
+        QuerySet
+            Export jobs
+        """
+        queryset = super().get_queryset()
+        user = self.request.user
+        if user.is_staff or user.is_superuser:
+            return queryset
+        return queryset.filter(user=user)
+
+    def perform_create(self, serializer: ExportJobSerializer) -> None:
+        user = self.request.user
+        scans = serializer.validated_data["scans"]
+        if not (user.is_staff or user.is_superuser):
+            scan_ids = {scan.id for scan in scans}
+            permitted = set(
+                Scan.objects.filter(id__in=scan_ids)
+                .filter_by_collaborators(user)
+                .values_list("id", flat=True)
+            )
+            forbidden = scan_ids - permitted
+            if forbidden:
+                message = SCAN_PERMISSION_DENIED.format(
+                    scan_ids=sorted(forbidden)
+                )
+                raise PermissionDenied(message)
+        export_job = serializer.save(user=user)
+        transaction.on_commit(lambda: build_export.delay(export_job.id))
+
+    @action(detail=True, methods=["get"])
+    def download(self, request: Request, pk: int = None) -> HttpResponse:
+        """
+        Downloads a finished export's archive. Range requests are supported
+        so that interrupted downloads may be resumed.
+        """
+        export_job = self.get_object()
+        if not export_job.is_done or not export_job.path.is_file():
+            message = EXPORT_NOT_READY.format(
+                export_id=export_job.id,
+                status=export_job.get_status_display(),
+            )
+            return Response(
+                {"detail": message}, status=status.HTTP_409_CONFLICT
+            )
+        content_type = CONTENT_TYPES[export_job.archive_format]
+        return file_response(request, export_job.path, content_type)
@@ -1,7 +1,6 @@
-import io
-import zipfile
 from pathlib import Path
 
+from django.db.models.query import QuerySet
 from django.http import HttpResponse
 from rest_framework import viewsets
 from rest_framework.decorators import action
@@ -9,11 +8,17 @@ from rest_framework.request import Request
 
 from django_mri.models import NIfTI
 from django_mri.serializers import NiftiSerializer
+from django_mri.utils.archive import ArchiveEntry
 from django_mri.views.defaults import DefaultsMixin
 from django_mri.views.pagination import StandardResultsSetPagination
+from django_mri.views.utils import file_response, zip_response
 
 CONTENT_DISPOSITION = "attachment; filename={instance_id}.zip"
 ZIP_CONTENT_TYPE = "application/x-zip-compressed"
+RAW_CONTENT_TYPE = "application/octet-stream"
+
+#: Actions restricted to the NIfTIs of the requesting user's studies.
+COLLABORATOR_ACTIONS = ("raw",)
 
 
 class NiftiViewSet(DefaultsMixin, viewsets.ModelViewSet):
@@ -21,21 +26,57 @@ class NiftiViewSet(DefaultsMixin, viewsets.ModelViewSet):
     queryset = NIfTI.objects.all()
     serializer_class = NiftiSerializer
 
+    def filter_queryset(self, queryset) -> QuerySet:
+        """
+        Filter the NIfTI instances served by the :attr:`COLLABORATOR_ACTIONS`
+        according to the studies the requesting user is a collaborator in
+        (through their associated scans), unless the user is staff, in which
+        case return all instances. Other actions are not filtered, as NIfTI
+        instances created by analyses have no associated scan.
+
+        Parameters
+        ----------
+        queryset : QuerySet
+            Base queryset
+
+        Returns
+        -------
+        QuerySet
+            NIfTI instances
+        """
+        user = self.request.user
+        queryset = super().filter_queryset(queryset)
+        is_restricted = self.action in COLLABORATOR_ACTIONS
+        if not is_restricted or user.is_staff or user.is_superuser:
+            return queryset
+        return queryset.filter(
+            scan__study_groups__study__collaborators=user
+        ).distinct()
+
     @action(detail=True, methods=["get"])
-    def to_zip(self, request: Request, pk: int) -> HttpResponse:
-        instance = NIfTI.objects.get(id=pk)
-        buffer = io.BytesIO()
-        with zipfile.ZipFile(buffer, "w") as zip_file:
-            nii_name = Path(instance.path).name
-            zip_file.write(instance.path, nii_name)
-            if instance.json_file.exists():
-                json_name = Path(instance.json_file).name
-                zip_file.write(instance.json_file, json_name)
-        response = HttpResponse(
-            buffer.getvalue(), content_type=ZIP_CONTENT_TYPE
+    def raw(self, request: Request, pk: int = None) -> HttpResponse:
+        """
+        Serves the NIfTI file itself, with support for range and conditional
+        requests, so that in-browser viewers may fetch only the bytes they
+        need.
+        """
+        instance = self.get_object()
+        path = Path(instance.path)
+        if not path.is_file():
+            return HttpResponse(status=404)
+        return file_response(
+            request, path, content_type=RAW_CONTENT_TYPE, as_attachment=False
         )
+
+    @action(detail=True, methods=["get"])
+    def to_zip(self, request: Request, pk: int) -> HttpResponse:
+        instance = self.get_object()
+        path = Path(instance.path)
+        entries = [ArchiveEntry(name=path.name, path=path)]
+        if instance.json_file.exists():
+            json_file = Path(instance.json_file)
+            entries.append(ArchiveEntry(name=json_file.name, path=json_file))
         content_disposition = CONTENT_DISPOSITION.format(
             instance_id=instance.id
         )
-        response["Content-Disposition"] = content_disposition
-        return response
+        return zip_response(entries, content_disposition, ZIP_CONTENT_TYPE)
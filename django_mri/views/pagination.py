@@ -1,4 +1,44 @@
+import base64
+import json
+from collections import OrderedDict
+from typing import Any, List, NamedTuple, Tuple
+
+from django.db import connections
+from django.db.models import F, Q, QuerySet
+from django.db.models.expressions import Expression
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+#: Prefix of the annotations used as keyset pagination keys.
+KEY_PREFIX: str = "_cursor_"
+
+#: Approximate count query parameter values.
+EXACT_COUNT: str = "exact"
+APPROXIMATE_COUNT: str = "approximate"
+
+INVALID_CURSOR: str = "Invalid cursor."
+CURSOR_ORDERING: str = (
+    "Ordering is not supported in cursor mode (results are ordered by the "
+    "cursor keys)."
+)
+
+
+class CursorKey(NamedTuple):
+    """
+    A single keyset pagination key.
+    """
+
+    #: Key name.
+    name: str
+
+    #: Key expression.
+    expression: Expression
+
+    #: Whether the key is ordered in descending order.
+    descending: bool = False
 
 
 class StandardResultsSetPagination(PageNumberPagination):
@@ -10,3 +50,181 @@ class StandardResultsSetPagination(PageNumberPagination):
 
     page_size = 25
     page_size_query_param = "page_size"
+
+
+class KeysetResultsSetPagination(StandardResultsSetPagination):
+    """
+    Page number pagination with an optional keyset (cursor) mode, enabled by
+    passing the *cursor* query parameter (empty for the first page).
+
+    In cursor mode, pages are fetched by filtering on the last returned
+    instance's keys (defined by the view's *cursor_keys* attribute, which
+    must end with a unique key), so fetching any page takes constant time
+    and no ``COUNT(*)`` query is executed. Clients may request a *count*
+    of "approximate" (the query planner's estimate) or "exact". As the
+    cursor keys determine the results' order, combining the *cursor* and
+    *ordering* query parameters is rejected.
+    """
+
+    cursor_query_param = "cursor"
+    count_query_param = "count"
+
+    def paginate_queryset(self, queryset: QuerySet, request, view=None):
+        self.use_cursor = self.cursor_query_param in request.query_params
+        if not self.use_cursor:
+            return super().paginate_queryset(queryset, request, view)
+        if api_settings.ORDERING_PARAM in request.query_params:
+            raise ValidationError(
+                {api_settings.ORDERING_PARAM: CURSOR_ORDERING}
+            )
+        self.request = request
+        self.keys = list(view.cursor_keys)
+        self.page_size = self.get_page_size(request)
+        self.count = self.get_count(queryset, request)
+        position, reverse = self.decode_cursor(request)
+        queryset = self.annotate_keys(queryset)
+        queryset = queryset.order_by(*self.get_ordering(reverse))
+        if position is not None:
+            queryset = queryset.filter(self.get_filter(position, reverse))
+        results = list(queryset[: self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[: self.page_size]
+        if reverse:
+            results.reverse()
+        has_next = has_more if not reverse else position is not None
+        has_previous = position is not None if not reverse else has_more
+        self.next_position = (
+            self.get_position(results[-1]) if has_next and results else None
+        )
+        self.previous_position = (
+            self.get_position(results[0]) if has_previous and results else None
+        )
+        return results
+
+    def get_paginated_response(self, data) -> Response:
+        if not self.use_cursor:
+            return super().get_paginated_response(data)
+        return Response(
+            OrderedDict(
+                [
+                    ("count", self.count),
+                    ("next", self.get_cursor_link(self.next_position)),
+                    (
+                        "previous",
+                        self.get_cursor_link(
+                            self.previous_position, reverse=True
+                        ),
+                    ),
+                    ("results", data),
+                ]
+            )
+        )
+
+    def get_count(self, queryset: QuerySet, request) -> int:
+        count = request.query_params.get(self.count_query_param)
+        if count == EXACT_COUNT:
+            return queryset.count()
+        if count == APPROXIMATE_COUNT:
+            return estimate_count(queryset)
+        return None
+
+    def annotate_keys(self, queryset: QuerySet) -> QuerySet:
+        return queryset.annotate(
+            **{KEY_PREFIX + key.name: key.expression for key in self.keys}
+        )
+
+    def get_ordering(self, reverse: bool = False) -> List:
+        ordering = []
+        for key in self.keys:
+            expression = F(KEY_PREFIX + key.name)
+            if key.descending != reverse:
+                expression = expression.desc(nulls_last=not reverse)
+            else:
+                expression = expression.asc(nulls_last=not reverse)
+            ordering.append(expression)
+        return ordering
+
+    def get_key_condition(self, key: CursorKey, value, reverse: bool) -> Q:
+        """
+        Returns the condition for instances positioned after (or before, if
+        *reverse* is True) *value* with respect to a single key. Null values
+        are always ordered last.
+        """
+        name = KEY_PREFIX + key.name
+        lookup = "lt" if key.descending != reverse else "gt"
+        if not reverse:
+            if value is None:
+                return Q(pk__in=[])
+            return Q(**{f"{name}__{lookup}": value}) | Q(
+                **{f"{name}__isnull": True}
+            )
+        if value is None:
+            return Q(**{f"{name}__isnull": False})
+        return Q(**{f"{name}__{lookup}": value})
+
+    def get_filter(self, position: List[Any], reverse: bool) -> Q:
+        condition, equal = Q(pk__in=[]), Q()
+        for key, value in zip(self.keys, position):
+            condition |= equal & self.get_key_condition(key, value, reverse)
+            name = KEY_PREFIX + key.name
+            if value is None:
+                equal &= Q(**{f"{name}__isnull": True})
+            else:
+                equal &= Q(**{name: value})
+        return condition
+
+    def get_position(self, instance) -> List[Any]:
+        return [getattr(instance, KEY_PREFIX + key.name) for key in self.keys]
+
+    def encode_cursor(self, position: List[Any], reverse: bool) -> str:
+        values = [
+            value if value is None or isinstance(value, int) else str(value)
+            for value in position
+        ]
+        data = json.dumps({"p": values, "r": reverse}).encode()
+        return base64.urlsafe_b64encode(data).decode()
+
+    def decode_cursor(self, request) -> Tuple[List[Any], bool]:
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None, False
+        try:
+            data = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            position, reverse = data["p"], bool(data["r"])
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(INVALID_CURSOR)
+        if len(position) != len(self.keys):
+            raise NotFound(INVALID_CURSOR)
+        return position, reverse
+
+    def get_cursor_link(self, position: List[Any], reverse: bool = False):
+        if position is None:
+            return None
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.page_query_param)
+        cursor = self.encode_cursor(position, reverse)
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+
+def estimate_count(queryset: QuerySet) -> int:
+    """
+    Returns the query planner's estimate of the number of rows returned by
+    the queryset, which is much cheaper than counting them.
+
+    Parameters
+    ----------
+    queryset : QuerySet
+        Queryset to estimate
+
+    Returns
+    -------
+    int
+        Estimated row count
+    """
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
@@ -1,15 +1,15 @@
 """
 Definition of the :class:`ScanViewSet` class.
 """
-import io
-import zipfile
 from pathlib import Path
-from typing import Tuple
+from typing import List, Tuple
 
 from bokeh.client import pull_session
 from bokeh.embed import server_session
 from django.conf import settings
 from django.core.exceptions import ObjectDoesNotExist
+from django.db.models import F
+from django.db.models.functions import TruncDate, TruncTime
 from django.db.models.query import QuerySet
 from django.http import HttpResponse, JsonResponse
 from django_analyses.serializers.run import RunSerializer
@@ -17,9 +17,22 @@ from django_dicom.models import Series
 from django_mri.filters.scan_filter import ScanFilter
 from django_mri.models import Scan
 from django_mri.serializers import ScanSerializer
+from django_mri.utils.archive import ArchiveEntry
+from django_mri.utils.slices import (
+    MIN_VOLUME_STRIDE,
+    PLANES,
+    PNG,
+    SliceRenderer,
+    get_cached_tile,
+    get_etag,
+)
+from django_mri.views.caching import ConditionalGetMixin
 from django_mri.views.defaults import DefaultsMixin
-from django_mri.views.pagination import StandardResultsSetPagination
-from django_mri.views.utils import fix_bokeh_script
+from django_mri.views.pagination import (
+    CursorKey,
+    KeysetResultsSetPagination,
+)
+from django_mri.views.utils import fix_bokeh_script, zip_response
 from nilearn.plotting.html_document import HTMLDocument
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
@@ -28,6 +41,9 @@ from rest_framework.response import Response
 
 HOST_NAME: str = getattr(settings, "APP_IP", "localhost")
 BOKEH_URL: str = f"http://{HOST_NAME}:5006/series_viewer"
+TILE_SHAPE_HEADER: str = "X-Tile-Shape"
+TILE_CACHE_CONTROL: str = "private, max-age=3600"
+INVALID_TILE_PARAMETERS: str = "Invalid tile parameters."
 CONTENT_DISPOSITION: str = "attachment; filename={instance_id}.zip"
 ZIP_CONTENT_TYPE: str = "application/x-zip-compressed"
 SCAN_SEARCH_FIELDS: Tuple[str] = (
@@ -61,15 +77,31 @@ SCAN_ORDERING_FIELDS: Tuple[str] = (
     "session__subject__first_name",
     "session__subject__last_name",
 )
+SCAN_CURSOR_KEYS: List[CursorKey] = [
+    CursorKey("date", TruncDate("time"), descending=True),
+    CursorKey("time", TruncTime("time")),
+    CursorKey("id", F("id")),
+]
+
 
+def _optional_float(value: str) -> float:
+    return None if value in (None, "") else float(value)
 
-class ScanViewSet(DefaultsMixin, viewsets.ModelViewSet):
+
+class ScanViewSet(
+    DefaultsMixin, ConditionalGetMixin, viewsets.ModelViewSet
+):
     """
     API endpoint that allows scans to be viewed or edited.
     """
 
-    pagination_class = StandardResultsSetPagination
-    queryset = Scan.objects.order_by("-time__date", "time__time")
+    pagination_class = KeysetResultsSetPagination
+    cursor_keys = SCAN_CURSOR_KEYS
+    queryset = (
+        Scan.objects.select_related("dicom", "_nifti", "session__subject")
+        .prefetch_related("study_groups")
+        .order_by("-time__date", "time__time")
+    )
     serializer_class = ScanSerializer
     filter_class = ScanFilter
     search_fields = SCAN_SEARCH_FIELDS
@@ -177,6 +209,112 @@ class ScanViewSet(DefaultsMixin, viewsets.ModelViewSet):
             serializer = ScanSerializer(scan, context={"request": request})
             return Response(serializer.data)
 
+    def get_nifti_path(self) -> Path:
+        """
+        Returns the requested scan's NIfTI file path, without triggering
+        conversion.
+
+        Returns
+        -------
+        Path
+            NIfTI file path, or None if the scan has not been converted or
+            the file is missing
+        """
+        scan = self.get_object()
+        if scan._nifti is None:
+            return None
+        path = Path(scan._nifti.path)
+        return path if path.is_file() else None
+
+    def tile_response(
+        self, request: Request, path: Path, render, **kwargs
+    ) -> HttpResponse:
+        try:
+            etag = get_etag(path, render.__name__, sorted(kwargs.items()))
+        except FileNotFoundError:
+            return Response(status=status.HTTP_404_NOT_FOUND)
+        if request.META.get("HTTP_IF_NONE_MATCH") == etag:
+            response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            try:
+                tile = get_cached_tile(etag, render, **kwargs)
+            except ValueError as e:
+                return Response(
+                    {"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST
+                )
+            response = HttpResponse(tile.data, content_type=tile.content_type)
+            response[TILE_SHAPE_HEADER] = ",".join(map(str, tile.shape))
+        response["ETag"] = etag
+        response["Cache-Control"] = TILE_CACHE_CONTROL
+        return response
+
+    @action(detail=True, methods=["GET"], url_path="slice")
+    def slice_tile(self, request: Request, pk: int = None) -> HttpResponse:
+        """
+        Returns a single slice of the scan's NIfTI data as an 8-bit tile.
+
+        Query parameters: *plane* (axial, coronal or sagittal), *index*
+        (defaults to the middle slice), *volume*, *vmin*, *vmax* (default to
+        an estimated display window) and *tile_format* (png or raw). The
+        shape of the tile is returned in the X-Tile-Shape header.
+        """
+        path = self.get_nifti_path()
+        if path is None:
+            return Response(status=status.HTTP_404_NOT_FOUND)
+        params = request.query_params
+        renderer = SliceRenderer(path)
+        plane = params.get("plane", "axial")
+        try:
+            index = params.get("index")
+            if index is None:
+                index = renderer.shape[PLANES[plane]] // 2
+            kwargs = {
+                "plane": plane,
+                "index": int(index),
+                "volume": int(params.get("volume", 0)),
+                "vmin": _optional_float(params.get("vmin")),
+                "vmax": _optional_float(params.get("vmax")),
+                "tile_format": params.get("tile_format", PNG),
+            }
+        except (KeyError, ValueError):
+            return Response(
+                {"detail": INVALID_TILE_PARAMETERS},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return self.tile_response(
+            request, path, renderer.render_slice, **kwargs
+        )
+
+    @action(detail=True, methods=["GET"], url_path="volume")
+    def volume_tile(self, request: Request, pk: int = None) -> HttpResponse:
+        """
+        Returns a downsampled volume of the scan's NIfTI data as raw uint8
+        voxels (C order), with the shape given in the X-Tile-Shape header.
+
+        Query parameters: *stride* (default 4, at least
+        :attr:`~django_mri.utils.slices.MIN_VOLUME_STRIDE`) and *volume*.
+        """
+        path = self.get_nifti_path()
+        if path is None:
+            return Response(status=status.HTTP_404_NOT_FOUND)
+        params = request.query_params
+        try:
+            kwargs = {
+                "stride": int(params.get("stride", 4)),
+                "volume": int(params.get("volume", 0)),
+            }
+        except ValueError:
+            kwargs = None
+        if kwargs is None or kwargs["stride"] < MIN_VOLUME_STRIDE:
+            return Response(
+                {"detail": INVALID_TILE_PARAMETERS},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        renderer = SliceRenderer(path)
+        return self.tile_response(
+            request, path, renderer.render_volume, **kwargs
+        )
+
     @action(detail=True, methods=["GET"])
     def plot(self, request: Request, pk: int = None) -> Response:
         arguments = {"scan_id": str(pk)}
@@ -214,19 +352,12 @@ class ScanViewSet(DefaultsMixin, viewsets.ModelViewSet):
             return HttpResponse(
                 f"Could not create NIfTI format version of scan #{pk}"
             )
-        buffer = io.BytesIO()
-        with zipfile.ZipFile(buffer, "w") as zip_file:
-            nii_name = nii_path.name
-            zip_file.write(nii_path, nii_name)
-            json_file = Path(instance.nifti.json_file)
-            if json_file.exists():
-                zip_file.write(json_file, json_file.name)
-        response = HttpResponse(
-            buffer.getvalue(), content_type=ZIP_CONTENT_TYPE
-        )
+        entries = [ArchiveEntry(name=nii_path.name, path=nii_path)]
+        json_file = Path(instance.nifti.json_file)
+        if json_file.exists():
+            entries.append(ArchiveEntry(name=json_file.name, path=json_file))
         content_disposition = CONTENT_DISPOSITION.format(instance_id=pk)
-        response["Content-Disposition"] = content_disposition
-        return response
+        return zip_response(entries, content_disposition, ZIP_CONTENT_TYPE)
 
     @action(detail=False, methods=["get"])
     def listed_nifti_zip(
@@ -234,26 +365,23 @@ class ScanViewSet(DefaultsMixin, viewsets.ModelViewSet):
     ) -> HttpResponse:
         scan_ids = [int(pk) for pk in scan_ids.split(",")]
         queryset = Scan.objects.filter(id__in=scan_ids)
-        buffer = io.BytesIO()
-        with zipfile.ZipFile(buffer, "w") as zip_file:
-            for instance in queryset:
-                try:
-                    nii_path = Path(instance.nifti.path)
-                except (AttributeError, RuntimeError):
-                    return HttpResponse(
-                        f"Could not create NIfTI format version of scan #{instance.id}"
-                    )
-                nii_name = nii_path.name
-                zip_file.write(nii_path, nii_name)
-                json_file = Path(instance.nifti.json_file)
-                if json_file.exists():
-                    zip_file.write(json_file, json_file.name)
-        response = HttpResponse(
-            buffer.getvalue(), content_type=ZIP_CONTENT_TYPE
-        )
+        entries = []
+        for instance in queryset:
+            try:
+                nii_path = Path(instance.nifti.path)
+            except (AttributeError, RuntimeError):
+                return HttpResponse(
+                    "Could not create NIfTI format version of scan "
+                    f"#{instance.id}"
+                )
+            entries.append(ArchiveEntry(name=nii_path.name, path=nii_path))
+            json_file = Path(instance.nifti.json_file)
+            if json_file.exists():
+                entries.append(
+                    ArchiveEntry(name=json_file.name, path=json_file)
+                )
         content_disposition = CONTENT_DISPOSITION.format(instance_id="scans")
-        response["Content-Disposition"] = content_disposition
-        return response
+        return zip_response(entries, content_disposition, ZIP_CONTENT_TYPE)
 
     @action(detail=False, methods=["get"])
     def to_zip(
@@ -262,18 +390,19 @@ class ScanViewSet(DefaultsMixin, viewsets.ModelViewSet):
         file_formats = file_formats.split(",")
         scan_ids = [int(pk) for pk in scan_ids.split(",")]
         queryset = Scan.objects.filter(id__in=scan_ids)
-        buffer = io.BytesIO()
-        with zipfile.ZipFile(buffer, "w") as zip_file:
-            for scan in queryset:
-                file_paths = scan.get_file_paths(file_format=file_formats)
-                for path in file_paths:
-                    zip_file.write(path, path.relative_to(settings.MEDIA_ROOT))
-        response = HttpResponse(
-            buffer.getvalue(), content_type=ZIP_CONTENT_TYPE
-        )
+        media_root = Path(settings.MEDIA_ROOT)
+        entries = []
+        for scan in queryset:
+            for file_format in file_formats:
+                # DICOM files barely compress, so they are stored as-is.
+                stored = file_format.lower() == "dicom"
+                for path in scan.get_file_paths(file_format=file_format):
+                    name = path.relative_to(media_root).as_posix()
+                    entries.append(
+                        ArchiveEntry(name=name, path=path, stored=stored)
+                    )
         content_disposition = CONTENT_DISPOSITION.format(instance_id="scans")
-        response["Content-Disposition"] = content_disposition
-        return response
+        return zip_response(entries, content_disposition, ZIP_CONTENT_TYPE)
 
     @action(detail=True, methods=["GET"])
     def query_scan_run_set(
@@ -1,20 +1,37 @@
 """
 Definition of the :class:`ScoreViewSet` class.
 """
+from django.db.models import F
+from django.http import StreamingHttpResponse
 from django_mri.filters.score_filter import ScoreFilter
+from django_mri.models.managers.score import TABLE_COLUMNS, TABLE_FIELDS
 from django_mri.models.score import Score
 from django_mri.serializers.score import ScoreSerializer
+from django_mri.utils.tables import DEFAULT_CHUNK_SIZE, get_arrow_schema
+from django_mri.views.caching import ConditionalGetMixin
 from django_mri.views.defaults import DefaultsMixin
-from django_mri.views.pagination import StandardResultsSetPagination
+from django_mri.views.pagination import (
+    CursorKey,
+    KeysetResultsSetPagination,
+)
+from django_mri.views.utils import get_table_format, table_response
 from rest_framework import viewsets
+from rest_framework.decorators import action
+from rest_framework.request import Request
 
 
-class ScoreViewSet(DefaultsMixin, viewsets.ModelViewSet):
+class ScoreViewSet(
+    DefaultsMixin, ConditionalGetMixin, viewsets.ModelViewSet
+):
     """
     API endpoint that allows scores to be viewed or edited.
     """
 
-    pagination_class = StandardResultsSetPagination
+    pagination_class = KeysetResultsSetPagination
+    cursor_keys = (
+        CursorKey("run", F("run"), descending=True),
+        CursorKey("id", F("id")),
+    )
     queryset = Score.objects.order_by("-run")
     serializer_class = ScoreSerializer
     filter_class = ScoreFilter
@@ -36,3 +53,21 @@ class ScoreViewSet(DefaultsMixin, viewsets.ModelViewSet):
         "region__title",
         "region__atlas__title",
     )
+
+    @action(detail=False, methods=["get"])
+    def export(self, request: Request) -> StreamingHttpResponse:
+        """
+        Streams the filtered scores as a CSV (default) or Parquet table,
+        according to the *file_format* query parameter. Rows are fetched in
+        chunks using a server-side cursor, so memory usage is bounded
+        regardless of the number of exported scores.
+        """
+        table_format = get_table_format(request)
+        queryset = self.filter_queryset(self.get_queryset())
+        schema = get_arrow_schema(
+            queryset.get_table_rows(), TABLE_FIELDS, TABLE_COLUMNS
+        )
+        rows = queryset.iter_table_rows(chunk_size=DEFAULT_CHUNK_SIZE)
+        return table_response(
+            rows, TABLE_COLUMNS, table_format, "scores", schema=schema
+        )
@@ -1,32 +1,50 @@
 """
 Definition of the :class:`SessionViewSet` class.
 """
-import io
-import zipfile
 from pathlib import Path
 from typing import List, Tuple
 
-from django.http import HttpResponse
+from django.db.models import Count, F, Prefetch
+from django.db.models.functions import TruncDate, TruncTime
+from django.http import HttpResponse, StreamingHttpResponse
 from django_dicom.views.utils import CONTENT_DISPOSITION, ZIP_CONTENT_TYPE
 from django_mri.filters.session_filter import SessionFilter
+from django_mri.models.managers.session import (
+    DATAFRAME_COLUMNS,
+    DATAFRAME_FIELDS,
+)
+from django_mri.models.scan import Scan
 from django_mri.models.session import Session
 from django_mri.serializers import (
     AdminSessionReadSerializer,
     SessionReadSerializer,
     SessionWriteSerializer,
 )
-from django_mri.utils.utils import get_mri_root
+from django_mri.utils.archive import ArchiveEntry
+from django_mri.utils.tables import (
+    CSV,
+    DEFAULT_CHUNK_SIZE,
+    get_arrow_schema,
+)
+from django_mri.utils.utils import get_group_model, get_mri_root
+from django_mri.views.caching import ConditionalGetMixin
 from django_mri.views.defaults import DefaultsMixin
-from django_mri.views.pagination import StandardResultsSetPagination
+from django_mri.views.pagination import (
+    CursorKey,
+    KeysetResultsSetPagination,
+)
 from django_mri.views.utils import (
-    CSV_CONTENT_TYPE,
-    SESSIONS_CSV_HEADERS,
     ReadWriteSerializerMixin,
+    get_table_format,
+    table_response,
+    zip_response,
 )
 from rest_framework import viewsets
 from rest_framework.decorators import action
 from rest_framework.request import Request
 
+Group = get_group_model()
+
 ORDERING_FIELDS: Tuple[str] = (
     "id",
     "subject",
@@ -37,6 +55,11 @@ ORDERING_FIELDS: Tuple[str] = (
     "time__time",
 )
 SEARCH_FIELDS: Tuple[str] = ("id", "subject", "comments", "time", "scan_set")
+CURSOR_KEYS: List[CursorKey] = [
+    CursorKey("date", TruncDate("time"), descending=True),
+    CursorKey("time", TruncTime("time"), descending=True),
+    CursorKey("id", F("id")),
+]
 PERSONAL_INFORMATION_COLUMNS: List[str] = [
     "Subject ID",
     "First Name",
@@ -45,15 +68,30 @@ PERSONAL_INFORMATION_COLUMNS: List[str] = [
 
 
 class SessionViewSet(
-    DefaultsMixin, ReadWriteSerializerMixin, viewsets.ModelViewSet
+    DefaultsMixin,
+    ReadWriteSerializerMixin,
+    ConditionalGetMixin,
+    viewsets.ModelViewSet,
 ):
     """
     API endpoint that allows :class:`~django_mri.models.session.Session`
     instances to be viewed and edited.
     """
 
-    pagination_class = StandardResultsSetPagination
-    queryset = Session.objects.order_by("-time__date", "-time__time")
+    pagination_class = KeysetResultsSetPagination
+    cursor_keys = CURSOR_KEYS
+    queryset = (
+        Session.objects.select_related("subject", "measurement", "irb")
+        .annotate(n_scans=Count("scan", distinct=True))
+        .prefetch_related(
+            Prefetch("scan_set", queryset=Scan.objects.only("id", "session")),
+            Prefetch(
+                "scan_set__study_groups",
+                queryset=Group.objects.select_related("study"),
+            ),
+        )
+        .order_by("-time__date", "-time__time")
+    )
     write_serializer_class = SessionWriteSerializer
     filter_class = SessionFilter
     search_fields = SEARCH_FIELDS
@@ -77,51 +115,72 @@ class SessionViewSet(
         subject = instance.subject.id_number
         date = instance.time.date().strftime("%Y%m%d")
         name = f"{date}_{subject}_{instance.id}"
-        buffer = io.BytesIO()
         base_dir = Path(f"{date}_{instance.id}")
-        with zipfile.ZipFile(buffer, "w") as zip_file:
-            for scan in instance.scan_set.all():
-                scan_base_dir = base_dir / f"{scan.number}_{scan.description}"
-                for dcm in Path(scan.dicom.path).iterdir():
-                    dcm_path = scan_base_dir / dcm.name
-                    zip_file.write(dcm, dcm_path)
-        response = HttpResponse(
-            buffer.getvalue(), content_type=ZIP_CONTENT_TYPE
-        )
+        entries = []
+        for scan in instance.scan_set.select_related("dicom"):
+            scan_base_dir = base_dir / f"{scan.number}_{scan.description}"
+            for dcm in Path(scan.dicom.path).iterdir():
+                dcm_path = (scan_base_dir / dcm.name).as_posix()
+                entries.append(
+                    ArchiveEntry(name=dcm_path, path=dcm, stored=True)
+                )
         content_disposition = CONTENT_DISPOSITION.format(name=name)
-        response["Content-Disposition"] = content_disposition
-        return response
+        return zip_response(entries, content_disposition, ZIP_CONTENT_TYPE)
 
     @action(detail=True, methods=["get"])
     def nifti_zip(self, request: Request, pk: int) -> HttpResponse:
         instance = Session.objects.get(id=pk)
-        buffer = io.BytesIO()
         nifti_root = get_mri_root() / "NIfTI"
-        with zipfile.ZipFile(buffer, "w") as zip_file:
-            for scan in instance.scan_set.all():
-                try:
-                    path = str(scan.nifti.path)
-                except AttributeError:
-                    continue
-                relative_path = Path(path).relative_to(nifti_root)
-                zip_file.write(path, relative_path)
-        response = HttpResponse(
-            buffer.getvalue(), content_type=ZIP_CONTENT_TYPE
-        )
+        entries = []
+        for scan in instance.scan_set.all():
+            try:
+                path = Path(scan.nifti.path)
+            except AttributeError:
+                continue
+            relative_path = path.relative_to(nifti_root)
+            entries.append(
+                ArchiveEntry(name=relative_path.as_posix(), path=path)
+            )
         name = str(instance.id)
         content_disposition = CONTENT_DISPOSITION.format(name=name)
-        response["Content-Disposition"] = content_disposition
-        return response
+        return zip_response(entries, content_disposition, ZIP_CONTENT_TYPE)
+
+    def get_table_fields(self) -> Tuple[List[str], List[str]]:
+        """
+        Returns the exported session fields and their column names, excluding
+        personal information unless the requesting user is a superuser.
+
+        Returns
+        -------
+        Tuple[List[str], List[str]]
+            Exported fields and column names
+        """
+        fields, columns = [], []
+        for field, column in zip(DATAFRAME_FIELDS, DATAFRAME_COLUMNS):
+            is_personal = column in PERSONAL_INFORMATION_COLUMNS
+            if self.request.user.is_superuser or not is_personal:
+                fields.append(field)
+                columns.append(column)
+        return fields, columns
+
+    def stream_table(self, table_format: str) -> StreamingHttpResponse:
+        queryset = self.filter_queryset(self.get_queryset())
+        fields, columns = self.get_table_fields()
+        rows = queryset.get_table_rows(fields)
+        schema = get_arrow_schema(rows, fields, columns)
+        rows = rows.iterator(chunk_size=DEFAULT_CHUNK_SIZE)
+        return table_response(
+            rows, columns, table_format, "sessions", schema=schema
+        )
+
+    @action(detail=False, methods=["GET"])
+    def export(self, request: Request) -> StreamingHttpResponse:
+        """
+        Streams the filtered sessions as a CSV (default) or Parquet table,
+        according to the *file_format* query parameter.
+        """
+        return self.stream_table(get_table_format(request))
 
     @action(detail=False, methods=["GET"])
     def to_csv(self, request, *args, **kwargs):
-        queryset = self.get_queryset()
-        queryset = self.filter_queryset(queryset)
-        df = queryset.to_dataframe()
-        if not request.user.is_superuser:
-            df.drop(PERSONAL_INFORMATION_COLUMNS, axis=1, inplace=True)
-        response = HttpResponse(
-            content_type=CSV_CONTENT_TYPE, headers=SESSIONS_CSV_HEADERS,
-        )
-        df.to_csv(path_or_buf=response)
-        return response
+        return self.stream_table(CSV)
@@ -1,12 +1,47 @@
-from typing import Dict
+import mimetypes
+import os
+import re
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Sequence, Tuple
 
+import pyarrow as pa
 from bs4 import BeautifulSoup
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.http import http_date, parse_http_date_safe
+from rest_framework.exceptions import ValidationError
+from rest_framework.request import Request
+from django_mri.utils.archive import (
+    DEFAULT_CHUNK_SIZE,
+    ZIP,
+    ArchiveEntry,
+    ArchiveStream,
+)
+from django_mri.utils.tables import (
+    CONTENT_TYPES,
+    CSV,
+    TABLE_FORMATS,
+    iter_table,
+)
+from django_mri.utils.utils import get_sendfile_header, get_sendfile_url
 
 DEFAULT_DESTINATION_ID: str = "bk-app"
 CSV_CONTENT_TYPE: str = "text/csv"
 SESSIONS_CSV_HEADERS: Dict[str, str] = {
     "Content-Disposition": 'attachment; filename="sessions.csv"'
 }
+ATTACHMENT_DISPOSITION: str = 'attachment; filename="{name}"'
+INLINE_DISPOSITION: str = 'inline; filename="{name}"'
+DEFAULT_CONTENT_TYPE: str = "application/octet-stream"
+
+#: Single byte range request pattern (multiple ranges are not supported).
+RANGE_PATTERN = re.compile(r"^bytes=(?P<start>\d*)-(?P<end>\d*)$")
+X_ACCEL_REDIRECT: str = "X-Accel-Redirect"
+
+#: Query parameter used to select an exported table's format ("format" is
+#: reserved by DRF for content negotiation).
+TABLE_FORMAT_QUERY_PARAM: str = "file_format"
+INVALID_TABLE_FORMAT: str = "Invalid file format! Valid formats are: {valid}."
 
 
 def fix_bokeh_script(
@@ -19,6 +54,305 @@ def fix_bokeh_script(
     return script.replace(random_id, destination_id)
 
 
+def zip_response(
+    entries: Iterable[ArchiveEntry],
+    content_disposition: str,
+    content_type: str,
+) -> StreamingHttpResponse:
+    """
+    Returns a streaming response of a ZIP64 archive of the provided entries.
+    The archive is generated while it is being sent, so memory usage does not
+    depend on its size.
+
+    Parameters
+    ----------
+    entries : Iterable[ArchiveEntry]
+        Archive entries
+    content_disposition : str
+        Content-Disposition header value
+    content_type : str
+        Content-Type header value
+
+    Returns
+    -------
+    StreamingHttpResponse
+        Streamed archive response
+    """
+    stream = ArchiveStream(entries, archive_format=ZIP)
+    response = StreamingHttpResponse(stream, content_type=content_type)
+    response["Content-Disposition"] = content_disposition
+    return response
+
+
+def get_table_format(request: Request) -> str:
+    """
+    Returns the table format requested using the
+    :attr:`TABLE_FORMAT_QUERY_PARAM` query parameter (CSV by default).
+
+    Parameters
+    ----------
+    request : Request
+        Export request
+
+    Returns
+    -------
+    str
+        Table format
+
+    Raises
+    ------
+    ValidationError
+        Invalid table format
+    """
+    table_format = request.query_params.get(TABLE_FORMAT_QUERY_PARAM, CSV)
+    if table_format not in TABLE_FORMATS:
+        message = INVALID_TABLE_FORMAT.format(valid=", ".join(TABLE_FORMATS))
+        raise ValidationError({TABLE_FORMAT_QUERY_PARAM: message})
+    return table_format
+
+
+def table_response(
+    rows: Iterable[Sequence],
+    columns: Sequence[str],
+    table_format: str,
+    name: str,
+    schema: pa.Schema = None,
+) -> StreamingHttpResponse:
+    """
+    Returns a streaming response of the provided rows encoded as a table (see
+    :func:`~django_mri.utils.tables.iter_table`), so memory usage does not
+    depend on the number of rows.
+
+    Parameters
+    ----------
+    rows : Iterable[Sequence]
+        Table rows
+    columns : Sequence[str]
+        Column names
+    table_format : str
+        One of :attr:`~django_mri.utils.tables.TABLE_FORMATS`
+    name : str
+        Downloaded file name (without suffix)
+    schema : pa.Schema, optional
+        Parquet table schema (see
+        :func:`~django_mri.utils.tables.get_arrow_schema`), by default None
+
+    Returns
+    -------
+    StreamingHttpResponse
+        Streamed table response
+    """
+    content = iter_table(
+        rows, columns, table_format=table_format, schema=schema
+    )
+    response = StreamingHttpResponse(
+        content, content_type=CONTENT_TYPES[table_format]
+    )
+    file_name = f"{name}.{table_format}"
+    response["Content-Disposition"] = ATTACHMENT_DISPOSITION.format(
+        name=file_name
+    )
+    return response
+
+
+def parse_range_header(header: str, size: int) -> Tuple[int, int]:
+    """
+    Parses an HTTP *Range* header value into an inclusive (start, end) byte
+    range.
+
+    Parameters
+    ----------
+    header : str
+        Range header value
+    size : int
+        Full content size in bytes
+
+    Returns
+    -------
+    Tuple[int, int]
+        First and last byte positions, or None if the header is malformed (in
+        which case it should be ignored)
+
+    Raises
+    ------
+    ValueError
+        The range is not satisfiable
+    """
+    match = RANGE_PATTERN.match(header.strip())
+    if not match or not (match.group("start") or match.group("end")):
+        return None
+    start, end = match.group("start"), match.group("end")
+    if not start:
+        # Suffix range, i.e. the last *end* bytes.
+        length = int(end)
+        if length == 0 or size == 0:
+            # There are no bytes to return (from an empty file).
+            raise ValueError("Unsatisfiable suffix range.")
+        return max(size - length, 0), size - 1
+    start = int(start)
+    end = min(int(end), size - 1) if end else size - 1
+    if start >= size or start > end:
+        raise ValueError("Unsatisfiable range.")
+    return start, end
+
+
+def iter_file_range(
+    path: Path, start: int, end: int, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterator[bytes]:
+    """
+    Generates the bytes of a file between *start* and *end* (inclusive).
+    """
+    remaining = end - start + 1
+    with open(path, "rb") as f:
+        f.seek(start)
+        while remaining > 0:
+            chunk = f.read(min(chunk_size, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def sendfile_response(path: Path, content_type: str) -> HttpResponse:
+    """
+    Returns an empty response delegating the file transfer (including range
+    requests) to the front-end server using the configured header (see
+    :func:`~django_mri.utils.utils.get_sendfile_header`).
+    """
+    header = get_sendfile_header()
+    response = HttpResponse(content_type=content_type)
+    if header == X_ACCEL_REDIRECT:
+        relative_path = Path(path).relative_to(settings.MEDIA_ROOT)
+        prefix = get_sendfile_url().rstrip("/")
+        response[header] = f"{prefix}/{relative_path.as_posix()}"
+    else:
+        response[header] = str(path)
+    return response
+
+
+def get_file_etag(stat: os.stat_result) -> str:
+    """
+    Returns a (strong) ETag derived from a file's modification time and
+    size, so that it may be computed without reading the file.
+    """
+    return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+
+def is_not_modified(request, etag: str, mtime: float) -> bool:
+    """
+    Evaluates the request's *If-None-Match* and *If-Modified-Since*
+    conditions.
+    """
+    if_none_match = request.META.get("HTTP_IF_NONE_MATCH")
+    if if_none_match is not None:
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in tags or etag in tags or f"W/{etag}" in tags
+    if_modified_since = request.META.get("HTTP_IF_MODIFIED_SINCE")
+    if if_modified_since is not None:
+        since = parse_http_date_safe(if_modified_since)
+        return since is not None and int(mtime) <= since
+    return False
+
+
+def is_range_valid(request, etag: str, mtime: float) -> bool:
+    """
+    Evaluates the request's *If-Range* condition, i.e. whether a range
+    request still refers to the current version of the file.
+    """
+    if_range = request.META.get("HTTP_IF_RANGE")
+    if if_range is None:
+        return True
+    if if_range.startswith('"'):
+        return if_range == etag
+    since = parse_http_date_safe(if_range)
+    return since is not None and int(mtime) <= since
+
+
+def file_response(
+    request,
+    path: Path,
+    content_type: str = None,
+    file_name: str = None,
+    as_attachment: bool = True,
+) -> HttpResponse:
+    """
+    Returns a file download response with support for single byte range
+    requests, so that interrupted downloads may be resumed and viewers may
+    read only the required parts of a file. Conditional requests are
+    supported using the ETag and Last-Modified headers. If a sendfile header
+    is configured, the transfer is delegated to the front-end server instead.
+
+    Parameters
+    ----------
+    request : Request
+        The download request
+    path : Path
+        File path
+    content_type : str, optional
+        Content-Type header value, by default guessed from the file name
+    file_name : str, optional
+        Downloaded file name, by default the file's name
+    as_attachment : bool, optional
+        Whether to set an attachment Content-Disposition, by default True
+
+    Returns
+    -------
+    HttpResponse
+        File response
+    """
+    path = Path(path)
+    file_name = file_name or path.name
+    if content_type is None:
+        content_type, _ = mimetypes.guess_type(file_name)
+    content_type = content_type or DEFAULT_CONTENT_TYPE
+    if get_sendfile_header():
+        response = sendfile_response(path, content_type)
+    else:
+        stat = path.stat()
+        size, mtime = stat.st_size, stat.st_mtime
+        etag = get_file_etag(stat)
+        if is_not_modified(request, etag, mtime):
+            response = HttpResponse(status=304)
+            response["ETag"] = etag
+            response["Last-Modified"] = http_date(mtime)
+            return response
+        header = request.META.get("HTTP_RANGE")
+        if header and not is_range_valid(request, etag, mtime):
+            header = None
+        try:
+            byte_range = parse_range_header(header, size) if header else None
+        except ValueError:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{size}"
+            return response
+        if byte_range is None:
+            response = FileResponse(
+                open(path, "rb"), content_type=content_type
+            )
+            response["Content-Length"] = size
+        else:
+            start, end = byte_range
+            response = StreamingHttpResponse(
+                iter_file_range(path, start, end),
+                status=206,
+                content_type=content_type,
+            )
+            response["Content-Range"] = f"bytes {start}-{end}/{size}"
+            response["Content-Length"] = end - start + 1
+        response["Accept-Ranges"] = "bytes"
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(mtime)
+    if as_attachment:
+        response["Content-Disposition"] = ATTACHMENT_DISPOSITION.format(
+            name=file_name
+        )
+    else:
+        response["Content-Disposition"] = INLINE_DISPOSITION.format(
+            name=file_name
+        )
+    return response
+
+
 class ReadWriteSerializerMixin(object):
     """
     Overrides get_serializer_class to choose the read serializer
@@ -3,13 +3,20 @@ Factories for test models.
 
 Todo
 ----
-* Reintegrate Scan and NIfTI factories.
+* Reintegrate the NIfTI factory.
 """
-
+from datetime import datetime
 
 import factory
+import pytz
+from django_analyses.models import Analysis, AnalysisVersion, Run
 from tests.models import Subject
 
+from django_mri.models import Atlas, Metric, Region, Scan, Session
+
+#: Default session and scan acquisition time.
+ACQUISITION_TIME = datetime(2020, 1, 10, tzinfo=pytz.UTC)
+
 
 class SubjectFactory(factory.django.DjangoModelFactory):
     # date_of_birth = factory.Faker("date_this_century", before_now=True)
@@ -21,6 +28,69 @@ class SubjectFactory(factory.django.DjangoModelFactory):
         model = Subject
 
 
+class AnalysisFactory(factory.django.DjangoModelFactory):
+    title = "Analysis"
+
+    class Meta:
+        model = Analysis
+        django_get_or_create = ("title",)
+
+
+class AnalysisVersionFactory(factory.django.DjangoModelFactory):
+    analysis = factory.SubFactory(AnalysisFactory)
+    title = "1.0"
+
+    class Meta:
+        model = AnalysisVersion
+        django_get_or_create = ("analysis", "title")
+
+
+class RunFactory(factory.django.DjangoModelFactory):
+    analysis_version = factory.SubFactory(AnalysisVersionFactory)
+
+    class Meta:
+        model = Run
+
+
+class MetricFactory(factory.django.DjangoModelFactory):
+    title = "Volume"
+
+    class Meta:
+        model = Metric
+
+
+class AtlasFactory(factory.django.DjangoModelFactory):
+    title = "Atlas"
+
+    class Meta:
+        model = Atlas
+        django_get_or_create = ("title",)
+
+
+class RegionFactory(factory.django.DjangoModelFactory):
+    atlas = factory.SubFactory(AtlasFactory)
+    title = "Region"
+
+    class Meta:
+        model = Region
+
+
+class SessionFactory(factory.django.DjangoModelFactory):
+    time = ACQUISITION_TIME
+
+    class Meta:
+        model = Session
+
+
+class ScanFactory(factory.django.DjangoModelFactory):
+    session = factory.SubFactory(SessionFactory)
+    number = 0
+    time = factory.SelfAttribute("session.time")
+
+    class Meta:
+        model = Scan
+
+
 # class NIfTIFactory(factory.django.DjangoModelFactory):
 #     path = factory.Faker("file_path", depth=4, extension="nii.gz")
 #     is_raw = factory.Faker("boolean")
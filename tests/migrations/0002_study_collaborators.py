@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("tests", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="study",
+            name="collaborators",
+            field=models.ManyToManyField(
+                blank=True, to=settings.AUTH_USER_MODEL
+            ),
+        ),
+    ]
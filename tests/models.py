@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.db import models
 from django_extensions.db.models import TimeStampedModel, TitleDescriptionModel
 
@@ -23,7 +24,9 @@ class MeasurementDefinition(TitleDescriptionModel):
 
 
 class Study(TitleDescriptionModel):
-    pass
+    collaborators = models.ManyToManyField(
+        settings.AUTH_USER_MODEL, blank=True
+    )
 
 
 class Group(TitleDescriptionModel, TimeStampedModel):
@@ -0,0 +1,79 @@
+from datetime import date, datetime
+
+import factory
+import pytz
+from django.db.models import signals
+from django.test import TestCase
+from tests.models import Group, Study, Subject
+
+from django_mri.models import AcquisitionSummary, Scan, Session
+
+
+class AcquisitionSummaryTestCase(TestCase):
+    @classmethod
+    @factory.django.mute_signals(signals.post_save, signals.m2m_changed)
+    def setUpTestData(cls):
+        study = Study.objects.create(title="Study")
+        cls.group_1 = Group.objects.create(title="Group 1", study=study)
+        cls.group_2 = Group.objects.create(title="Group 2", study=study)
+        subject = Subject.objects.create(id_number="1")
+        # January: two sessions, one with two scans in both groups.
+        january = datetime(2020, 1, 10, tzinfo=pytz.UTC)
+        session = Session.objects.create(subject=subject, time=january)
+        for number in range(2):
+            scan = Scan.objects.create(
+                session=session, number=number, time=january
+            )
+            scan.study_groups.set([cls.group_1, cls.group_2])
+        session = Session.objects.create(subject=subject, time=january)
+        scan = Scan.objects.create(session=session, number=0, time=january)
+        scan.study_groups.set([cls.group_1])
+        # February: a single session with an ungrouped scan.
+        february = datetime(2020, 2, 10, tzinfo=pytz.UTC)
+        session = Session.objects.create(subject=subject, time=february)
+        Scan.objects.create(session=session, number=0, time=february)
+        AcquisitionSummary.objects.refresh()
+
+    def test_totals(self):
+        result = AcquisitionSummary.objects.summarize()
+        self.assertEqual(result, [{"scan_count": 4, "session_count": 3}])
+
+    def test_summarize_by_month(self):
+        result = AcquisitionSummary.objects.summarize(["month"])
+        expected = [
+            {"month": date(2020, 1, 1), "scan_count": 3, "session_count": 2},
+            {"month": date(2020, 2, 1), "scan_count": 1, "session_count": 1},
+        ]
+        self.assertEqual(result, expected)
+
+    def test_summarize_by_group(self):
+        result = AcquisitionSummary.objects.summarize(["group"])
+        counts = {
+            row["group"]: (row["scan_count"], row["session_count"])
+            for row in result
+        }
+        expected = {
+            self.group_1.id: (3, 2),
+            self.group_2.id: (2, 1),
+            None: (1, 1),
+        }
+        self.assertEqual(counts, expected)
+
+    def test_refresh_month(self):
+        january = date(2020, 1, 1)
+        Session.objects.filter(time__month=1).delete()
+        AcquisitionSummary.objects.refresh_month(january)
+        self.assertFalse(AcquisitionSummary.objects.filter(month=january))
+        result = AcquisitionSummary.objects.summarize()
+        self.assertEqual(result, [{"scan_count": 1, "session_count": 1}])
+
+    def test_invalid_dimension_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            AcquisitionSummary.objects.summarize(["subject"])
+
+    def test_group_clear_refreshes_summary(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.group_2.mri_scan_set.clear()
+        result = AcquisitionSummary.objects.summarize(["group"])
+        groups = {row["group"] for row in result}
+        self.assertEqual(groups, {self.group_1.id, None})
@@ -0,0 +1,46 @@
+from django.test import TestCase
+
+from django_mri.models import Atlas, Metric, Region
+
+
+class BulkLoadTestCase(TestCase):
+    ATLAS_DEFINITIONS = [
+        {
+            "title": "Symmetric",
+            "symmetric": True,
+            "regions": [{"title": "A"}, {"title": "B"}],
+        },
+        {
+            "title": "Asymmetric",
+            "symmetric": False,
+            "regions": [{"index": 1, "description": "First"}],
+        },
+    ]
+    METRIC_DEFINITIONS = [{"title": "Volume", "description": "Volume"}]
+
+    def test_atlas_bulk_load(self):
+        results = Atlas.objects.bulk_load(self.ATLAS_DEFINITIONS)
+        self.assertEqual([created for _, created in results], [True, True])
+        self.assertEqual(Region.objects.count(), 5)
+        self.assertEqual(
+            set(Region.objects.filter(title="A").values_list("hemisphere")),
+            {("L",), ("R",)},
+        )
+
+    def test_atlas_bulk_load_twice_updates(self):
+        Atlas.objects.bulk_load(self.ATLAS_DEFINITIONS)
+        definitions = [dict(d) for d in self.ATLAS_DEFINITIONS]
+        definitions[1]["regions"] = [{"index": 1, "description": "Updated"}]
+        results = Atlas.objects.bulk_load(definitions)
+        self.assertEqual([created for _, created in results], [False, False])
+        self.assertEqual(Atlas.objects.count(), 2)
+        self.assertEqual(Region.objects.count(), 5)
+        region = Region.objects.get(index=1)
+        self.assertEqual(region.description, "Updated")
+
+    def test_metric_bulk_load_twice_updates(self):
+        Metric.objects.bulk_load(self.METRIC_DEFINITIONS)
+        definitions = [{"title": "Volume", "description": "Updated"}]
+        results = Metric.objects.bulk_load(definitions)
+        self.assertFalse(results[0][1])
+        self.assertEqual(Metric.objects.get().description, "Updated")
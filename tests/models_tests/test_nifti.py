@@ -203,3 +203,38 @@ class NIfTIModelTestCase(TestCase):
         self.simple_nifti._json_data = expected
         result = self.simple_nifti.json_data
         self.assertEqual(result, expected)
+
+
+class NIfTIQuerySetTestCase(TestCase):
+    @classmethod
+    @factory.django.mute_signals(signals.post_save)
+    def setUpTestData(cls):
+        cls.compressed = NIfTI.objects.create(path="/a/sub-1/sub-1_T1w.nii.gz")
+        cls.uncompressed = NIfTI.objects.create(path="/a/sub-2/sub-2_T1w.nii")
+        # Matching stem but an unrelated suffix.
+        NIfTI.objects.create(path="/a/sub-1/sub-1_T1w.json")
+        # Matching directory name, but not a matching base name.
+        NIfTI.objects.create(path="/sub-1_T1w.nii.gz/other.nii.gz")
+
+    def test_with_basename(self):
+        basenames = dict(
+            NIfTI.objects.with_basename().values_list("id", "basename")
+        )
+        self.assertEqual(basenames[self.compressed.id], "sub-1_T1w.nii.gz")
+        self.assertEqual(basenames[self.uncompressed.id], "sub-2_T1w.nii")
+
+    def test_filter_by_basenames(self):
+        queryset = NIfTI.objects.filter_by_basenames(["sub-1_T1w.nii.gz"])
+        self.assertEqual(list(queryset), [self.compressed])
+
+    def test_filter_by_stems(self):
+        queryset = NIfTI.objects.filter_by_stems(
+            ["sub-1_T1w", "sub-2_T1w", "sub-3_T1w"]
+        ).order_by("id")
+        self.assertEqual(list(queryset), [self.compressed, self.uncompressed])
+
+    def test_filter_by_stems_with_suffixes(self):
+        queryset = NIfTI.objects.filter_by_stems(
+            ["sub-1_T1w", "sub-2_T1w"], suffixes=[".nii"]
+        )
+        self.assertEqual(list(queryset), [self.uncompressed])
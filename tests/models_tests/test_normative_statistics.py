@@ -0,0 +1,118 @@
+from datetime import date
+
+import factory
+import numpy as np
+from django.db import connection
+from django.db.models import signals
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from tests.factories import (
+    AnalysisVersionFactory,
+    MetricFactory,
+    RegionFactory,
+    RunFactory,
+    ScanFactory,
+)
+from tests.models import Subject
+
+from django_mri.models import NormativeStatistics, Score
+
+
+class NormativeStatisticsTestCase(TestCase):
+    VALUES = [1.0, 2.0, 4.0, 8.0]
+
+    @classmethod
+    @factory.django.mute_signals(signals.post_save)
+    def setUpTestData(cls):
+        cls.version = AnalysisVersionFactory()
+        cls.metric = MetricFactory()
+        cls.region = RegionFactory()
+        cls.scores = []
+        for i, value in enumerate(cls.VALUES):
+            subject = Subject.objects.create(
+                id_number=str(i), sex="F", date_of_birth=date(1990, 1, 1)
+            )
+            scan = ScanFactory(session__subject=subject)
+            run = RunFactory(analysis_version=cls.version)
+            score = Score.objects.create(
+                run=run, metric=cls.metric, region=cls.region, value=value
+            )
+            score.origin.add(scan)
+            cls.scores.append(score)
+
+    def test_update_from_scores(self):
+        NormativeStatistics.objects.update_from_scores(Score.objects.all())
+        statistics = NormativeStatistics.objects.get()
+        self.assertEqual(statistics.count, 4)
+        self.assertEqual(statistics.sex, "F")
+        self.assertEqual(statistics.age_bin, 30)
+        self.assertAlmostEqual(statistics.mean, np.mean(self.VALUES))
+        self.assertAlmostEqual(statistics.std, np.std(self.VALUES, ddof=1))
+
+    def test_incremental_update_matches_batch(self):
+        for score in self.scores:
+            NormativeStatistics.objects.update_from_scores(
+                Score.objects.filter(id=score.id)
+            )
+        statistics = NormativeStatistics.objects.get()
+        self.assertEqual(statistics.count, 4)
+        self.assertAlmostEqual(statistics.mean, np.mean(self.VALUES))
+        self.assertAlmostEqual(statistics.std, np.std(self.VALUES, ddof=1))
+
+    def test_update_locks_analysis_version(self):
+        with CaptureQueriesContext(connection) as context:
+            NormativeStatistics.objects.update_from_scores(
+                Score.objects.all()
+            )
+        locks = [
+            query["sql"]
+            for query in context.captured_queries
+            if "pg_advisory_xact_lock" in query["sql"]
+        ]
+        self.assertEqual(len(locks), 1)
+        self.assertIn(str(self.version.id), locks[0])
+
+    def test_remove_scores(self):
+        NormativeStatistics.objects.update_from_scores(Score.objects.all())
+        last = Score.objects.filter(id=self.scores[-1].id)
+        NormativeStatistics.objects.update_from_scores(last, remove=True)
+        statistics = NormativeStatistics.objects.get()
+        self.assertEqual(statistics.count, 3)
+        self.assertAlmostEqual(statistics.mean, np.mean(self.VALUES[:-1]))
+        self.assertAlmostEqual(
+            statistics.std, np.std(self.VALUES[:-1], ddof=1)
+        )
+
+    def test_rebuild(self):
+        # Scores counted twice (e.g. re-scored outside of from_run).
+        for _ in range(2):
+            NormativeStatistics.objects.update_from_scores(
+                Score.objects.all()
+            )
+        other_version = AnalysisVersionFactory(title="2.0")
+        Score.objects.create(
+            run=RunFactory(analysis_version=other_version),
+            metric=self.metric,
+            region=self.region,
+            value=1.0,
+        )
+        n_groups = NormativeStatistics.objects.rebuild()
+        self.assertEqual(n_groups, 2)
+        statistics = NormativeStatistics.objects.get(
+            analysis_version=self.version
+        )
+        self.assertEqual(statistics.count, 4)
+        self.assertAlmostEqual(statistics.mean, np.mean(self.VALUES))
+        self.assertAlmostEqual(statistics.std, np.std(self.VALUES, ddof=1))
+        statistics = NormativeStatistics.objects.get(
+            analysis_version=other_version
+        )
+        self.assertEqual(statistics.count, 1)
+
+    def test_z_score(self):
+        NormativeStatistics.objects.update_from_scores(Score.objects.all())
+        score = self.scores[-1]
+        df = Score.objects.filter(id=score.id).get_normative_z_scores()
+        expected = (8 - np.mean(self.VALUES)) / np.std(self.VALUES, ddof=1)
+        self.assertAlmostEqual(df.loc[score.id, "Z"], expected)
+        self.assertEqual(df.loc[score.id, "N"], 4)
@@ -0,0 +1,195 @@
+from datetime import date
+
+import factory
+from django.db.models import signals
+from django.test import TestCase
+from tests.factories import (
+    AnalysisVersionFactory,
+    MetricFactory,
+    RegionFactory,
+    RunFactory,
+    ScanFactory,
+    SessionFactory,
+    SubjectFactory,
+)
+
+from django_mri.analysis.score.utils import ScoreEntry
+from django_mri.models import Score
+from django_mri.models.managers.score import SEX_ANNOTATION
+
+
+class ScoreUpsertTestCase(TestCase):
+    @classmethod
+    @factory.django.mute_signals(signals.post_save)
+    def setUpTestData(cls):
+        cls.run = RunFactory()
+        cls.metric = MetricFactory()
+        cls.region = RegionFactory()
+        session = SessionFactory()
+        cls.scans = [
+            ScanFactory(session=session, number=number) for number in range(2)
+        ]
+
+    def get_entries(self, offset: float = 0):
+        return [
+            ScoreEntry(
+                metric_id=self.metric.id,
+                region_id=self.region.id,
+                value=1.5 + offset,
+                origin_ids=(self.scans[0].id,),
+            ),
+            *[
+                ScoreEntry(
+                    metric_id=self.metric.id,
+                    region_id=None,
+                    value=scan.id + offset,
+                    origin_ids=(scan.id,),
+                )
+                for scan in self.scans
+            ],
+        ]
+
+    def test_bulk_upsert_creates_scores(self):
+        scores = Score.objects.bulk_upsert(self.run, self.get_entries())
+        self.assertEqual(scores.count(), 3)
+        regional = scores.get(region=self.region)
+        self.assertEqual(regional.value, 1.5)
+        self.assertEqual(list(regional.origin.all()), self.scans[:1])
+
+    def test_bulk_upsert_is_idempotent(self):
+        first = Score.objects.bulk_upsert(self.run, self.get_entries())
+        first_ids = set(first.values_list("id", flat=True))
+        second = Score.objects.bulk_upsert(
+            self.run, self.get_entries(offset=1e-9)
+        )
+        self.assertEqual(set(second.values_list("id", flat=True)), first_ids)
+        self.assertEqual(Score.objects.filter(run=self.run).count(), 3)
+        regional = Score.objects.get(run=self.run, region=self.region)
+        self.assertAlmostEqual(regional.value, 1.5 + 1e-9)
+        Origin = Score.origin.through
+        self.assertEqual(Origin.objects.count(), 3)
+
+    def test_bulk_upsert_replaces_origins(self):
+        Score.objects.bulk_upsert(self.run, self.get_entries())
+        entry = ScoreEntry(
+            metric_id=self.metric.id,
+            region_id=self.region.id,
+            value=2,
+            origin_ids=(self.scans[1].id,),
+        )
+        Score.objects.bulk_upsert(self.run, [entry])
+        regional = Score.objects.get(run=self.run, region=self.region)
+        self.assertEqual(list(regional.origin.all()), self.scans[1:])
+
+
+class ScoreStandardizationTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        version = AnalysisVersionFactory()
+        region = RegionFactory()
+        volume = MetricFactory(title="Volume")
+        thickness = MetricFactory(title="Thickness")
+        # Metrics on very different scales.
+        values = {volume: [1000, 2000, 3000], thickness: [1, 2, 3]}
+        for metric, metric_values in values.items():
+            for value in metric_values:
+                run = RunFactory(analysis_version=version)
+                Score.objects.create(
+                    run=run, metric=metric, region=region, value=value
+                )
+
+    def test_standardize_by_metric_and_region(self):
+        queryset = Score.objects.standardize().order_by("metric", "value")
+        z_scores = [round(score.standardized, 6) for score in queryset]
+        expected = [-1.224745, 0, 1.224745]
+        self.assertEqual(z_scores, expected * 2)
+
+    def test_standardize_single_score_group(self):
+        score = Score.objects.filter(value=1).standardize().get()
+        self.assertIsNone(score.standardized)
+
+
+class ScoreStandardizationCovariatesTestCase(TestCase):
+    #: Score values and subjects' dates of birth by sex.
+    VALUES = {"F": [1, 2, 3], "M": [10, 20, 30]}
+    DATES_OF_BIRTH = {"F": date(1990, 1, 1), "M": date(1960, 1, 1)}
+
+    @classmethod
+    @factory.django.mute_signals(signals.post_save)
+    def setUpTestData(cls):
+        version = AnalysisVersionFactory()
+        metric = MetricFactory()
+        region = RegionFactory()
+        for sex, values in cls.VALUES.items():
+            for value in values:
+                subject = SubjectFactory(
+                    sex=sex, date_of_birth=cls.DATES_OF_BIRTH[sex]
+                )
+                scan = ScanFactory(session__subject=subject)
+                score = Score.objects.create(
+                    run=RunFactory(analysis_version=version),
+                    metric=metric,
+                    region=region,
+                    value=value,
+                )
+                score.origin.add(scan)
+
+    def assert_standardized_by_sex(self, queryset) -> None:
+        z_scores = [
+            round(score.standardized, 6)
+            for score in queryset.order_by("value")
+        ]
+        self.assertEqual(z_scores, [-1.224745, 0, 1.224745] * 2)
+
+    def test_standardize_by_covariate(self):
+        queryset = Score.objects.with_subject_sex().standardize(
+            covariates=[SEX_ANNOTATION]
+        )
+        self.assert_standardized_by_sex(queryset)
+
+    def test_standardize_by_age_bin(self):
+        # Subjects of different sexes also fall in different age bins.
+        queryset = Score.objects.standardize(age_bin_width=10)
+        self.assert_standardized_by_sex(queryset)
+
+    def test_standardize_without_covariates(self):
+        queryset = Score.objects.standardize().order_by("value")
+        self.assertEqual(len(queryset), 6)
+        self.assertLess(queryset[0].standardized, -0.5)
+        self.assertGreater(queryset[5].standardized, 1)
+
+
+class ScoreDataFrameTestCase(TestCase):
+    @classmethod
+    @factory.django.mute_signals(signals.post_save)
+    def setUpTestData(cls):
+        cls.run = RunFactory()
+        cls.metrics = [MetricFactory(title=title) for title in ("cjv", "snr")]
+        cls.region = RegionFactory()
+        cls.scan = ScanFactory()
+
+    def test_regional_scores_without_origin(self):
+        # Neither the origin nor the hemisphere are set.
+        entries = [
+            ScoreEntry(metric.id, self.region.id, value, ())
+            for value, metric in enumerate(self.metrics)
+        ]
+        Score.objects.bulk_upsert(self.run, entries)
+        df = Score.objects.to_dataframe()
+        self.assertEqual(
+            list(df.index.names),
+            ["Run ID", "Origin", "Atlas", "Hemisphere", "Region"],
+        )
+        self.assertEqual(list(df.columns), ["cjv", "snr"])
+        self.assertEqual(list(df.iloc[0]), [0, 1])
+
+    def test_mriqc_scores(self):
+        entries = [
+            ScoreEntry(metric.id, None, value, (self.scan.id,))
+            for value, metric in enumerate(self.metrics)
+        ]
+        Score.objects.bulk_upsert(self.run, entries)
+        df = Score.objects.to_dataframe()
+        self.assertEqual(list(df.index), [(self.run.id, self.scan.id)])
+        self.assertEqual(list(df.columns), ["cjv", "snr"])
+        self.assertEqual(list(df.iloc[0]), [0, 1])
@@ -0,0 +1,97 @@
+import factory
+import numpy as np
+from django.db.models import signals
+from django.test import TestCase
+from tests.factories import (
+    AtlasFactory,
+    MetricFactory,
+    RegionFactory,
+    RunFactory,
+    ScanFactory,
+)
+
+from django_mri.analysis.score.utils import ScoreEntry
+from django_mri.models import Region, ScoreVector
+
+
+class ScoreVectorTestCase(TestCase):
+    @classmethod
+    @factory.django.mute_signals(signals.post_save)
+    def setUpTestData(cls):
+        cls.run = RunFactory()
+        cls.metric = MetricFactory()
+        cls.atlas = AtlasFactory()
+        cls.regions = [
+            RegionFactory(atlas=cls.atlas, hemisphere="L", title=title)
+            for title in ("A", "B", "C")
+        ]
+        cls.scan = ScanFactory()
+
+    def get_entries(self, offset: float = 0):
+        # The second region is left without a score.
+        return [
+            ScoreEntry(
+                metric_id=self.metric.id,
+                region_id=region.id,
+                value=i + offset,
+                origin_ids=(self.scan.id,),
+            )
+            for i, region in enumerate(self.regions)
+            if i != 1
+        ]
+
+    def test_bulk_upsert_packs_values(self):
+        vectors = ScoreVector.objects.bulk_upsert(self.run, self.get_entries())
+        vector = vectors.get()
+        region_ids = [region.id for region in self.regions]
+        self.assertEqual(vector.region_ids, region_ids)
+        self.assertEqual(vector.values, [0, None, 2])
+        self.assertEqual(list(vector.origin.all()), [self.scan])
+
+    def test_bulk_upsert_is_idempotent(self):
+        ScoreVector.objects.bulk_upsert(self.run, self.get_entries())
+        ScoreVector.objects.bulk_upsert(self.run, self.get_entries(offset=1))
+        vector = ScoreVector.objects.get()
+        self.assertEqual(vector.values, [1, None, 3])
+
+    def test_bulk_upsert_replaces_origins(self):
+        ScoreVector.objects.bulk_upsert(self.run, self.get_entries())
+        scan = ScanFactory(session=self.scan.session, number=1)
+        entries = [
+            entry._replace(origin_ids=(scan.id,))
+            for entry in self.get_entries()
+        ]
+        vector = ScoreVector.objects.bulk_upsert(self.run, entries).get()
+        self.assertEqual(list(vector.origin.all()), [scan])
+
+    def test_to_array(self):
+        ScoreVector.objects.bulk_upsert(self.run, self.get_entries())
+        # Regions added later on extend existing vectors with NaN.
+        Region.objects.create(atlas=self.atlas, title="D")
+        array = ScoreVector.objects.all().to_array()
+        np.testing.assert_array_equal(array, [[0, np.nan, 2]])
+
+    def test_to_dataframe(self):
+        ScoreVector.objects.bulk_upsert(self.run, self.get_entries())
+        Region.objects.create(atlas=self.atlas, title="D")
+        df = ScoreVector.objects.all().to_dataframe()
+        self.assertEqual(df.index.tolist(), [(self.run.id, "Volume")])
+        self.assertEqual(
+            df.columns.get_level_values("Region").tolist(),
+            ["A", "B", "C", "D"],
+        )
+        np.testing.assert_array_equal(df.values, [[0, np.nan, 2, np.nan]])
+
+    def test_deleted_region_is_dropped(self):
+        ScoreVector.objects.bulk_upsert(self.run, self.get_entries())
+        Region.objects.filter(id=self.regions[0].id).delete()
+        vector = ScoreVector.objects.get()
+        np.testing.assert_array_equal(vector.to_series().values, [np.nan, 2])
+        np.testing.assert_array_equal(
+            ScoreVector.objects.all().to_array(), [[np.nan, 2]]
+        )
+        df = ScoreVector.objects.all().to_dataframe()
+        self.assertEqual(
+            df.columns.get_level_values("Region").tolist(), ["B", "C"]
+        )
+        np.testing.assert_array_equal(df.values, [[np.nan, 2]])
@@ -1,7 +1,42 @@
-from django.test import TestCase
+import os
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+import nibabel as nib
+import numpy as np
+import pandas as pd
+import pytz
+from django.test import TestCase, override_settings
+from tests.factories import RunFactory
 
 from django_analyses.models import Analysis, Pipeline
 from django_mri.analysis.analysis_definitions import analysis_definitions
+from django_mri.analysis.atlas.regional_stats import (
+    compute_regional_statistics,
+    get_regional_scores,
+    load_label_map,
+)
+from django_mri.analysis.parsers import cache
+from django_mri.analysis.parsers.cache import (
+    get_output_fingerprint,
+    load_parsed_output,
+    load_parsed_outputs,
+)
+from django_mri.analysis.parsers.recon_all import (
+    ReconAllOutputParser,
+    ReconAllStats,
+)
+from django_mri.analysis.score import mriqc
+from django_mri.analysis.score.mriqc import get_mriqc_scores, get_origin_map
+from django_mri.analysis.score.utils import (
+    get_atlas_map,
+    get_metric_map,
+    get_region_map,
+)
+from django_mri.models import Atlas, Metric, Region, Scan, Session
 from django_mri.models.nifti import NIfTI
 
 CREATION_FAILURE_MESSAGE = (
@@ -33,3 +68,284 @@ class AnalysesTestCase(TestCase):
             self.fail(message)
         else:
             self.assertIsInstance(pipelines, list)
+
+
+SURFACE_STATS = (
+    "# ColHeaders StructName NumVert SurfArea GrayVol ThickAvg ThickStd "
+    "MeanCurv GausCurv FoldInd CurvInd\n"
+    """bankssts 1380 905 2275 2.633 0.443 0.108 0.020 9 1.1
+banks_and_sts 1500 910 2375 2.633 0.443 0.108 0.020 9 1.1
+"""
+)
+SEGMENTATION_STATS = (
+    "# ColHeaders Index SegId NVoxels Volume_mm3 StructName normMean "
+    "normStdDev normMin normMax normRange\n"
+    "  1   4  6563  6563.3  Left-Lateral-Ventricle  36.3  12.9  13.0  86.0  "
+    "73.0\n"
+    "  2  14   800   800.1  3rd-Ventricle           46.4  12.0  15.0  89.0  "
+    "74.0\n"
+)
+
+
+class ReconAllStatsTestCase(TestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.root = Path(temp_dir.name)
+        for subject in ("1", "2"):
+            stats_dir = self.root / subject / ReconAllOutputParser.STATS_DIR
+            stats_dir.mkdir(parents=True)
+            (stats_dir / "lh.aparc.stats").write_text(SURFACE_STATS)
+            (stats_dir / "aseg.stats").write_text(SEGMENTATION_STATS)
+
+    def test_to_dataframe(self):
+        stats = ReconAllStats(self.root / "1" / "stats").to_dataframe()
+        self.assertEqual(len(stats), 4)
+        key = ("Desikan-Killiany", "Left", "banks&sts")
+        self.assertEqual(stats.loc[key, "Surface Area"], 910)
+        segmentation = stats.xs("Subcortical Segmentation", level="Atlas")
+        self.assertEqual(
+            segmentation.index.get_level_values("Hemisphere")[0], "Left"
+        )
+        self.assertTrue(pd.isna(segmentation["Surface Area"]).all())
+        self.assertEqual(segmentation["Volume"].tolist(), [6563.3, 800.1])
+
+    def test_extract_stats(self):
+        paths = [self.root / "1", self.root / "2"]
+        stats = ReconAllOutputParser.extract_stats(paths)
+        self.assertEqual(stats.index.names[0], "Subject ID")
+        self.assertEqual(len(stats), 8)
+
+
+class FakeRun:
+    """
+    Minimal stand-in for an analysis run with parsed JSON outputs.
+    """
+
+    def __init__(self, run_id: int, path: Path):
+        self.id = run_id
+        self.path = path
+        self.analysis_version = SimpleNamespace(
+            title="1.0", analysis=SimpleNamespace(title="MRIQC")
+        )
+        self.parse_count = 0
+
+    def parse_output(self) -> pd.DataFrame:
+        self.parse_count += 1
+        return pd.DataFrame(
+            {"snr": [len(list(self.path.glob("*.json")))]}, index=["sub-1"]
+        )
+
+
+class ParsedOutputCacheTestCase(TestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.root = Path(temp_dir.name)
+        settings = override_settings(
+            MRI_PARSED_OUTPUT_CACHE_ROOT=self.root / "cache"
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        run_path = self.root / "1"
+        run_path.mkdir()
+        (run_path / "sub-1.json").write_text("{}")
+        self.run = FakeRun(1, run_path)
+
+    def test_cached_output_is_reused(self):
+        first = load_parsed_output(self.run)
+        second = load_parsed_output(self.run)
+        self.assertEqual(self.run.parse_count, 1)
+        pd.testing.assert_frame_equal(first, second)
+
+    def test_changed_output_invalidates_cache(self):
+        load_parsed_output(self.run)
+        (self.run.path / "sub-2.json").write_text("{}")
+        df = load_parsed_output(self.run)
+        self.assertEqual(self.run.parse_count, 2)
+        self.assertEqual(df.loc["sub-1", "snr"], 2)
+        cached = list((self.root / "cache").glob("1-*.parquet"))
+        self.assertEqual(len(cached), 1)
+
+    def test_format_version_invalidates_cache(self):
+        fingerprint = get_output_fingerprint(self.run)
+        load_parsed_output(self.run)
+        version = cache.CACHE_FORMAT_VERSION + 1
+        with mock.patch.object(cache, "CACHE_FORMAT_VERSION", version):
+            self.assertNotEqual(get_output_fingerprint(self.run), fingerprint)
+            load_parsed_output(self.run)
+        self.assertEqual(self.run.parse_count, 2)
+
+    def test_load_parsed_outputs(self):
+        other_path = self.root / "2"
+        other_path.mkdir()
+        runs = [self.run, FakeRun(2, other_path)]
+        df = load_parsed_outputs(runs)
+        self.assertEqual(df.index.names[0], "Run ID")
+        self.assertEqual(df["snr"].tolist(), [1, 0])
+
+
+class RegionalStatisticsTestCase(TestCase):
+    LABELS = np.array([[[0, 1], [1, 1]], [[2, 2], [3, 0]]])
+    DATA = np.array([[[9.0, 1.0], [2.0, 6.0]], [[4.0, np.nan], [5.0, 7.0]]])
+
+    def test_compute_regional_statistics(self):
+        stats = compute_regional_statistics(
+            self.LABELS, self.DATA, voxel_volume=2.0
+        )
+        self.assertEqual(list(stats.index), [1, 2, 3])
+        self.assertEqual(list(stats["Intensity Mean"]), [3.0, 4.0, 5.0])
+        self.assertEqual(list(stats["Intensity Median"]), [2.0, 4.0, 5.0])
+        self.assertEqual(list(stats["Intensity Sum"]), [9.0, 4.0, 5.0])
+        self.assertEqual(list(stats["Volume"]), [6.0, 2.0, 2.0])
+        self.assertEqual(list(stats["Tissue Volume"]), [18.0, 8.0, 10.0])
+
+    def test_compute_regional_statistics_shape_mismatch(self):
+        with self.assertRaises(ValueError):
+            compute_regional_statistics(self.LABELS, self.DATA[0])
+
+    def test_get_regional_scores(self):
+        with tempfile.TemporaryDirectory() as media_root:
+            with override_settings(MEDIA_ROOT=media_root):
+                path = Path(media_root) / "labels.nii.gz"
+                affine = np.eye(4)
+                labels = nib.Nifti1Image(self.LABELS.astype(np.int16), affine)
+                nib.save(labels, str(path))
+                atlas = Atlas.objects.create(
+                    title="Atlas", symmetric=False, label_map=path.name
+                )
+                regions = {
+                    index: Region.objects.create(atlas=atlas, index=index)
+                    for index in (1, 2)
+                }
+                image = nib.Nifti1Image(self.DATA, affine)
+                entries = get_regional_scores(atlas, image, origin_ids=(1,))
+        self.assertEqual(len(entries), 10)
+        volume = Metric.objects.get(title="Volume")
+        volumes = {
+            entry.region_id: entry.value
+            for entry in entries
+            if entry.metric_id == volume.id
+        }
+        self.assertEqual(volumes, {regions[1].id: 3.0, regions[2].id: 1.0})
+
+
+    def test_replaced_label_map_is_reloaded(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "labels.nii.gz"
+            for value in (1, 2):
+                labels = np.full((2, 2, 2), value, dtype=np.int16)
+                nib.save(nib.Nifti1Image(labels, np.eye(4)), str(path))
+                # Ensure a distinct modification time on coarse filesystems.
+                mtime_ns = value * 10 ** 9
+                os.utime(path, ns=(mtime_ns, mtime_ns))
+                loaded, _ = load_label_map(str(path))
+                self.assertTrue((loaded == value).all())
+
+
+class ScoreUtilsTestCase(TestCase):
+    def test_get_metric_map(self):
+        existing = Metric.objects.create(title="Volume")
+        definitions = [
+            {"title": "Volume", "description": "Duplicate"},
+            {"title": "Thickness", "description": "Cortical thickness"},
+            {"title": "Area", "description": "Surface area"},
+        ]
+        with self.assertNumQueries(3):
+            metrics = get_metric_map(
+                ["Volume", "Thickness", "Missing"], definitions
+            )
+        self.assertEqual(set(metrics), {"Volume", "Thickness"})
+        self.assertEqual(metrics["Volume"], existing)
+        # Definitions are created even if their title was not requested.
+        self.assertTrue(Metric.objects.filter(title="Area").exists())
+        self.assertEqual(Metric.objects.filter(title="Volume").count(), 1)
+
+    def test_get_metric_map_without_definitions(self):
+        metric = Metric.objects.create(title="Volume")
+        metrics = get_metric_map(["Volume", "Missing"])
+        self.assertEqual(metrics, {"Volume": metric})
+        self.assertEqual(Metric.objects.count(), 1)
+
+    def test_get_atlas_map(self):
+        first = Atlas.objects.create(title="Destrieux")
+        Atlas.objects.create(title="Destrieux")
+        with self.assertNumQueries(2):
+            atlases = get_atlas_map(["Destrieux", "DKT", "DKT"])
+        self.assertEqual(atlases["Destrieux"], first)
+        self.assertEqual(atlases["DKT"].title, "DKT")
+        self.assertEqual(Atlas.objects.filter(title="DKT").count(), 1)
+
+    def test_get_region_map(self):
+        atlas = Atlas.objects.create(title="Atlas")
+        existing = Region.objects.create(
+            atlas=atlas, hemisphere="L", title="Insula"
+        )
+        keys = [
+            (atlas.id, "L", "Insula"),
+            (atlas.id, "R", "Insula"),
+            (atlas.id, None, "Thalamus"),
+        ]
+        subcortical = [(atlas.id, None, "Thalamus")]
+        with self.assertNumQueries(2):
+            regions = get_region_map(keys, subcortical=subcortical)
+        self.assertEqual(set(regions), set(keys))
+        self.assertEqual(regions[keys[0]], existing)
+        self.assertFalse(regions[keys[1]].subcortical)
+        self.assertTrue(regions[keys[2]].subcortical)
+        self.assertEqual(Region.objects.count(), 3)
+        # Existing regions are reused.
+        self.assertEqual(get_region_map(keys), regions)
+        self.assertEqual(Region.objects.count(), 3)
+
+
+class MriqcScoresTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        time = datetime(2020, 1, 10, tzinfo=pytz.UTC)
+        session = Session.objects.create(time=time)
+        cls.scans = {}
+        for stem, suffix in (("sub-1_T1w", ".nii.gz"), ("sub-2_T1w", ".nii")):
+            nifti = NIfTI.objects.create(path=f"/mriqc/{stem}{suffix}")
+            cls.scans[stem] = Scan.objects.create(
+                session=session, time=time, _nifti=nifti
+            )
+        # A NIfTI file without a scan is not a valid origin.
+        NIfTI.objects.create(path="/mriqc/sub-3_T1w.nii.gz")
+
+    def test_get_origin_map(self):
+        stems = ["sub-1_T1w", "sub-2_T1w", "sub-3_T1w", "sub-4_T1w"]
+        with self.assertNumQueries(1):
+            origins = get_origin_map(stems)
+        expected = {
+            "sub-1_T1w": self.scans["sub-1_T1w"].id,
+            "sub-2_T1w": self.scans["sub-2_T1w"].id,
+        }
+        self.assertEqual(origins, expected)
+
+    def test_get_mriqc_scores_skips_missing_origins(self):
+        df = pd.DataFrame(
+            {"snr": [1.0, 2.0], "unknown": [0.0, 0.0]},
+            index=["sub-1_T1w", "sub-3_T1w"],
+        )
+        with mock.patch.object(mriqc, "load_parsed_output", return_value=df):
+            with self.assertLogs(mriqc._logger, "WARNING") as logs:
+                entries = get_mriqc_scores(run=None)
+        snr = Metric.objects.get(title="snr")
+        scan_id = self.scans["sub-1_T1w"].id
+        self.assertEqual(len(entries), 1)
+        self.assertEqual(entries[0].metric_id, snr.id)
+        self.assertEqual(entries[0].value, 1.0)
+        self.assertEqual(entries[0].origin_ids, (scan_id,))
+        message = mriqc.MISSING_ORIGIN.format(nii_stem="sub-3_T1w")
+        self.assertIn(message, logs.output[0])
+
+    def test_create_mriqc_scores(self):
+        run = RunFactory()
+        df = pd.DataFrame({"snr": [1.0]}, index=["sub-1_T1w"])
+        with mock.patch.object(mriqc, "load_parsed_output", return_value=df):
+            scores = mriqc.create_mriqc_scores(run)
+        score = scores.get()
+        self.assertEqual(score.run, run)
+        self.assertEqual(score.value, 1.0)
+        self.assertEqual(list(score.origin.all()), [self.scans["sub-1_T1w"]])
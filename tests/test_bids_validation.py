@@ -0,0 +1,133 @@
+import json
+import tempfile
+from pathlib import Path
+
+from django.test import TestCase, override_settings
+
+from django_mri.models import BidsValidation, NIfTI
+from django_mri.utils.bids_validation import (
+    INVALID_NAME,
+    MISSING_KEY,
+    BidsValidator,
+)
+
+
+class BidsValidatorTestCase(TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.bids_dir = Path(self.temp_dir.name)
+        self.validator = BidsValidator(self.bids_dir)
+
+    def create_file(self, relative_path: str, sidecar: dict = None) -> Path:
+        path = self.bids_dir / relative_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.touch()
+        if sidecar is not None:
+            sidecar_path = path.with_name(path.name.split(".")[0] + ".json")
+            sidecar_path.write_text(json.dumps(sidecar))
+        return path
+
+    def test_validate_file(self):
+        path = self.create_file("sub-1/ses-1/anat/sub-1_ses-1_T1w.nii.gz")
+        self.assertEqual(self.validator.validate_file(path), [])
+
+    def test_validate_invalid_name(self):
+        path = self.create_file("sub-1/anat/T1w.nii.gz")
+        expected = [INVALID_NAME.format(name=path.name)]
+        self.assertEqual(self.validator.validate_file(path), expected)
+
+    def test_validate_missing_sidecar_key(self):
+        path = self.create_file(
+            "sub-1/func/sub-1_task-rest_bold.nii.gz",
+            sidecar={"TaskName": "rest"},
+        )
+        expected = [MISSING_KEY.format(key="RepetitionTime")]
+        self.assertEqual(self.validator.validate_file(path), expected)
+
+    def test_update_is_incremental(self):
+        self.create_file("sub-1/anat/sub-1_T1w.nii.gz")
+        self.create_file("sub-2/anat/sub-2_T1w.nii.gz")
+        self.assertEqual(self.validator.update(), 2)
+        self.assertEqual(self.validator.update(), 0)
+        self.assertFalse(BidsValidation.objects.filter_invalid().exists())
+
+    def test_update_removes_deleted_files(self):
+        path = self.create_file("sub-1/anat/sub-1_T1w.nii.gz")
+        self.validator.update()
+        path.unlink()
+        self.validator.update()
+        self.assertFalse(BidsValidation.objects.exists())
+
+    def test_invalidate_and_revalidate(self):
+        path = self.create_file(
+            "sub-1/func/sub-1_task-rest_bold.nii.gz",
+            sidecar={"TaskName": "rest"},
+        )
+        self.validator.update()
+        self.assertFalse(self.validator.is_subject_runnable("1"))
+        sidecar = {"TaskName": "rest", "RepetitionTime": 2}
+        path.with_name("sub-1_task-rest_bold.json").write_text(
+            json.dumps(sidecar)
+        )
+        self.validator.invalidate(path)
+        record = BidsValidation.objects.get(path=str(path))
+        self.assertTrue(record.is_stale)
+        self.assertEqual(self.validator.update_stale(), 1)
+        record.refresh_from_db()
+        self.assertFalse(record.is_stale)
+        self.assertTrue(record.is_valid)
+        self.assertTrue(self.validator.is_subject_runnable("1"))
+
+    def test_invalidate_many_ignores_files_outside_subjects(self):
+        inside = self.bids_dir / "sub-1" / "anat" / "sub-1_T1w.nii.gz"
+        outside = self.bids_dir / "derivatives" / "file.nii.gz"
+        n_flagged = self.validator.invalidate_many([inside, outside, inside])
+        self.assertEqual(n_flagged, 1)
+        self.assertEqual(BidsValidation.objects.get().subject, "1")
+
+    def test_remove_flags_fieldmaps(self):
+        anat = self.create_file("sub-1/anat/sub-1_T1w.nii.gz")
+        fmap = self.create_file(
+            "sub-1/fmap/sub-1_dir-AP_epi.nii.gz",
+            sidecar={
+                "PhaseEncodingDirection": "j",
+                "IntendedFor": "anat/sub-1_T1w.nii.gz",
+            },
+        )
+        self.validator.update()
+        self.assertTrue(BidsValidation.objects.get(path=str(fmap)).is_valid)
+        anat.unlink()
+        self.validator.remove(anat)
+        self.assertTrue(BidsValidation.objects.get(path=str(fmap)).is_stale)
+        self.validator.update_stale()
+        self.assertFalse(BidsValidation.objects.get(path=str(fmap)).is_valid)
+
+
+class BidsInvalidationSignalTestCase(TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        settings_override = override_settings(MRI_ROOT=self.temp_dir.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.bids_dir = BidsValidator().bids_dir
+
+    def test_nifti_save_is_deferred_and_batched(self):
+        paths = [
+            self.bids_dir / "sub-1" / "anat" / f"sub-1_run-{i}_T1w.nii.gz"
+            for i in range(3)
+        ]
+        with self.captureOnCommitCallbacks(execute=True):
+            for path in paths:
+                NIfTI.objects.create(path=path)
+            self.assertFalse(BidsValidation.objects.exists())
+        records = BidsValidation.objects.filter(is_stale=True)
+        self.assertEqual(records.count(), 3)
+
+    def test_nifti_outside_bids_dir_is_skipped(self):
+        path = Path(self.temp_dir.name, "other", "file.nii.gz")
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            NIfTI.objects.create(path=path)
+        self.assertEqual(len(callbacks), 0)
+        self.assertFalse(BidsValidation.objects.exists())
@@ -0,0 +1,84 @@
+import tempfile
+from datetime import date, datetime
+from pathlib import Path
+
+import pandas as pd
+import pytz
+from django.test import TestCase
+from tests.models import Subject
+
+from django_mri.models import Session
+from django_mri.utils.bids import BidsManager
+from django_mri.utils.demographics import (
+    AGE_ANNOTATION,
+    calculate_participant_ages,
+    get_participants_dataframe,
+)
+
+
+class DemographicsTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.subject = Subject.objects.create(
+            date_of_birth=date(1990, 1, 1), sex="F", dominant_hand="R"
+        )
+        cls.unknown = Subject.objects.create()
+        time = datetime(2020, 1, 1, tzinfo=pytz.UTC)
+        cls.session = Session.objects.create(subject=cls.subject, time=time)
+        cls.unknown_session = Session.objects.create(
+            subject=cls.unknown, time=time
+        )
+
+    def test_with_subject_age(self):
+        ages = dict(
+            Session.objects.with_subject_age().values_list(
+                "id", AGE_ANNOTATION
+            )
+        )
+        # 10,957 days between the dates of birth and acquisition.
+        self.assertAlmostEqual(ages[self.session.id], 10957 / 365.0)
+        self.assertIsNone(ages[self.unknown_session.id])
+
+    def test_to_dataframe_subject_age(self):
+        df = Session.objects.to_dataframe()
+        self.assertIn("Subject Age", df.columns)
+        self.assertAlmostEqual(
+            df.loc[self.session.id, "Subject Age"], 10957 / 365.0
+        )
+        unknown_age = df.loc[self.unknown_session.id, "Subject Age"]
+        self.assertTrue(pd.isna(unknown_age))
+
+    def test_calculate_participant_ages(self):
+        dates_of_birth = pd.Series(
+            [date(1990, 6, 2), date(1990, 6, 1), date(1920, 1, 1), None]
+        )
+        ages = calculate_participant_ages(dates_of_birth, date(2020, 6, 1))
+        self.assertEqual(list(ages), ["29", "30", "89+", "n/a"])
+
+    def test_get_participants_dataframe(self):
+        df = get_participants_dataframe(Subject.objects.all())
+        self.assertEqual(
+            list(df["participant_id"]),
+            [f"sub-{self.subject.id}", f"sub-{self.unknown.id}"],
+        )
+        self.assertEqual(list(df["handedness"]), ["r", "n/a"])
+        self.assertEqual(list(df["sex"]), ["F", "n/a"])
+        self.assertEqual(df["age"].iloc[1], "n/a")
+
+    def test_update_participants_tsv(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            bids_manager = BidsManager(Path(temp_dir))
+            subjects = Subject.objects.filter(id=self.subject.id)
+            bids_manager.update_participants_tsv(subjects)
+            # Existing participants are not added again.
+            df = bids_manager.update_participants_tsv(Subject.objects.all())
+            participants_tsv = Path(temp_dir, "participants.tsv")
+            written = pd.read_csv(
+                participants_tsv, sep="\t", keep_default_na=False
+            )
+            self.assertTrue(Path(temp_dir, "participants.json").is_file())
+        self.assertEqual(len(df), 2)
+        self.assertEqual(
+            list(written["participant_id"]), list(df["participant_id"])
+        )
+        self.assertEqual(list(written["sex"]), ["F", "n/a"])
@@ -0,0 +1,98 @@
+import json
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from django_mri.utils import derivatives, export
+from django_mri.utils.derivatives import DerivativesLayout
+
+
+class FakeAnalysisVersion(SimpleNamespace):
+    def __str__(self) -> str:
+        return f"{self.analysis.title} {self.title}"
+
+
+class FakeRun:
+    def __init__(self, run_id: int, title: str, path: Path) -> None:
+        self.id = run_id
+        self.path = path
+        self.analysis_version = FakeAnalysisVersion(
+            id=1, title="20.2.1", analysis=SimpleNamespace(title=title)
+        )
+        self.n_input_queries = 0
+
+    def get_input(self, key: str):
+        self.n_input_queries += 1
+        return ["1"]
+
+
+class DerivativesLayoutTestCase(TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        root = Path(self.temp_dir.name)
+        self.run_dir = root / "runs" / "1"
+        self.layout = DerivativesLayout(root / "derivatives")
+        self.run = FakeRun(1, "fMRIPrep", self.run_dir)
+        for relative_path in (
+            "fmriprep/sub-1/anat/sub-1_desc-brain_mask.nii.gz",
+            "fmriprep/sub-1.html",
+        ):
+            path = self.run_dir / relative_path
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(relative_path)
+
+    def test_get_destination(self):
+        analysis_dir = self.layout.root / "fmriprep_2021"
+        source = self.run_dir / "fmriprep/sub-1/anat/sub-1_desc-brain_mask.nii.gz"  # noqa: E501
+        expected = analysis_dir / "sub-1/anat/sub-1_desc-brain_mask.nii.gz"
+        destination = self.layout.get_destination(self.run, source)
+        self.assertEqual(destination, expected)
+        report = self.run_dir / "fmriprep/sub-1.html"
+        destination = self.layout.get_destination(self.run, report)
+        self.assertEqual(destination, analysis_dir / "sub-1.html")
+
+    def test_run_destination_is_memoized(self):
+        self.layout.get_destinations(self.run)
+        self.layout.get_destinations(self.run)
+        self.assertEqual(self.run.n_input_queries, 1)
+
+    def test_memoized_destination_expires(self):
+        self.layout.get_run_destination(self.run)
+        with mock.patch.object(derivatives, "DESTINATION_CACHE_TTL", 0):
+            self.layout.get_run_destination(self.run)
+        self.assertEqual(self.run.n_input_queries, 2)
+
+    def test_clear_cache(self):
+        self.layout.get_run_destination(self.run)
+        self.layout.clear_cache()
+        self.layout.get_run_destination(self.run)
+        self.assertEqual(self.run.n_input_queries, 2)
+
+    def test_unsupported_analysis_raises_value_error(self):
+        run = FakeRun(2, "Unknown", self.run_dir)
+        with self.assertRaises(ValueError):
+            self.layout.get_run_destination(run)
+
+    def test_export_runs(self):
+        exported = self.layout.export_runs([self.run])
+        self.assertEqual(len(exported), 2)
+        for path in exported:
+            self.assertTrue(path.is_file())
+        description_path = (
+            self.layout.root / "fmriprep_2021" / "dataset_description.json"
+        )
+        with open(description_path) as f:
+            description = json.load(f)
+        self.assertEqual(description["DatasetType"], "derivative")
+
+    def test_shared_layout_follows_settings(self):
+        layout = export.get_derivatives_layout()
+        self.assertIs(export.get_derivatives_layout(), layout)
+        with override_settings(MRI_ROOT=self.temp_dir.name):
+            other = export.get_derivatives_layout()
+        self.assertIsNot(other, layout)
+        self.assertEqual(other.root, Path(self.temp_dir.name, "derivatives"))
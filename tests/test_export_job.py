@@ -0,0 +1,169 @@
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+import factory
+from django.contrib.auth import get_user_model
+from django.db.models import signals
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from tests.factories import ScanFactory, SessionFactory
+from tests.models import Study
+
+from django_mri.models import ExportJob
+from django_mri.models.choices.export_status import ExportStatus
+from django_mri.tasks import build_export
+from django_mri.utils.archive import ArchiveEntry
+
+User = get_user_model()
+
+
+class ExportRootMixin:
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.root = Path(temp_dir.name)
+        settings = override_settings(MRI_EXPORT_ROOT=self.root / "exports")
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.data_path = self.root / "data.bin"
+        self.data_path.write_bytes(bytes(range(256)) * 16)
+
+    def create_archive(self, export_job: ExportJob) -> bytes:
+        export_job.path.parent.mkdir(parents=True, exist_ok=True)
+        export_job.path.write_bytes(self.data_path.read_bytes())
+        return export_job.path.read_bytes()
+
+
+class BuildExportTestCase(ExportRootMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.export_job = ExportJob.objects.create()
+        entries = [ArchiveEntry(name="data.bin", path=self.data_path)]
+        patcher = mock.patch.object(
+            ExportJob, "get_entries", return_value=entries
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_build_export(self):
+        with mock.patch.object(
+            ExportJob,
+            "update_progress",
+            autospec=True,
+            side_effect=ExportJob.update_progress,
+        ) as update_progress:
+            path = build_export(self.export_job.id)
+        update_progress.assert_called()
+        self.export_job.refresh_from_db()
+        self.assertEqual(self.export_job.status, ExportStatus.DONE.name)
+        self.assertEqual(self.export_job.progress, 1)
+        self.assertEqual(path, str(self.export_job.path))
+        self.assertEqual(self.export_job.size, Path(path).stat().st_size)
+
+    def test_failed_export(self):
+        ExportJob.get_entries.side_effect = RuntimeError("Missing file")
+        with self.assertRaises(RuntimeError):
+            build_export(self.export_job.id)
+        self.export_job.refresh_from_db()
+        self.assertEqual(self.export_job.status, ExportStatus.FAILED.name)
+        self.assertEqual(self.export_job.error, "Missing file")
+
+    def test_delete_removes_file(self):
+        self.create_archive(self.export_job)
+        path = self.export_job.path
+        self.export_job.delete()
+        self.assertFalse(path.exists())
+
+
+class ExportJobViewTestCase(ExportRootMixin, APITestCase):
+    @classmethod
+    @factory.django.mute_signals(signals.post_save, signals.m2m_changed)
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user(
+            username="staff", password="pass", is_staff=True
+        )
+        cls.user = User.objects.create_user(username="test", password="pass")
+        study = Study.objects.create(title="Study")
+        study.collaborators.add(cls.user)
+        group = study.group_set.create(title="Group")
+        session = SessionFactory()
+        cls.session_scans = [
+            ScanFactory(session=session, number=number)
+            for number in range(2)
+        ]
+        cls.session_scans[0].study_groups.add(group)
+        cls.other_scan = ScanFactory()
+
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch("django_mri.views.export_job.build_export")
+        self.build_export = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_create_from_sessions(self):
+        self.client.force_authenticate(self.staff)
+        data = {"sessions": [self.session_scans[0].session_id]}
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse("mri:exportjob-list"), data, format="json"
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        expected = [scan.id for scan in self.session_scans]
+        self.assertEqual(sorted(response.data["scans"]), expected)
+        self.build_export.delay.assert_called_once_with(response.data["id"])
+
+    def test_create_by_collaborator(self):
+        self.client.force_authenticate(self.user)
+        data = {"scans": [self.session_scans[0].id]}
+        response = self.client.post(
+            reverse("mri:exportjob-list"), data, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_create_by_non_collaborator_is_denied(self):
+        self.client.force_authenticate(self.user)
+        data = {"scans": [self.session_scans[0].id, self.other_scan.id]}
+        response = self.client.post(
+            reverse("mri:exportjob-list"), data, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertIn(str(self.other_scan.id), response.data["detail"])
+        self.assertFalse(ExportJob.objects.exists())
+
+    def test_download_before_done(self):
+        export_job = ExportJob.objects.create(user=self.user)
+        self.client.force_authenticate(self.user)
+        url = reverse("mri:exportjob-download", args=(export_job.id,))
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+
+    def test_resume_download(self):
+        export_job = ExportJob.objects.create(
+            user=self.user, status=ExportStatus.DONE.name
+        )
+        content = self.create_archive(export_job)
+        self.client.force_authenticate(self.user)
+        url = reverse("mri:exportjob-download", args=(export_job.id,))
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response["ETag"]
+        response = self.client.get(
+            url, HTTP_RANGE="bytes=100-199", HTTP_IF_RANGE=etag
+        )
+        self.assertEqual(
+            response.status_code, status.HTTP_206_PARTIAL_CONTENT
+        )
+        self.assertEqual(
+            response["Content-Range"], f"bytes 100-199/{len(content)}"
+        )
+        partial_content = b"".join(response.streaming_content)
+        self.assertEqual(partial_content, content[100:200])
+        # A stale validator results in the full file.
+        response = self.client.get(
+            url, HTTP_RANGE="bytes=100-199", HTTP_IF_RANGE='"stale"'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(b"".join(response.streaming_content), content)
@@ -0,0 +1,162 @@
+"""
+Query count regression tests, making sure list endpoints execute a fixed
+number of queries regardless of the number of returned instances.
+"""
+from datetime import datetime, timedelta
+
+import factory
+import pytz
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.models import signals
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from tests.models import Group, MeasurementDefinition, Study, Subject
+
+from django_mri.models import Scan, Session
+
+User = get_user_model()
+
+#: Number of scans created for each session.
+SCANS_PER_SESSION: int = 3
+
+
+class ListQueryCountTestCase(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_superuser(
+            username="test", password="pass", email="test@example.com"
+        )
+        study = Study.objects.create(title="Study")
+        cls.groups = [
+            Group.objects.create(title=f"Group {i}", study=study)
+            for i in range(2)
+        ]
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    @factory.django.mute_signals(signals.post_save)
+    def create_sessions(self, n: int) -> None:
+        time = datetime(2020, 1, 1, tzinfo=pytz.UTC)
+        for i in range(n):
+            subject = Subject.objects.create(
+                id_number=f"{Subject.objects.count()}"
+            )
+            session = Session.objects.create(
+                subject=subject, time=time + timedelta(days=i)
+            )
+            for number in range(SCANS_PER_SESSION):
+                scan = Scan.objects.create(
+                    session=session, number=number, time=session.time
+                )
+                scan.study_groups.set(self.groups)
+
+    def count_queries(self, url: str) -> int:
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(context)
+
+    def assert_constant_query_count(self, url: str) -> None:
+        self.create_sessions(2)
+        n_queries = self.count_queries(url)
+        self.create_sessions(10)
+        self.assertEqual(self.count_queries(url), n_queries)
+
+    def test_scan_list_query_count(self):
+        self.assert_constant_query_count(reverse("mri:scan-list"))
+
+    def test_session_list_query_count(self):
+        self.assert_constant_query_count(reverse("mri:session-list"))
+
+    def test_session_list_cursor_pagination(self):
+        self.create_sessions(7)
+        url = reverse("mri:session-list") + "?cursor=&page_size=3"
+        ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            ids += [session["id"] for session in response.data["results"]]
+            url = response.data["next"]
+        expected = Session.objects.order_by("-time", "id")
+        self.assertListEqual(ids, list(expected.values_list("id", flat=True)))
+
+    def test_cursor_pagination_with_ordering_is_rejected(self):
+        self.create_sessions(1)
+        url = reverse("mri:session-list")
+        response = self.client.get(url, {"cursor": "", "ordering": "id"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("ordering", response.data)
+
+    def test_unchanged_list_is_not_modified(self):
+        self.create_sessions(2)
+        url = reverse("mri:session-list")
+        etag = self.client.get(url)["ETag"]
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(len(context), 1)
+        self.create_sessions(1)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def assert_list_modified(
+        self, change, url_name: str = "mri:session-list"
+    ) -> None:
+        self.create_sessions(1)
+        url = reverse(url_name)
+        etag = self.client.get(url)["ETag"]
+        change()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_scan_change_modifies_session_list(self):
+        def change():
+            scan = Scan.objects.first()
+            scan.description = "Changed"
+            scan.save()
+
+        self.assert_list_modified(change)
+
+    def test_scan_study_groups_change_modifies_session_list(self):
+        def change():
+            Scan.objects.first().study_groups.remove(self.groups[0])
+
+        self.assert_list_modified(change)
+
+    def test_group_scans_change_modifies_session_list(self):
+        self.assert_list_modified(self.groups[1].mri_scan_set.clear)
+
+    def test_embedded_model_change_modifies_lists(self):
+        def rename(instance):
+            instance.title = "Changed"
+            instance.save()
+
+        def change_subject():
+            subject = Subject.objects.first()
+            subject.first_name = "Changed"
+            subject.save()
+
+        changes = {
+            "subject": change_subject,
+            "group": lambda: rename(self.groups[0]),
+            "study": lambda: rename(self.groups[0].study),
+        }
+        for url_name in ("mri:session-list", "mri:scan-list"):
+            for model, change in changes.items():
+                with self.subTest(url_name=url_name, model=model):
+                    self.assert_list_modified(change, url_name)
+
+    def test_measurement_change_modifies_session_list(self):
+        measurement = MeasurementDefinition.objects.create(title="MRI")
+
+        def change():
+            measurement.title = "Changed"
+            measurement.save()
+
+        self.create_sessions(1)
+        Session.objects.update(measurement=measurement)
+        self.assert_list_modified(change)
@@ -0,0 +1,148 @@
+import struct
+import tempfile
+import zlib
+from pathlib import Path
+from unittest import mock
+
+import nibabel as nib
+import numpy as np
+from django.test import TestCase
+
+from django_mri.utils import slices
+from django_mri.utils.slices import (
+    MIN_VOLUME_STRIDE,
+    PNG_SIGNATURE,
+    RAW,
+    LRUCache,
+    SliceRenderer,
+    Tile,
+    encode_png,
+    get_cached_tile,
+    get_etag,
+)
+
+
+class EncodePngTestCase(TestCase):
+    def test_encode_png(self):
+        array = np.arange(12, dtype=np.uint8).reshape(3, 4)
+        data = encode_png(array)
+        self.assertTrue(data.startswith(PNG_SIGNATURE))
+        width, height = struct.unpack(">II", data[16:24])
+        self.assertEqual((height, width), array.shape)
+        # IDAT follows the signature (8 bytes) and IHDR chunk (25 bytes).
+        length = struct.unpack(">I", data[33:37])[0]
+        self.assertEqual(data[37:41], b"IDAT")
+        rows = zlib.decompress(data[41:41 + length])
+        rows = np.frombuffer(rows, dtype=np.uint8).reshape(3, 5)
+        self.assertTrue((rows[:, 0] == 0).all())
+        np.testing.assert_array_equal(rows[:, 1:], array)
+        self.assertTrue(data.endswith(b"IEND\xaeB`\x82"))
+
+
+class LRUCacheTestCase(TestCase):
+    def test_max_entries(self):
+        cache = LRUCache(2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.get("c"), 3)
+
+    def test_max_bytes(self):
+        cache = LRUCache(10, get_size=len)
+        cache.set("a", b"1234")
+        cache.set("b", b"1234")
+        cache.set("c", b"1234")
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.size, 8)
+        # Replacing a value updates the total size.
+        cache.set("b", b"12")
+        self.assertEqual(cache.size, 6)
+        cache.clear()
+        self.assertEqual(cache.size, 0)
+
+    def test_value_larger_than_cache_is_skipped(self):
+        cache = LRUCache(10, get_size=len)
+        cache.set("a", b"1234")
+        cache.set("b", b"x" * 11)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), b"1234")
+        self.assertEqual(cache.size, 4)
+
+
+class SliceRendererTestCase(TestCase):
+    SHAPE = (8, 6, 4)
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.path = Path(self.temp_dir.name, "image.nii.gz")
+        data = np.arange(np.prod(self.SHAPE), dtype=np.float32)
+        image = nib.Nifti1Image(data.reshape(self.SHAPE), np.eye(4))
+        nib.save(image, str(self.path))
+        self.renderer = SliceRenderer(self.path)
+        self.addCleanup(slices._tiles.clear)
+        self.addCleanup(slices._windows.clear)
+
+    def test_render_slice(self):
+        tile = self.renderer.render_slice("axial", 1, tile_format=RAW)
+        # Slices are rotated from voxel order to display order.
+        self.assertEqual(tile.shape, (6, 8))
+        self.assertEqual(len(tile.data), 6 * 8)
+        png = self.renderer.render_slice("sagittal", 0, vmin=0, vmax=1)
+        self.assertEqual(png.shape, (4, 6))
+        self.assertEqual(png.content_type, "image/png")
+
+    def test_render_slice_invalid_parameters(self):
+        with self.assertRaises(ValueError):
+            self.renderer.render_slice("oblique", 0)
+        with self.assertRaises(ValueError):
+            self.renderer.render_slice("axial", self.SHAPE[2])
+        with self.assertRaises(ValueError):
+            self.renderer.render_slice("axial", 0, volume=1)
+        with self.assertRaises(ValueError):
+            self.renderer.render_slice("axial", 0, tile_format="jpeg")
+
+    def test_render_volume(self):
+        tile = self.renderer.render_volume(stride=MIN_VOLUME_STRIDE)
+        self.assertEqual(tile.tile_format, RAW)
+        self.assertEqual(tile.shape, (4, 3, 2))
+        self.assertEqual(len(tile.data), 4 * 3 * 2)
+
+    def test_render_volume_minimal_stride(self):
+        with self.assertRaises(ValueError):
+            self.renderer.render_volume(stride=MIN_VOLUME_STRIDE - 1)
+
+    def test_etag_changes_with_file_and_parameters(self):
+        etag = get_etag(self.path, "axial", 0)
+        self.assertEqual(etag, get_etag(self.path, "axial", 0))
+        self.assertNotEqual(etag, get_etag(self.path, "axial", 1))
+        self.path.write_bytes(self.path.read_bytes() + b"\0")
+        self.assertNotEqual(etag, get_etag(self.path, "axial", 0))
+
+    def test_etag_of_missing_file(self):
+        with self.assertRaises(FileNotFoundError):
+            get_etag(Path(self.temp_dir.name, "missing.nii.gz"))
+
+    def test_get_cached_tile(self):
+        render = mock.Mock(wraps=self.renderer.render_slice)
+        etag = get_etag(self.path, "axial", 0)
+        tile = get_cached_tile(etag, render, "axial", 0)
+        self.assertIs(get_cached_tile(etag, render, "axial", 0), tile)
+        render.assert_called_once_with("axial", 0)
+
+    def test_get_cached_tile_from_disk(self):
+        tile = Tile(data=b"\x00\x01", shape=(1, 2), tile_format=RAW)
+        render = mock.Mock(return_value=tile)
+        cache_dir = Path(self.temp_dir.name, "tiles")
+        with mock.patch.object(
+            slices, "get_tile_cache_dir", return_value=cache_dir
+        ):
+            get_cached_tile('"etag"', render)
+            slices._tiles.clear()
+            cached = get_cached_tile('"etag"', render)
+        render.assert_called_once()
+        self.assertEqual(cached, tile)
+        self.assertTrue(Path(cache_dir, "etag").is_file())
@@ -1,10 +1,36 @@
+import io
+import json
+import os
+import tarfile
+import tempfile
+import zipfile
 from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
 
+import pyarrow as pa
+import pyarrow.parquet as pq
 from django.conf import settings
-from django.test import TestCase
+from django.db import IntegrityError
+from django.test import RequestFactory, TestCase, override_settings
 
 import django_mri.utils.utils as utils
+from django_mri.analysis.interfaces.dcm2niix import Dcm2niix
+from django_mri.models import NIfTI, Scan, Session
+from django_mri.utils.archive import ArchiveEntry, ArchiveStream
+from django_mri.utils.bids_export import BidsExporter
+from django_mri.utils.demographics import AGE_ANNOTATION
+from django_mri.utils.staging import (
+    get_staging_root,
+    publish_files,
+    staging_directory,
+    unpublish_files,
+)
+from django_mri.utils.tables import get_arrow_schema, iter_csv, iter_parquet
+from django_mri.views.utils import file_response, parse_range_header
 
+from .factories import ACQUISITION_TIME
+from .fixtures import NIFTI_TEST_FILE_PATH
 from .models import Group, Subject
 
 
@@ -26,3 +52,275 @@ class UtilsTestCase(TestCase):
         expected = Path(settings.MEDIA_ROOT, "MRI", "DICOM")
         result = utils.get_dicom_root()
         self.assertEqual(result, expected)
+
+
+class ArchiveStreamTestCase(TestCase):
+    def setUp(self):
+        self.nii_path = Path(NIFTI_TEST_FILE_PATH)
+        self.entries = [
+            ArchiveEntry(
+                name="sub-1/anat/sub-1_T1w.nii.gz", path=self.nii_path
+            ),
+            ArchiveEntry(name="participants.tsv", content=b"participant_id\n"),
+        ]
+
+    def test_zip_stream(self):
+        stream = ArchiveStream(self.entries, chunk_size=1024)
+        with zipfile.ZipFile(io.BytesIO(b"".join(stream))) as archive:
+            nii_info = archive.getinfo("sub-1/anat/sub-1_T1w.nii.gz")
+            self.assertEqual(nii_info.compress_type, zipfile.ZIP_STORED)
+            self.assertEqual(
+                archive.read(nii_info), self.nii_path.read_bytes()
+            )
+            self.assertEqual(
+                archive.read("participants.tsv"), b"participant_id\n"
+            )
+
+    def test_zip_stream_stored_entries(self):
+        entries = [
+            ArchiveEntry(name="1.dcm", content=b"0" * 1024, stored=True),
+            ArchiveEntry(name="2.txt", content=b"0" * 1024),
+        ]
+        stream = ArchiveStream(entries)
+        with zipfile.ZipFile(io.BytesIO(b"".join(stream))) as archive:
+            stored_info = archive.getinfo("1.dcm")
+            self.assertEqual(stored_info.compress_type, zipfile.ZIP_STORED)
+            deflated_info = archive.getinfo("2.txt")
+            self.assertEqual(
+                deflated_info.compress_type, zipfile.ZIP_DEFLATED
+            )
+            self.assertEqual(archive.read("1.dcm"), b"0" * 1024)
+
+    def test_tar_stream(self):
+        stream = ArchiveStream(self.entries, archive_format="tar")
+        with tarfile.open(fileobj=io.BytesIO(b"".join(stream))) as archive:
+            content = archive.extractfile("sub-1/anat/sub-1_T1w.nii.gz").read()
+            self.assertEqual(content, self.nii_path.read_bytes())
+
+    def test_invalid_archive_format_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            ArchiveStream(self.entries, archive_format="rar")
+
+    def test_progress(self):
+        stream = ArchiveStream(self.entries)
+        self.assertEqual(stream.progress, 0)
+        b"".join(stream)
+        self.assertEqual(stream.progress, 1)
+
+
+class RangeHeaderTestCase(TestCase):
+    def test_parse_range(self):
+        self.assertEqual(parse_range_header("bytes=0-99", 1000), (0, 99))
+        self.assertEqual(parse_range_header("bytes=500-", 1000), (500, 999))
+        self.assertEqual(parse_range_header("bytes=-100", 1000), (900, 999))
+        self.assertEqual(
+            parse_range_header("bytes=900-2000", 1000), (900, 999)
+        )
+
+    def test_malformed_range_is_ignored(self):
+        self.assertIsNone(parse_range_header("bytes=0-1,5-10", 1000))
+        self.assertIsNone(parse_range_header("items=0-1", 1000))
+
+    def test_unsatisfiable_range_raises_value_error(self):
+        with self.assertRaises(ValueError):
+            parse_range_header("bytes=1000-", 1000)
+
+    def test_empty_file_range_raises_value_error(self):
+        for header in ("bytes=-100", "bytes=0-", "bytes=0-0"):
+            with self.assertRaises(ValueError):
+                parse_range_header(header, 0)
+
+
+class FileResponseTestCase(TestCase):
+    def setUp(self):
+        self.path = Path(NIFTI_TEST_FILE_PATH)
+        self.factory = RequestFactory()
+
+    def test_range_request(self):
+        request = self.factory.get("/", HTTP_RANGE="bytes=0-99")
+        response = file_response(request, self.path)
+        self.assertEqual(response.status_code, 206)
+        content = b"".join(response.streaming_content)
+        self.assertEqual(content, self.path.read_bytes()[:100])
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+
+    def test_not_modified(self):
+        response = file_response(self.factory.get("/"), self.path)
+        etag = response["ETag"]
+        request = self.factory.get("/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(file_response(request, self.path).status_code, 304)
+
+    def test_if_range_mismatch_returns_full_content(self):
+        request = self.factory.get(
+            "/", HTTP_RANGE="bytes=0-99", HTTP_IF_RANGE='"outdated"'
+        )
+        self.assertEqual(file_response(request, self.path).status_code, 200)
+
+    def test_empty_file_suffix_range(self):
+        with tempfile.NamedTemporaryFile() as f:
+            request = self.factory.get("/", HTTP_RANGE="bytes=-100")
+            response = file_response(request, Path(f.name))
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], "bytes */0")
+
+
+class TableStreamTestCase(TestCase):
+    COLUMNS = ["ID", "Origin", "Score"]
+    ROWS = [(1, [3], 0.5), (2, [3, 4], None), (3, [], 1.5)]
+
+    def test_csv_stream(self):
+        chunks = list(iter_csv(self.ROWS, self.COLUMNS, chunk_size=2))
+        self.assertEqual(len(chunks), 2)
+        content = b"".join(chunks).decode()
+        expected = "ID,Origin,Score\r\n1,3,0.5\r\n2,3;4,\r\n3,,1.5\r\n"
+        self.assertEqual(content, expected)
+
+    def test_empty_csv_stream(self):
+        content = b"".join(iter_csv([], self.COLUMNS))
+        self.assertEqual(content, b"ID,Origin,Score\r\n")
+
+    def test_parquet_stream(self):
+        content = b"".join(iter_parquet(self.ROWS, self.COLUMNS, 2))
+        table = pq.read_table(io.BytesIO(content))
+        self.assertEqual(table.column_names, self.COLUMNS)
+        self.assertEqual(table.column("ID").to_pylist(), [1, 2, 3])
+        self.assertEqual(table.column("Origin").to_pylist()[1], [3, 4])
+
+    def test_parquet_stream_with_null_first_chunk(self):
+        schema = pa.schema(
+            [
+                ("ID", pa.int64()),
+                ("Origin", pa.list_(pa.int64())),
+                ("Score", pa.float64()),
+            ]
+        )
+        rows = [(None, None, None), *self.ROWS]
+        content = b"".join(
+            iter_parquet(rows, self.COLUMNS, chunk_size=1, schema=schema)
+        )
+        table = pq.read_table(io.BytesIO(content))
+        self.assertEqual(table.schema, schema)
+        self.assertEqual(table.column("ID").to_pylist(), [None, 1, 2, 3])
+        self.assertEqual(table.column("Score").to_pylist()[-1], 1.5)
+
+    def test_get_arrow_schema(self):
+        fields = ["id", "time", "subject__id_number", "irb", AGE_ANNOTATION]
+        columns = ["ID", "Time", "Subject ID", "IRB", "Age"]
+        queryset = Session.objects.get_table_rows(fields)
+        schema = get_arrow_schema(queryset, fields, columns)
+        self.assertEqual(schema.names, columns)
+        expected_types = [
+            pa.int64(),
+            pa.timestamp("us", tz="UTC" if settings.USE_TZ else None),
+            pa.string(),
+            pa.int64(),
+            pa.float64(),
+        ]
+        self.assertEqual(schema.types, expected_types)
+
+
+class StagingTestCase(TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name)
+        self.destination = self.root / "MRI" / "outputs"
+        settings_override = override_settings(MRI_ROOT=self.root / "MRI")
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.addCleanup(self.temp_dir.cleanup)
+
+    def stage(self, staging_dir: Path, *names: str):
+        for name in names:
+            (staging_dir / name).write_text(name)
+
+    def test_staging_directory_is_removed(self):
+        with staging_directory() as staging_dir:
+            self.assertEqual(staging_dir.parent, get_staging_root())
+            self.stage(staging_dir, "a.nii.gz")
+        self.assertFalse(staging_dir.exists())
+
+    def test_publish_files_hardlinks_into_place(self):
+        with staging_directory() as staging_dir:
+            self.stage(staging_dir, "a.json", "a.nii.gz")
+            source_inode = os.stat(staging_dir / "a.nii.gz").st_ino
+            published = publish_files(staging_dir, self.destination)
+            self.assertEqual(list(staging_dir.iterdir()), [])
+        self.assertEqual(
+            published,
+            [self.destination / "a.json", self.destination / "a.nii.gz"],
+        )
+        path = self.destination / "a.nii.gz"
+        self.assertEqual(path.read_text(), "a.nii.gz")
+        self.assertEqual(os.stat(path).st_ino, source_inode)
+
+    def test_publish_collision_rolls_back(self):
+        self.destination.mkdir(parents=True)
+        existing = self.destination / "b.nii.gz"
+        existing.write_text("existing")
+        with staging_directory() as staging_dir:
+            self.stage(staging_dir, "a.json", "b.nii.gz")
+            with self.assertRaises(IntegrityError):
+                publish_files(staging_dir, self.destination)
+        # The file published before the collision is removed again and the
+        # existing file is left untouched.
+        self.assertEqual(list(self.destination.iterdir()), [existing])
+        self.assertEqual(existing.read_text(), "existing")
+
+    def test_unpublish_after_database_failure(self):
+        staging_dirs = []
+
+        def convert(dicom_path, destination, **kwargs):
+            staging_dirs.append(destination.parent)
+            self.stage(destination.parent, "a.json", "a.nii.gz")
+            return destination.parent / "a.nii.gz"
+
+        scan = Scan()
+        dicom = SimpleNamespace(path=self.root / "dicom")
+        failure = IntegrityError("Simulated database failure")
+        with mock.patch.object(Scan, "dicom", dicom), mock.patch.object(
+            Dcm2niix, "convert", side_effect=convert
+        ), mock.patch("django_mri.models.scan.NIfTI") as nifti_model:
+            nifti_model.objects.create.side_effect = failure
+            with self.assertRaises(IntegrityError):
+                scan._convert_and_publish(self.destination / "a")
+        nifti_model.objects.create.assert_called_once()
+        self.assertIsNone(scan._nifti)
+        self.assertEqual(list(self.destination.iterdir()), [])
+        self.assertFalse(staging_dirs[0].exists())
+        # Unpublishing is idempotent.
+        unpublish_files([self.destination / "a.nii.gz"])
+
+
+class BidsExporterTestCase(TestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.root = Path(temp_dir.name)
+        self.bids_dir = self.root / "NIfTI"
+        subject = Subject.objects.create(sex="F")
+        time = ACQUISITION_TIME
+        session = Session.objects.create(subject=subject, time=time)
+        anat_dir = self.bids_dir / f"sub-{subject.id}" / "anat"
+        bids_path = anat_dir / f"sub-{subject.id}_T1w.nii.gz"
+        outside_path = self.root / "other" / "T2w.nii.gz"
+        for number, path in enumerate((bids_path, outside_path)):
+            path.parent.mkdir(parents=True)
+            path.write_bytes(path.name.encode())
+            nifti = NIfTI.objects.create(path=path, is_raw=True)
+            Scan.objects.create(
+                session=session, number=number, time=time, _nifti=nifti
+            )
+        self.bids_name = bids_path.relative_to(self.bids_dir).as_posix()
+        self.subject = subject
+
+    def test_write(self):
+        exporter = BidsExporter(Scan.objects.all(), bids_dir=self.bids_dir)
+        path = exporter.write(self.root / "bids.zip")
+        with zipfile.ZipFile(path) as archive:
+            names = archive.namelist()
+            participants = archive.read("participants.tsv").decode()
+            description = archive.read("dataset_description.json")
+        self.assertIn(self.bids_name, names)
+        self.assertNotIn("T2w.nii.gz", " ".join(names))
+        self.assertIn(f"sub-{self.subject.id}", participants)
+        self.assertIn("Name", json.loads(description))
@@ -1,7 +1,14 @@
+import csv
+import io
+import shutil
 import sys
+import tempfile
+import zipfile
 from datetime import datetime
+from pathlib import Path
 
 import factory
+import pyarrow.parquet as pq
 import pytz
 from django.contrib.auth import get_user_model
 from django.db.models import signals
@@ -9,12 +16,24 @@ from django.test import TestCase
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
-from tests.fixtures import SIEMENS_DWI_SERIES_PATH
-from tests.models import Subject
+from tests.factories import MetricFactory, RunFactory
+from tests.fixtures import NIFTI_TEST_FILE_PATH, SIEMENS_DWI_SERIES_PATH
+from tests.models import Study, Subject
 
 from django_dicom.models import Image, Series
 from django_dicom.models.utils.utils import get_group_model
-from django_mri.models import Scan, Session
+from django_mri.models import (
+    AcquisitionSummary,
+    NIfTI,
+    Scan,
+    Score,
+    Session,
+)
+from django_mri.models.managers.score import TABLE_COLUMNS
+from django_mri.models.managers.session import DATAFRAME_COLUMNS
+from django_mri.utils.slices import RAW
+from django_mri.views.session import PERSONAL_INFORMATION_COLUMNS
+from django_mri.views.scan import TILE_SHAPE_HEADER
 
 User = get_user_model()
 Group = get_group_model()
@@ -240,3 +259,385 @@ class LoggedInNIfTIViewTestCase(APITestCase):
         url = reverse("mri:nifti-detail", args=(self.test_nifti.id,))
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class ZipResponseTestCase(APITestCase):
+    @classmethod
+    @factory.django.mute_signals(signals.post_save)
+    def setUpTestData(cls):
+        Image.objects.import_path(
+            SIEMENS_DWI_SERIES_PATH, progressbar=False, report=False
+        )
+        cls.series = Series.objects.first()
+        subject, _ = Subject.objects.from_dicom_patient(cls.series.patient)
+        header = cls.series.image_set.first().header.instance
+        session_time = datetime.combine(
+            header.get("StudyDate"), header.get("StudyTime")
+        ).replace(tzinfo=pytz.UTC)
+        cls.session = Session.objects.create(
+            subject=subject, time=session_time
+        )
+        Scan.objects.create(dicom=cls.series, session=cls.session)
+        cls.nifti = NIfTI.objects.create(path=NIFTI_TEST_FILE_PATH)
+        cls.user = User.objects.create_superuser(
+            username="test", password="pass"
+        )
+
+    def get_archive(self, url: str) -> zipfile.ZipFile:
+        self.client.force_authenticate(self.user)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        content = b"".join(response.streaming_content)
+        return zipfile.ZipFile(io.BytesIO(content))
+
+    def test_session_dicom_zip_stores_dicom_files(self):
+        url = reverse("mri:session-dicom-zip", args=(self.session.id,))
+        with self.get_archive(url) as archive:
+            infos = archive.infolist()
+            n_files = len(list(Path(self.series.path).iterdir()))
+            self.assertEqual(len(infos), n_files)
+            for info in infos:
+                self.assertEqual(info.compress_type, zipfile.ZIP_STORED)
+
+    def test_nifti_to_zip(self):
+        url = reverse("mri:nifti-to-zip", args=(self.nifti.id,))
+        with self.get_archive(url) as archive:
+            path = Path(NIFTI_TEST_FILE_PATH)
+            info = archive.getinfo(path.name)
+            self.assertEqual(info.compress_type, zipfile.ZIP_STORED)
+            self.assertEqual(archive.read(info), path.read_bytes())
+
+
+class ScanTileViewTestCase(APITestCase):
+    @classmethod
+    @factory.django.mute_signals(signals.post_save)
+    def setUpTestData(cls):
+        subject = Subject.objects.create()
+        session = Session.objects.create(
+            subject=subject, time=datetime(2020, 1, 1, tzinfo=pytz.UTC)
+        )
+        nifti = NIfTI.objects.create(path=NIFTI_TEST_FILE_PATH)
+        cls.scan = Scan.objects.create(session=session, _nifti=nifti)
+        missing = NIfTI.objects.create(path="/missing/file.nii.gz")
+        cls.missing_scan = Scan.objects.create(session=session, _nifti=missing)
+        cls.user = User.objects.create_superuser(
+            username="test", password="pass"
+        )
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def test_slice_tile(self):
+        url = reverse("mri:scan-slice-tile", args=(self.scan.id,))
+        response = self.client.get(url, {"plane": "axial"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "image/png")
+        etag = response["ETag"]
+        response = self.client.get(
+            url, {"plane": "axial"}, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_raw_slice_tile(self):
+        url = reverse("mri:scan-slice-tile", args=(self.scan.id,))
+        params = {"plane": "axial", "tile_format": RAW}
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "application/octet-stream")
+        shape = [int(size) for size in response[TILE_SHAPE_HEADER].split(",")]
+        self.assertEqual(len(shape), 2)
+        self.assertEqual(len(response.content), shape[0] * shape[1])
+
+    def test_slice_tile_invalid_plane(self):
+        url = reverse("mri:scan-slice-tile", args=(self.scan.id,))
+        response = self.client.get(url, {"plane": "oblique"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_volume_tile_minimal_stride(self):
+        url = reverse("mri:scan-volume-tile", args=(self.scan.id,))
+        response = self.client.get(url, {"stride": 1})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(url, {"stride": 4})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_missing_file_returns_404(self):
+        for name in ("scan-slice-tile", "scan-volume-tile"):
+            url = reverse(f"mri:{name}", args=(self.missing_scan.id,))
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class NiftiViewTestCase(APITestCase):
+    @classmethod
+    @factory.django.mute_signals(signals.post_save, signals.m2m_changed)
+    def setUpTestData(cls):
+        # Derivative NIfTIs (e.g. analysis outputs) have no associated scan.
+        cls.nifti = NIfTI.objects.create(path=NIFTI_TEST_FILE_PATH)
+        cls.user = User.objects.create_user(username="test", password="pass")
+        cls.staff = User.objects.create_user(
+            username="staff", password="pass", is_staff=True
+        )
+        cls.collaborator = User.objects.create_user(
+            username="collaborator", password="pass"
+        )
+        # A scan's NIfTI is only served to collaborators of its studies.
+        temp_dir = tempfile.TemporaryDirectory()
+        cls.addClassCleanup(temp_dir.cleanup)
+        scan_nifti_path = Path(temp_dir.name) / Path(NIFTI_TEST_FILE_PATH).name
+        shutil.copy(NIFTI_TEST_FILE_PATH, scan_nifti_path)
+        cls.scan_nifti = NIfTI.objects.create(path=scan_nifti_path)
+        study = Study.objects.create(title="Study")
+        study.collaborators.add(cls.collaborator)
+        group = study.group_set.create(title="Group")
+        time = datetime(2020, 1, 10, tzinfo=pytz.UTC)
+        session = Session.objects.create(
+            subject=Subject.objects.create(), time=time
+        )
+        scan = Scan.objects.create(
+            session=session, time=time, _nifti=cls.scan_nifti
+        )
+        scan.study_groups.add(group)
+
+    def test_list_is_not_filtered_by_scan(self):
+        self.client.force_authenticate(self.user)
+        response = self.client.get(reverse("mri:nifti-list"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 2)
+
+    def test_detail_is_not_filtered_by_scan(self):
+        self.client.force_authenticate(self.user)
+        url = reverse("mri:nifti-detail", args=(self.nifti.id,))
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_raw(self):
+        self.client.force_authenticate(self.staff)
+        url = reverse("mri:nifti-raw", args=(self.nifti.id,))
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_raw_range(self):
+        self.client.force_authenticate(self.staff)
+        url = reverse("mri:nifti-raw", args=(self.nifti.id,))
+        response = self.client.get(url, HTTP_RANGE="bytes=0-99")
+        self.assertEqual(
+            response.status_code, status.HTTP_206_PARTIAL_CONTENT
+        )
+        size = Path(NIFTI_TEST_FILE_PATH).stat().st_size
+        self.assertEqual(response["Content-Range"], f"bytes 0-99/{size}")
+        content = b"".join(response.streaming_content)
+        self.assertEqual(len(content), 100)
+
+    def test_raw_by_collaborator(self):
+        self.client.force_authenticate(self.collaborator)
+        url = reverse("mri:nifti-raw", args=(self.scan_nifti.id,))
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_raw_by_non_collaborator_returns_404(self):
+        self.client.force_authenticate(self.user)
+        url = reverse("mri:nifti-raw", args=(self.scan_nifti.id,))
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        content = b"".join(response.streaming_content)
+        self.assertEqual(content, Path(NIFTI_TEST_FILE_PATH).read_bytes())
+
+
+class AcquisitionSummaryViewTestCase(APITestCase):
+    @classmethod
+    @factory.django.mute_signals(signals.post_save, signals.m2m_changed)
+    def setUpTestData(cls):
+        cls.study = Study.objects.create(title="Study")
+        cls.other_study = Study.objects.create(title="Other")
+        cls.group = cls.study.group_set.create(title="Group")
+        other_group = cls.other_study.group_set.create(title="Other")
+        time = datetime(2020, 1, 10, tzinfo=pytz.UTC)
+        session = Session.objects.create(
+            subject=Subject.objects.create(), time=time
+        )
+        for number, group in enumerate((cls.group, other_group)):
+            scan = Scan.objects.create(
+                session=session, number=number, time=time
+            )
+            scan.study_groups.set([group])
+        AcquisitionSummary.objects.refresh()
+        cls.superuser = User.objects.create_superuser(
+            username="admin", password="pass"
+        )
+        cls.user = User.objects.create_user(username="test", password="pass")
+        cls.study.collaborators.add(cls.user)
+        cls.url = reverse("mri:acquisitionsummary-list")
+
+    def test_totals(self):
+        self.client.force_authenticate(self.superuser)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        expected = [{"scan_count": 2, "session_count": 1}]
+        self.assertEqual(response.data, expected)
+
+    def test_group_by(self):
+        self.client.force_authenticate(self.superuser)
+        response = self.client.get(self.url, {"group_by": "study"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        counts = {row["study"]: row["scan_count"] for row in response.data}
+        self.assertEqual(counts, {self.study.id: 1, self.other_study.id: 1})
+
+    def test_invalid_group_by(self):
+        self.client.force_authenticate(self.superuser)
+        response = self.client.get(self.url, {"group_by": "study,subject"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("group_by", response.data)
+
+    def test_filtered_dimension_is_kept(self):
+        # Rows filtered by group must not be aggregated over groups.
+        self.client.force_authenticate(self.superuser)
+        response = self.client.get(self.url, {"group": self.group.id})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        expected = [{"scan_count": 1, "session_count": 1}]
+        self.assertEqual(response.data, expected)
+
+    def test_non_superuser_is_restricted_to_studies(self):
+        self.client.force_authenticate(self.user)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        expected = [{"scan_count": 1, "session_count": 1}]
+        self.assertEqual(response.data, expected)
+        response = self.client.get(self.url, {"group_by": "study"})
+        studies = [row["study"] for row in response.data]
+        self.assertEqual(studies, [self.study.id])
+
+
+def read_csv_response(response) -> list:
+    content = b"".join(response.streaming_content).decode()
+    return list(csv.reader(io.StringIO(content)))
+
+
+def read_parquet_response(response):
+    content = b"".join(response.streaming_content)
+    return pq.read_table(io.BytesIO(content))
+
+
+class ScoreExportViewTestCase(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        run = RunFactory()
+        cls.volume = MetricFactory(title="Volume")
+        cls.area = MetricFactory(title="Area")
+        cls.scores = [
+            Score.objects.create(run=run, metric=metric, value=value)
+            for metric, value in ((cls.volume, 1.5), (cls.area, 2.5))
+        ]
+        cls.user = User.objects.create_user(username="test", password="pass")
+        cls.url = reverse("mri:score-export")
+
+    def setUp(self):
+        self.client.force_authenticate(self.user)
+
+    def test_export_csv(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "text/csv")
+        header, *rows = read_csv_response(response)
+        self.assertEqual(header, TABLE_COLUMNS)
+        self.assertEqual(len(rows), len(self.scores))
+
+    def test_export_filtered(self):
+        response = self.client.get(self.url, {"metric": self.area.id})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        _, *rows = read_csv_response(response)
+        self.assertEqual(len(rows), 1)
+        score_index = TABLE_COLUMNS.index("Score")
+        self.assertEqual(float(rows[0][score_index]), 2.5)
+
+    def test_export_parquet(self):
+        response = self.client.get(self.url, {"file_format": "parquet"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        table = read_parquet_response(response)
+        self.assertEqual(table.column_names, TABLE_COLUMNS)
+        values = sorted(table.column("Score").to_pylist())
+        self.assertEqual(values, [1.5, 2.5])
+
+    def test_invalid_file_format(self):
+        response = self.client.get(self.url, {"file_format": "xlsx"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("file_format", response.data)
+
+
+class SessionExportViewTestCase(APITestCase):
+    @classmethod
+    @factory.django.mute_signals(signals.post_save, signals.m2m_changed)
+    def setUpTestData(cls):
+        study = Study.objects.create(title="Study")
+        group = study.group_set.create(title="Group")
+        time = datetime(2020, 1, 10, tzinfo=pytz.UTC)
+        cls.sessions = []
+        for number in range(2):
+            subject = Subject.objects.create(
+                id_number=f"00{number}", first_name="First", last_name="Last"
+            )
+            session = Session.objects.create(subject=subject, time=time)
+            scan = Scan.objects.create(
+                session=session, number=number, time=time
+            )
+            scan.study_groups.set([group])
+            cls.sessions.append(session)
+        cls.superuser = User.objects.create_superuser(
+            username="admin", password="pass"
+        )
+        cls.user = User.objects.create_user(username="test", password="pass")
+        study.collaborators.add(cls.user)
+        cls.url = reverse("mri:session-export")
+        cls.public_columns = [
+            column
+            for column in DATAFRAME_COLUMNS
+            if column not in PERSONAL_INFORMATION_COLUMNS
+        ]
+
+    def test_superuser_export_includes_personal_information(self):
+        self.client.force_authenticate(self.superuser)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        header, *rows = read_csv_response(response)
+        self.assertEqual(header, list(DATAFRAME_COLUMNS))
+        self.assertEqual(len(rows), len(self.sessions))
+
+    def test_personal_information_is_stripped(self):
+        self.client.force_authenticate(self.user)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        header, *rows = read_csv_response(response)
+        self.assertEqual(header, self.public_columns)
+        self.assertEqual(len(rows), len(self.sessions))
+
+    def test_export_filtered(self):
+        self.client.force_authenticate(self.superuser)
+        session_id = self.sessions[1].id
+        response = self.client.get(self.url, {"id_in": session_id})
+        _, *rows = read_csv_response(response)
+        self.assertEqual([int(row[0]) for row in rows], [session_id])
+
+    def test_export_parquet(self):
+        self.client.force_authenticate(self.user)
+        response = self.client.get(self.url, {"file_format": "parquet"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        table = read_parquet_response(response)
+        self.assertEqual(table.column_names, self.public_columns)
+        session_ids = sorted(table.column("Session PK").to_pylist())
+        expected = [session.id for session in self.sessions]
+        self.assertEqual(session_ids, expected)
+
+    def test_invalid_file_format(self):
+        self.client.force_authenticate(self.superuser)
+        response = self.client.get(self.url, {"file_format": "xlsx"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("file_format", response.data)
+
+    def test_to_csv(self):
+        self.client.force_authenticate(self.user)
+        response = self.client.get(reverse("mri:session-to-csv"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "text/csv")
+        header, *rows = read_csv_response(response)
+        self.assertEqual(header, self.public_columns)
+        self.assertEqual(len(rows), len(self.sessions))